@@ -0,0 +1,57 @@
+import gzip
+import json
+import os
+
+
+class TaskArchive:
+    """
+    Cold storage for completed tasks: a gzip-compressed JSON-lines file.
+    Each append adds a new gzip member, so archiving never rewrites history.
+    The file is only read when history or stats are requested, and the
+    parsed result is cached and kept current by later appends.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._tasks = None # id -> task dict, populated on first read
+
+    def append(self, tasks):
+        """Durably appends task dicts to the archive."""
+        if not tasks:
+            return
+        payload = "".join(json.dumps(t, separators=(",", ":"), ensure_ascii=False) + "\n" for t in tasks)
+        with open(self.filepath, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(payload.encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        if self._tasks is not None:
+            for t in tasks:
+                self._tasks[t["id"]] = t
+
+    def get_tasks(self):
+        """Returns archived task dicts, oldest first. Reads the file on first use."""
+        if self._tasks is None:
+            self._tasks = self._read()
+        return list(self._tasks.values())
+
+    def count(self):
+        return len(self.get_tasks())
+
+    def _read(self):
+        tasks = {}
+        if not os.path.exists(self.filepath):
+            return tasks
+        try:
+            with gzip.open(self.filepath, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        t = json.loads(line)
+                    except ValueError:
+                        continue
+                    # A crash between archiving and the live delete can archive a task twice
+                    tasks[t["id"]] = t
+        except (OSError, EOFError) as e:
+            # A torn final member only loses the batch that was being written
+            print(f"[TaskArchive] Archive read stopped early: {e}")
+        return tasks
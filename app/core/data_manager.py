@@ -1,149 +1,1186 @@
-import json
 import os
+import random
 import time
 from datetime import datetime
-from threading import Lock
-from app.core import settings
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from threading import Event, Lock, RLock, Thread, get_ident
+from types import MappingProxyType
+from app.core import settings, transfer
+from app.core.archive import TaskArchive
+from app.core.migrations import SCHEMA_VERSION, migrate
+from app.core.notes_history import NotesHistory
+from app.core.oplog import TASK_ID_TAG_BITS, OpLog, registers, replica_id
+from app.core.search import SearchIndex
+from app.core.storage import FileStorage, SqliteStorage
+from app.core.undo import UndoLog
+
+
+TASK_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Change event kinds published to DataManager subscribers
+TASK_ADDED = "task_added"
+TASK_UPDATED = "task_updated"
+TASK_REMOVED = "task_removed"
+NOTES_CHANGED = "notes_changed"
+SETTINGS_CHANGED = "settings_changed"
+TASKS_RELOADED = "tasks_reloaded" # Bulk change (e.g. an import): views should re-read all tasks
+
+# kind is one of the constants above; task_id is set for task events, key for settings
+ChangeEvent = namedtuple("ChangeEvent", ["kind", "task_id", "key"])
+
+# Immutable point-in-time view of the store: a tuple of (never mutated) Tasks
+# and a read-only copy of the scalar data
+StoreSnapshot = namedtuple("StoreSnapshot", ["version", "tasks", "data"])
+
+
+@lru_cache(maxsize=4096)
+def _parse_task_time(value):
+    return int(time.mktime(time.strptime(value, TASK_TIME_FORMAT)))
+
+
+@lru_cache(maxsize=4096)
+def _format_task_time(timestamp):
+    return time.strftime(TASK_TIME_FORMAT, time.localtime(timestamp))
+
+
+class Task:
+    """
+    A single checklist item.
+    Timestamps are held as epoch seconds. Journal records and snapshots use
+    the "%Y-%m-%d %H:%M" text schema, so an add or toggle formats one
+    timestamp for its record and loading parses each one; both conversions
+    are memoized per value, and filters and archive cutoffs compare ints.
+    Tasks are treated as immutable once stored; updates replace the object.
+    """
+
+    __slots__ = ("id", "text", "done", "created_at", "completed_at", "priority")
+
+    def __init__(self, id, text, done=False, created_at=None, completed_at=None, priority="normal"):
+        self.id = id
+        self.text = text
+        self.done = done
+        self.created_at = created_at
+        self.completed_at = completed_at
+        self.priority = priority
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Builds a Task from the JSON schema ("%Y-%m-%d %H:%M" timestamps).
+        Records are complete: older files are normalized by the schema migrations on load.
+        """
+        created = d["created_at"]
+        completed = d["completed_at"]
+        return cls(
+            d["id"],
+            d["text"],
+            d["done"],
+            _parse_task_time(created) if created else None,
+            _parse_task_time(completed) if completed else None,
+            d["priority"]
+        )
+
+    def to_dict(self):
+        """Serializes back to the JSON schema used by the data file and journal."""
+        return {
+            "id": self.id,
+            "text": self.text,
+            "done": self.done,
+            "created_at": self.format_time(self.created_at),
+            "completed_at": self.format_time(self.completed_at),
+            "priority": self.priority
+        }
+
+    def with_fields(self, fields):
+        """Returns a copy with a partial update in JSON schema form (as stored in the journal)."""
+        task = Task(self.id, self.text, self.done, self.created_at, self.completed_at, self.priority)
+        for key, value in fields.items():
+            if key in ("created_at", "completed_at"):
+                value = _parse_task_time(value) if value else None
+            setattr(task, key, value)
+        return task
+
+    @staticmethod
+    def format_time(timestamp):
+        return _format_task_time(timestamp) if timestamp is not None else None
+
+    def __repr__(self):
+        return f"Task(id={self.id!r}, text={self.text!r}, done={self.done!r})"
 
 
 class DataManager:
     """
     Manages persistent data storage for the dashboard.
     Handles tasks, notes, user preferences, and other application state.
-    Uses a threading lock to prevent race conditions during file access.
     """
     
-    def __init__(self, filepath):
+    def __init__(self, filepath, write_behind=False, flush_interval=settings.DATA_FLUSH_INTERVAL, backend="json",
+                 data_format=settings.DATA_FORMAT):
+        """
+        Opens (or creates) the store at filepath. Mutations are appended to a
+        journal (see FileStorage), or with backend="sqlite" applied to a
+        SQLite database next to it (see SqliteStorage), into which an
+        existing JSON store is migrated once. write_behind defers writes to a
+        background flusher (see _flush_loop). data_format picks the snapshot
+        encoding of the json backend.
+        """
         self.filepath = filepath
-        self.lock = Lock()
+        self.lock = RLock() # Reentrant so a transaction can hold it across its mutations
+        self.io_lock = Lock() # Serializes physical writes; always taken before self.lock
+        if backend == "sqlite":
+            self.storage = SqliteStorage(os.path.splitext(filepath)[0] + ".db")
+        elif backend == "json":
+            self.storage = FileStorage(filepath, generations=settings.DATA_BACKUP_GENERATIONS, data_format=data_format)
+        else:
+            raise ValueError(f"Unknown storage backend: {backend}")
+        self.archive = TaskArchive(os.path.splitext(filepath)[0] + ".archive.jsonl.gz")
+        self.index = SearchIndex()
+        self.index_path = os.path.splitext(filepath)[0] + ".index.json"
+        self.notes_history = NotesHistory(
+            os.path.splitext(filepath)[0] + ".notes_history.jsonl",
+            budget_bytes=settings.NOTES_HISTORY_BUDGET,
+            interval=settings.NOTES_HISTORY_INTERVAL
+        )
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._pending_mutations = 0
+        self._last_mutation = 0.0
+        self._dirty = Event()
+        self._closed = False
+        self._stop = Event() # Set by close() to cut the flusher's waits short
+        self._tx_depth = 0
+        self._tx_owner = None
+        self._tx_undo = [] # Inverse ops of the open transaction, in apply order
+        self._tx_redo = [] # The matching forward ops, or None for ops that are not undoable
+        self._tx_events = [] # Events held back until the transaction commits
+        self.subscribers = []
+        self.oplog = OpLog(os.path.splitext(filepath)[0] + ".oplog.jsonl", replica_id(filepath))
+        self.undo_log = UndoLog(budget_bytes=settings.UNDO_BUDGET, max_steps=settings.UNDO_MAX_STEPS)
+        self.write_stats = {
+            "mutations": 0,
+            "physical_writes": 0,
+            "coalesced_writes": 0
+        }
+        # Tasks are kept in an insertion-ordered id -> task dict, which doubles
+        # as the ordered list and the lookup index (O(1) toggle/delete).
+        self._tasks = {}
+        self._version = 0
+        self._snapshot = StoreSnapshot(-1, (), MappingProxyType({}))
         self.data = {
-            "tasks": [],
+            "schema_version": SCHEMA_VERSION,
+            "next_task_id": 1,
             "notes": "",
             "username": "Commander",
             "theme": "dark",
             "weather_location": {"lat": settings.WEATHER_LAT, "lon": settings.WEATHER_LON}, # Defaults to Ormond, Melbourne
             "last_active": None,
-            "session_count": 0
+            "session_count": 0,
+            "replica_tag": None # [replica, tag] after a tag clash; a copy made for another replica ignores it
         }
+        self._notes_unlogged_since = None # When a notes edit not yet in the oplog was written (see _log_notes)
         self.load()
         self._update_session()
+        self.archive_completed_tasks()
+        self._archived_at = time.monotonic()
+
+        if self.write_behind:
+            self._flusher = Thread(target=self._flush_loop, daemon=True, name="DataFlushThread")
+            self._flusher.start()
 
     def load(self):
-        """Loads data from the JSON file into memory."""
+        """Loads the snapshot into memory and replays the journal written after it."""
+        with self.io_lock, self.storage.file_lock, self.lock:
+            if self.storage.exists():
+                if self._load_from(self.storage):
+                    # Persist the upgrade so the next startup skips the migration chain
+                    print(f"[DataManager] Upgraded data to schema version {SCHEMA_VERSION}")
+                    self._write_snapshot(self.snapshot(), self.index.capture())
+            elif isinstance(self.storage, SqliteStorage) and os.path.exists(self.filepath):
+                # One-shot migration of an existing JSON store into the new database
+                print(f"[DataManager] Migrating {os.path.basename(self.filepath)} to SQLite")
+                legacy = FileStorage(self.filepath, generations=settings.DATA_BACKUP_GENERATIONS)
+                self._load_from(legacy)
+                legacy.close()
+                self.storage.replace_all(self._serialize(self.snapshot()))
+            else:
+                self.data["last_saved"] = datetime.now().isoformat()
+                self._write_snapshot(self.snapshot()) # Create file if it doesn't exist
+
+    def _load_from(self, storage):
+        """Loads and migrates a store. Returns True if it was upgraded from an older schema."""
+        migrated = False
+        try:
+            loaded, records = storage.load()
+            migrated = self._load_state(loaded, records, storage.base_seq)
+        except (ValueError, IOError) as e:
+            print(f"[DataManager] Error loading data: {e}")
+        return migrated
+
+    def _load_state(self, loaded, records, base_seq):
+        """Replaces the in-memory state with a loaded snapshot plus journal records."""
+        migrated = migrate(loaded)
+        if loaded.get("schema_version", 0) > SCHEMA_VERSION:
+            print(f"[DataManager] Data was written by a newer version (schema {loaded['schema_version']})")
+        # Deep merge for simplicity (only top level keys for now)
+        for key in self.data:
+            if key in loaded:
+                self.data[key] = loaded[key]
+        self._index_tasks(loaded["tasks"])
+        if not self.index.load(self.index_path, base_seq):
+            self.index.rebuild(self._tasks.values(), self.data["notes"])
+        for record in records:
+            self._apply(record)
+            if record["op"] == "set" and record["key"] == "notes":
+                self._notes_unlogged_since = 0.0 # Maybe never logged if its writer crashed; log it soon
+        return migrated
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups mutations into a single write.
+        Persistence is deferred until the outermost block exits; an exception
+        rolls back the in-memory changes made inside the (possibly nested)
+        block that raised. Other threads' mutations wait until it finishes.
+        """
+        self.lock.acquire()
+        self._tx_depth += 1
+        self._tx_owner = get_ident()
+        savepoint = self._savepoint()
+        try:
+            yield self
+        except BaseException:
+            self._rollback_to(savepoint)
+            raise
+        finally:
+            self._tx_depth -= 1
+            outermost = self._tx_depth == 0
+            events = []
+            if outermost:
+                command = [(op, inverse) for op, inverse in zip(self._tx_redo, self._tx_undo) if op is not None]
+                if command:
+                    self.undo_log.record(command) # The whole transaction undoes as one step
+                self._tx_owner = None
+                self._tx_undo = []
+                self._tx_redo = []
+                events, self._tx_events = self._tx_events, []
+            self.lock.release()
+        if outermost:
+            self._schedule_write()
+            self._publish(events)
+
+    def _in_transaction(self):
+        return self._tx_depth > 0 and self._tx_owner == get_ident()
+
+    def _savepoint(self):
+        """What a rollback restores besides the ops: the ID counter and the mutation counts."""
+        return len(self._tx_undo), self.data["next_task_id"], self._pending_mutations, dict(self.write_stats)
+
+    def _rollback_to(self, savepoint):
+        """Undoes the ops applied since savepoint and drops them from the pending batch."""
+        applied, next_task_id, pending_mutations, write_stats = savepoint
+        undo = self._tx_undo[applied:]
+        del self._tx_undo[applied:]
+        del self._tx_redo[applied:]
+        del self._tx_events[applied:]
+        del self._pending[len(self._pending) - len(undo):]
+        for inverse in reversed(undo):
+            self._apply(inverse)
+        self.data["next_task_id"] = next_task_id
+        self._pending_mutations = pending_mutations
+        self.write_stats.update(write_stats)
+
+    # --- Change Events ---
+
+    def subscribe(self, callback):
+        """
+        Registers callback(event: ChangeEvent), called on the mutating thread
+        once per applied change (for a transaction, when it commits), so
+        views can update just the affected rows.
+        """
         with self.lock:
-            if os.path.exists(self.filepath):
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def _event_for(self, op):
+        kind = op["op"]
+        if kind == "add_task":
+            return ChangeEvent(TASK_ADDED, op["task"]["id"], None)
+        elif kind == "delete_task":
+            return ChangeEvent(TASK_REMOVED, op["id"], None)
+        elif kind == "update_task":
+            return ChangeEvent(TASK_UPDATED, op["id"], None)
+        elif kind == "set":
+            if op["key"] == "notes":
+                return ChangeEvent(NOTES_CHANGED, None, "notes")
+            return ChangeEvent(SETTINGS_CHANGED, None, op["key"])
+        return None
+
+    def _publish(self, events):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for event in events:
+            if event is None:
+                continue
+            for callback in subscribers:
                 try:
-                    with open(self.filepath, "r", encoding='utf-8') as f:
-                        loaded = json.load(f)
-                        # Deep merge for simplicity (only top level keys for now)
-                        for key in self.data:
-                            if key in loaded:
-                                self.data[key] = loaded[key]
-                        # Ensure tasks are lists
-                        if not isinstance(self.data.get("tasks"), list):
-                            self.data["tasks"] = []
-                except (json.JSONDecodeError, IOError) as e:
-                    print(f"[DataManager] Error loading data: {e}")
-                    # Could implement a backup restore here if needed
-            else:
-                self.save() # Create file if it doesn't exist
+                    callback(event)
+                except Exception as e:
+                    print(f"[DataManager] Error in change subscriber: {e}")
 
     def save(self):
-        """Writes current robust data state to JSON file."""
+        """Flushes pending records and compacts the journal into a full snapshot."""
+        if self._in_transaction():
+            return # Deferred: the transaction persists everything on exit
+        with self.io_lock, self.storage.file_lock:
+            events = self._catch_up()
+            batch, snapshot, index_state = self._take_pending(with_snapshot=True)
+            self._append(batch)
+            self._write_snapshot(snapshot, index_state)
+        self._publish(events)
+
+    def flush(self):
+        """Synchronously appends any pending records to the journal."""
+        if self._in_transaction():
+            return
+        with self.io_lock, self.storage.file_lock:
+            events = self._catch_up()
+            batch, _, _ = self._take_pending()
+            self._append(batch)
+            if self.storage.needs_compaction():
+                # Re-take so the snapshot matches the journal position exactly
+                batch, snapshot, index_state = self._take_pending(with_snapshot=True)
+                self._append(batch)
+                self._write_snapshot(snapshot, index_state)
+        self._publish(events)
+
+    def poll_changes(self):
+        """
+        Merges changes other processes wrote, if the store changed on disk.
+        The check is a couple of stat calls, so it is cheap to call on a timer.
+        Returns True if anything was merged.
+        """
+        if self._in_transaction() or not self.storage.changed():
+            return False
+        with self.io_lock, self.storage.file_lock:
+            events = self._catch_up()
+        self._publish(events)
+        return bool(events)
+
+    def close(self):
+        """Stops the background flusher and persists everything still pending."""
+        self._closed = True
+        self._stop.set()
+        self._dirty.set()
+        if self.write_behind:
+            self._flusher.join() # It may be mid-flush; the final save and storage.close() come after it
+        self.save()
+        self.notes_history.flush()
+        with self.io_lock:
+            self.storage.close()
+
+    def get_write_stats(self):
+        """Returns counters of logical mutations vs. physical journal writes."""
+        with self.lock:
+            return dict(self.write_stats, pending=len(self._pending))
+
+    def snapshot(self):
+        """
+        Returns an immutable StoreSnapshot of the current state.
+        Rebuilt at most once per change; if a writer (e.g. an open transaction
+        on another thread) holds the lock, the last committed snapshot is returned
+        instead of waiting.
+        """
+        snap = self._snapshot
+        if snap.version == self._version or not self.lock.acquire(blocking=False):
+            return snap
+        try:
+            if self._snapshot.version != self._version:
+                self._snapshot = StoreSnapshot(
+                    self._version, tuple(self._tasks.values()), MappingProxyType(dict(self.data))
+                )
+            return self._snapshot
+        finally:
+            self.lock.release()
+
+    def _take_pending(self, with_snapshot=False):
+        """Swaps out the pending batch (plus a snapshot and index matching it) under the store lock."""
         with self.lock:
-            try:
+            batch, self._pending = self._pending, []
+            mutations, self._pending_mutations = self._pending_mutations, 0
+            if batch:
+                self.write_stats["physical_writes"] += 1
+                self.write_stats["coalesced_writes"] += mutations - 1
+            snapshot = index_state = None
+            if with_snapshot:
                 # Update last saved timestamp
                 self.data["last_saved"] = datetime.now().isoformat()
-                
-                with open(self.filepath, "w", encoding='utf-8') as f:
-                    json.dump(self.data, f, indent=4, ensure_ascii=False)
-            except IOError as e:
-                print(f"[DataManager] Error saving data: {e}")
+                self._version += 1
+                snapshot = self.snapshot()
+                index_state = self.index.capture()
+        return batch, snapshot, index_state
+
+    def _append(self, batch, local=True):
+        """
+        Appends one batch as a single physical write. Caller holds io_lock and
+        the file lock. Local ops are also logged for sync (remote ones already are).
+        """
+        if not batch:
+            return
+        if local:
+            logged = [op for op in batch if op["op"] != "set" or op["key"] != "notes"]
+            if len(logged) < len(batch) and self._notes_unlogged_since is None:
+                self._notes_unlogged_since = time.monotonic()
+            self.oplog.append_local(logged)
+        try:
+            self.storage.append(batch)
+        except IOError as e:
+            print(f"[DataManager] Error writing journal: {e}")
+        if local and self._notes_unlogged_since is not None:
+            if time.monotonic() - self._notes_unlogged_since >= settings.OPLOG_NOTES_INTERVAL:
+                self._log_notes()
+
+    def _log_notes(self):
+        """
+        Logs the current notes for sync if they changed since last logged.
+        Notes are saved on every keystroke and an oplog entry holds the whole
+        text, so edits are coalesced: one entry per OPLOG_NOTES_INTERVAL, and
+        one before every sync query and snapshot. Caller holds io_lock and the
+        file lock and has caught up, so the value is the store's latest.
+        """
+        if self._notes_unlogged_since is None:
+            return
+        self._notes_unlogged_since = None
+        self.oplog.append_local([{"op": "set", "key": "notes", "value": self.data["notes"]}])
+
+    # --- Multi-process merge ---
+
+    def _catch_up(self):
+        """
+        Folds in what other processes wrote since our last read or write.
+        Every write takes the storage's cross-process file lock and calls this
+        first, so several processes (a second dashboard, a CLI script) can
+        share the store. Caller holds io_lock and the file lock. Returns the
+        change events.
+        """
+        change = self.storage.sync()
+        if change is None:
+            return []
+        kind, payload = change
+        with self.lock:
+            if kind == "reload":
+                return self._rebase(*payload)
+            return self._merge_records(payload)
+
+    def _pending_footprint(self):
+        """What the unwritten local ops touch: (added task ids, (task id, field) pairs, data keys)."""
+        added, fields, keys = set(), set(), set()
+        for op in self._pending:
+            kind = op["op"]
+            if kind == "add_task":
+                added.add(op["task"]["id"])
+            elif kind == "update_task":
+                fields.update((op["id"], field) for field in op["fields"])
+            elif kind == "set":
+                keys.add(op["key"])
+        return added, fields, keys
+
+    def _merge_records(self, records):
+        """
+        Applies foreign journal records on top of the local state. Local ops
+        are appended after them, so for fields both sides changed the local
+        value is kept, matching what a reload of the file would show.
+        """
+        events = []
+        added, fields, keys = self._pending_footprint()
+        for record in records:
+            kind = record["op"]
+            if kind == "add_task" and record["task"]["id"] in added:
+                taken = record["task"]["id"]
+                self._claim_task_id(taken)
+                events.extend(self._move_local_task(taken, self._allocate_task_id()))
+                added, fields, keys = self._pending_footprint()
+            elif kind == "update_task":
+                kept = {k: v for k, v in record["fields"].items() if (record["id"], k) not in fields}
+                if not kept:
+                    continue
+                record = dict(record, fields=kept)
+            elif kind == "set" and record["key"] in keys:
+                continue
+            self._apply(record)
+            events.append(self._event_for(record))
+        return events
+
+    def _rebase(self, loaded, records):
+        """
+        Reloads the store after another process compacted it, then re-applies
+        the unwritten local ops on top. Returns events for everything that differs.
+        """
+        old_tasks, old_data = self._tasks, dict(self.data)
+        pending_ids = [op["task"]["id"] for op in self._pending if op["op"] == "add_task"]
+        self._load_state(loaded, records, self.storage.base_seq)
+        # Fresh IDs must also clear the local ones not re-applied yet
+        for task_id in pending_ids:
+            self._claim_task_id(task_id)
+        for op in self._pending:
+            if op["op"] == "add_task" and op["task"]["id"] in self._tasks:
+                self._remap_pending(op["task"]["id"], self._allocate_task_id())
+            self._apply(op)
+
+        events = [ChangeEvent(TASK_REMOVED, task_id, None) for task_id in old_tasks if task_id not in self._tasks]
+        for task_id, task in self._tasks.items():
+            old = old_tasks.get(task_id)
+            if old is None:
+                events.append(ChangeEvent(TASK_ADDED, task_id, None))
+            elif old.to_dict() != task.to_dict():
+                events.append(ChangeEvent(TASK_UPDATED, task_id, None))
+        for key, value in self.data.items():
+            if old_data.get(key) != value:
+                events.append(self._event_for({"op": "set", "key": key}))
+        return events
+
+    def _move_local_task(self, old_id, new_id):
+        """Moves a not-yet-written local task to new_id because another process wrote old_id first."""
+        self._remap_pending(old_id, new_id)
+        task = self._tasks.pop(old_id, None)
+        if task is not None:
+            self.index.remove_task(old_id, task.text)
+            task = task.with_fields({"id": new_id})
+            self._insert_task(task)
+            self.index.add_task(new_id, task.text)
+        self._claim_task_id(new_id)
+        self._version += 1
+        return [ChangeEvent(TASK_REMOVED, old_id, None), ChangeEvent(TASK_ADDED, new_id, None)]
+
+    def _remap_pending(self, old_id, new_id):
+        """Rewrites, in place, the unwritten ops that refer to task old_id."""
+        for op in self._pending:
+            if op["op"] == "add_task" and op["task"]["id"] == old_id:
+                op["task"]["id"] = new_id
+            elif op["op"] in ("delete_task", "update_task") and op["id"] == old_id:
+                op["id"] = new_id
+        self.undo_log.remap_task(old_id, new_id)
+
+    # --- Sync between data files ---
+
+    def sync_with(self, other):
+        """
+        Two-way sync with another store, e.g. this file's copy from another
+        machine opened as a second DataManager. Each side receives the oplog
+        entries it has not seen, so the cost follows the number of changes
+        since the last sync, not the store size. Concurrent edits resolve the
+        same way on both sides (see apply_remote_ops). Returns (pulled, pushed)
+        entry counts.
+        """
+        if self._in_transaction() or other._in_transaction():
+            raise RuntimeError("sync_with cannot run inside a transaction")
+        mine, theirs = self.version_vector(), other.version_vector()
+        outgoing, incoming = self.ops_since(theirs), other.ops_since(mine)
+        # Both sides are checked before either changes, so a clash leaves them untouched
+        self._check_replica_tag(incoming)
+        other._check_replica_tag(outgoing)
+        return self.apply_remote_ops(incoming, theirs), other.apply_remote_ops(outgoing, mine)
+
+    def version_vector(self):
+        """{replica: highest clock seen}: what this store's oplog contains."""
+        if self._in_transaction():
+            raise RuntimeError("version_vector cannot run inside a transaction")
+        with self.io_lock, self.storage.file_lock:
+            events = self._write_pending()
+            vector = self.oplog.version_vector()
+        self._publish(events)
+        return vector
+
+    def ops_since(self, vector):
+        """Oplog entries not covered by vector (another store's version_vector()), in stamp order."""
+        if self._in_transaction():
+            raise RuntimeError("ops_since cannot run inside a transaction")
+        with self.io_lock, self.storage.file_lock:
+            events = self._write_pending()
+            entries = self.oplog.since(vector)
+        self._publish(events)
+        return entries
+
+    def _write_pending(self):
+        """
+        Brings the journal and oplog up to date before they are read for sync:
+        catches up, appends the pending batch and logs coalesced notes edits.
+        Caller holds io_lock and the file lock. Returns the change events.
+        """
+        events = self._catch_up()
+        batch, _, _ = self._take_pending()
+        self._append(batch)
+        self._log_notes()
+        return events
+
+    def _replica_tag(self):
+        """The tag in the low bits of the task IDs this store hands out."""
+        override = self.data.get("replica_tag")
+        if override and override[0] == self.oplog.replica:
+            return override[1]
+        return self.oplog.tag
+
+    def _check_replica_tag(self, entries):
+        """
+        Re-tags this store if entries from another replica add tasks with its
+        tag (the tags are hashes, so two replicas can share one). Raises
+        RuntimeError, before anything changes, if both already created the
+        same task ID.
+        """
+        tag, mask = self._replica_tag(), (1 << TASK_ID_TAG_BITS) - 1
+        foreign = {e["op"]["task"]["id"] for e in entries
+                   if e["op"]["op"] == "add_task" and e["r"] != self.oplog.replica and e["op"]["task"]["id"] & mask == tag}
+        if not foreign:
+            return
+        with self.io_lock, self.storage.file_lock:
+            own = {e["op"]["task"]["id"] for e in self.oplog.since({})
+                   if e["r"] == self.oplog.replica and e["op"]["op"] == "add_task"}
+        clash = sorted(foreign & own)
+        if clash:
+            raise RuntimeError(f"Another replica created task IDs {clash[:5]} too (shared tag {tag:#x}); cannot sync")
+        new_tag = tag
+        while new_tag == tag:
+            new_tag = random.getrandbits(TASK_ID_TAG_BITS)
+        print(f"[DataManager] Replica tag {tag:#x} is shared with another replica; re-tagged as {new_tag:#x}")
+        self._commit({"op": "set", "key": "replica_tag", "value": [self.oplog.replica, new_tag]}, undoable=False)
+
+    def apply_remote_ops(self, entries, sender_vector):
+        """
+        Merges oplog entries from another replica. sender_vector is the
+        sender's version_vector() from when it produced them.
+
+        Each entry is checked against the local entries the sender had not
+        seen (the concurrent ones): per register, the higher stamp wins, and
+        a delete beats concurrent edits of the task. The sender runs the same
+        rule over the same two sets, so both end up identical. (That relies on
+        both directions being applied together, as sync_with does.) Notes
+        replaced this way stay recoverable from the notes history.
+        Returns the number of entries that were new here.
+        """
+        if self._in_transaction():
+            raise RuntimeError("apply_remote_ops cannot run inside a transaction")
+        self._check_replica_tag(entries)
+        notes = []
+        with self.io_lock, self.storage.file_lock:
+            events = self._write_pending() # Local ops get logged first, so they count as concurrent below
+            fresh = self.oplog.unseen(entries)
+            local = {}
+            for entry in self.oplog.since(sender_vector):
+                stamp = (entry["c"], entry["r"])
+                for register in registers(entry["op"]):
+                    local[register] = max(local.get(register, stamp), stamp)
+            ops = []
+            with self.lock:
+                for entry in fresh:
+                    op = self._resolve_remote(entry["op"], (entry["c"], entry["r"]), local)
+                    if op is None:
+                        continue
+                    if op["op"] == "set" and op["key"] == "notes":
+                        notes.append((op["value"], self.data["notes"]))
+                    self._apply(op)
+                    ops.append(op)
+                    events.append(self._event_for(op))
+            self._append(ops, local=False)
+            self.oplog.append_remote(fresh)
+        for text, previous in notes:
+            self.notes_history.record(text, previous=previous)
+        self._publish(events)
+        return len(fresh)
+
+    def _resolve_remote(self, op, stamp, local):
+        """The part of a remote op that wins against the local state, as a journal op (or None)."""
+        kind = op["op"]
+        if kind == "add_task":
+            task_id = op["task"]["id"]
+            if local.get(("task", task_id), stamp) > stamp:
+                return None
+            current = self._tasks.get(task_id)
+            record = dict(op["task"])
+            if current is not None:
+                kept = current.to_dict()
+                for field in record:
+                    if local.get(("field", task_id, field), stamp) > stamp:
+                        record[field] = kept[field]
+            return {"op": "add_task", "task": record}
+        elif kind == "delete_task":
+            if op["id"] not in self._tasks or local.get(("task", op["id"]), stamp) > stamp:
+                return None
+            return {"op": "delete_task", "id": op["id"]}
+        elif kind == "update_task":
+            if op["id"] not in self._tasks:
+                return None # Deleted here: the delete wins
+            fields = {k: v for k, v in op["fields"].items() if local.get(("field", op["id"], k), stamp) <= stamp}
+            return {"op": "update_task", "id": op["id"], "fields": fields} if fields else None
+        elif kind == "set":
+            if local.get(("key", op["key"]), stamp) > stamp:
+                return None
+            return {"op": "set", "key": op["key"], "value": op["value"]}
+        return None
+
+    def _write_snapshot(self, snapshot, index_state=None):
+        """Serializes and writes a snapshot. Caller holds io_lock (or is loading)."""
+        self._log_notes() # The journal is about to be truncated; it no longer marks unlogged edits
+        try:
+            self.storage.write_snapshot(self._serialize(snapshot))
+            if index_state is not None:
+                SearchIndex.save(self.index_path, index_state, self.storage.seq)
+        except IOError as e:
+            print(f"[DataManager] Error saving data: {e}")
+
+    def _commit(self, *ops, undoable=True):
+        """Applies operations in memory and queues them for the journal."""
+        self._mutate(lambda: ops, undoable)
+
+    def _mutate(self, build, undoable=True):
+        """
+        Runs build() under the store lock and commits the ops it returns, so
+        check-then-act mutators see a consistent state. Scheduling the write
+        and publishing events happen after the lock is released.
+        Undoable ops are recorded in the undo log as one command.
+        """
+        with self.lock:
+            ops = build()
+            if not ops:
+                return
+            in_transaction = self._in_transaction()
+            events = [self._event_for(op) for op in ops]
+            command = []
+            for op in ops:
+                if in_transaction or undoable:
+                    inverse = self._inverse(op)
+                    if in_transaction:
+                        self._tx_undo.append(inverse)
+                        self._tx_redo.append(op if undoable else None)
+                    elif undoable:
+                        command.append((op, inverse))
+                self._apply(op)
+            if command:
+                self.undo_log.record(command)
+            if in_transaction:
+                self._tx_events.extend(events)
+            self._pending.extend(ops)
+            self._pending_mutations += 1
+            self.write_stats["mutations"] += 1
+            self._last_mutation = time.monotonic()
+        if not in_transaction:
+            self._schedule_write()
+            self._publish(events)
+
+    def _schedule_write(self):
+        if self.write_behind and not self._closed:
+            self._dirty.set()
+        else:
+            self.flush()
+
+    def _flush_loop(self):
+        """
+        Background writer for write-behind mode, where mutations only mark
+        the store dirty. A burst of them is appended as one journal write once
+        the store goes idle or flush_interval elapses, whichever comes first;
+        close() forces the final flush. While idle it polls for other
+        processes' writes and periodically archives old completed tasks.
+        """
+        idle_delay = min(0.5, self.flush_interval)
+        while not self._closed:
+            if not self._dirty.wait(settings.DATA_POLL_INTERVAL):
+                if self._closed:
+                    return
+                self.poll_changes() # Idle: pick up writes from other instances
+                if time.monotonic() - self._archived_at >= settings.ARCHIVE_CHECK_INTERVAL:
+                    self._archived_at = time.monotonic()
+                    try:
+                        self.archive_completed_tasks() # Long-running sessions archive too, not just startup
+                    except IOError as e:
+                        print(f"[DataManager] Error archiving tasks: {e}")
+                continue
+            if self._closed:
+                return # close() does the final save
+            first_dirty = time.monotonic()
+            while not self._closed:
+                now = time.monotonic()
+                if now - self._last_mutation >= idle_delay or now - first_dirty >= self.flush_interval:
+                    break
+                self._stop.wait(min(idle_delay, self.flush_interval - (now - first_dirty)))
+            if self._closed:
+                return
+            self._dirty.clear()
+            self.flush()
+
+    def _serialize(self, snapshot):
+        """
+        The persisted form of a snapshot: data plus the ordered tasks.
+        Tasks are a generator, so writers stream them instead of materializing
+        every dict (and the SQLite backend, which keeps rows itself, skips them).
+        """
+        return dict(snapshot.data, tasks=(t.to_dict() for t in snapshot.tasks))
+
+    def _index_tasks(self, tasks):
+        """Rebuilds the task index from migrated task records (IDs are unique)."""
+        self._tasks = {d["id"]: Task.from_dict(d) for d in tasks}
+        # SQLite only persists the counter with snapshots, so it can lag the task rows
+        self._claim_task_id(max(self._tasks, default=0))
+        self._version += 1
+
+    def _allocate_task_id(self):
+        """
+        Hands out the next task ID: a monotonic counter (persisted with the
+        store) in the high bits and this replica's tag in the low bits.
+        """
+        counter = self.data["next_task_id"]
+        self.data["next_task_id"] = counter + 1
+        return (counter << TASK_ID_TAG_BITS) | self._replica_tag()
+
+    def _claim_task_id(self, task_id):
+        """Moves the ID counter past a task ID that is in use."""
+        counter = (task_id >> TASK_ID_TAG_BITS) + 1
+        if counter > self.data["next_task_id"]:
+            self.data["next_task_id"] = counter
+
+    def _inverse(self, op):
+        """Returns the op that undoes op against the current in-memory state."""
+        kind = op["op"]
+        if kind == "add_task":
+            return {"op": "delete_task", "id": op["task"]["id"]}
+        elif kind == "delete_task":
+            t = self._tasks.get(op["id"])
+            return {"op": "add_task", "task": t.to_dict()} if t else {"op": "noop"}
+        elif kind == "update_task":
+            t = self._tasks.get(op["id"])
+            if t is None:
+                return {"op": "noop"}
+            current = t.to_dict()
+            return {"op": "update_task", "id": op["id"], "fields": {k: current[k] for k in op["fields"]}}
+        elif kind == "set":
+            return {"op": "set", "key": op["key"], "value": self.data.get(op["key"])}
+        return {"op": "noop"}
+
+    def _insert_task(self, task):
+        """Inserts a task keeping ID order (IDs are allocated monotonically)."""
+        tasks = self._tasks
+        if tasks and task.id not in tasks and task.id < next(reversed(tasks)):
+            # Only re-adding a removed task (rollback/undo) or another replica's task lands
+            # here; the latter is usually recent, so only a short tail has to move
+            tail = []
+            while tasks and next(reversed(tasks)) > task.id:
+                tail.append(tasks.popitem())
+            tasks[task.id] = task
+            tasks.update(reversed(tail))
+        else:
+            tasks[task.id] = task
+
+    def _apply(self, op):
+        """Applies a single journal operation to the in-memory data."""
+        kind = op["op"]
+        if kind == "add_task":
+            task = Task.from_dict(op["task"])
+            old = self._tasks.get(task.id)
+            if old is not None:
+                self.index.remove_task(old.id, old.text)
+            self._insert_task(task)
+            self.index.add_task(task.id, task.text)
+            self._claim_task_id(task.id)
+        elif kind == "delete_task":
+            old = self._tasks.pop(op["id"], None)
+            if old is not None:
+                self.index.remove_task(old.id, old.text)
+        elif kind == "update_task":
+            t = self._tasks.get(op["id"])
+            if t is not None:
+                self._tasks[t.id] = t.with_fields(op["fields"])
+                if "text" in op["fields"]:
+                    self.index.remove_task(t.id, t.text)
+                    self.index.add_task(t.id, op["fields"]["text"])
+        elif kind == "set":
+            self.data[op["key"]] = op["value"]
+            if op["key"] == "notes":
+                self.index.set_notes(op["value"])
+        elif kind == "noop":
+            pass
+        else:
+            print(f"[DataManager] Skipping unknown journal op: {kind}")
+        self._version += 1
 
     def _update_session(self):
         """Internal method to update session statistics."""
-        self.data["last_active"] = datetime.now().isoformat()
-        self.data["session_count"] = self.data.get("session_count", 0) + 1
-        self.save()
+        self._commit(
+            {"op": "set", "key": "last_active", "value": datetime.now().isoformat()},
+            {"op": "set", "key": "session_count", "value": self.data.get("session_count", 0) + 1},
+            undoable=False
+        )
 
     # --- Task Operations ---
     
     def add_task(self, text, priority="normal"):
         """Adds a new task with metadata including priority and timestamps."""
-        task_id = int(time.time() * 1000)
-        new_task = {
-            "id": task_id,
-            "text": text,
-            "done": False,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "completed_at": None,
-            "priority": priority
-        }
-        self.data["tasks"].append(new_task)
-        self.save()
-        return new_task
+        new_task = Task(None, text, created_at=int(time.time()), priority=priority)
+        record = {}
+
+        def build():
+            new_task.id = self._allocate_task_id()
+            record.update(new_task.to_dict())
+            return [{"op": "add_task", "task": record}]
+        self._mutate(build)
+        # record["id"] follows the task if a concurrent instance claimed its ID first
+        return self._tasks.get(record["id"])
 
     def delete_task(self, task_id):
         """Removes a task by ID."""
-        original_count = len(self.data["tasks"])
-        self.data["tasks"] = [t for t in self.data["tasks"] if t["id"] != task_id]
-        if len(self.data["tasks"]) < original_count:
-            self.save()
-            return True
-        return False
+        removed = []
+
+        def build():
+            if task_id not in self._tasks:
+                return None
+            removed.append(task_id)
+            return [{"op": "delete_task", "id": task_id}]
+        self._mutate(build)
+        return bool(removed)
 
     def toggle_task(self, task_id):
         """Toggles the completion status of a task."""
-        for t in self.data["tasks"]:
-            if t["id"] == task_id:
-                t["done"] = not t["done"]
-                if t["done"]:
-                    t["completed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                else:
-                    t["completed_at"] = None
-                self.save()
-                return t
-        return None
+        def build():
+            t = self._tasks.get(task_id)
+            if t is None:
+                return None
+            done = not t.done
+            completed_at = Task.format_time(int(time.time())) if done else None
+            return [{"op": "update_task", "id": task_id, "fields": {"done": done, "completed_at": completed_at}}]
+        self._mutate(build)
+        return self._tasks.get(task_id)
+
+    # --- Undo / Redo ---
+
+    def undo(self, scope=None):
+        """
+        Reverts the most recent change, or with scope ("tasks" or "settings")
+        the most recent one of that kind. Returns False if there is none.
+        Each user action (a mutator call or a whole transaction) is one command
+        in a bounded UndoLog; undoing commits its inverse ops through the
+        normal mutation path, so it costs one small journal write.
+        """
+        return self._step(lambda: self.undo_log.pop_undo(scope),
+                          lambda command: [inverse for _, inverse in reversed(command)])
+
+    def redo(self, scope=None):
+        """Re-applies the most recently undone change (of scope, if given). Returns False if there is none."""
+        return self._step(lambda: self.undo_log.pop_redo(scope), lambda command: [op for op, _ in command])
+
+    def can_undo(self, scope=None):
+        return self.undo_log.can_undo(scope)
+
+    def can_redo(self, scope=None):
+        return self.undo_log.can_redo(scope)
+
+    def _step(self, pop, ops_for):
+        if self._in_transaction():
+            raise RuntimeError("undo/redo cannot run inside a transaction")
+        done = []
+
+        def build():
+            command = pop()
+            if command is None:
+                return None
+            done.append(command)
+            # Fresh copies, so the queued records never alias the logged ones
+            return [dict(op) for op in ops_for(command)]
+        self._mutate(build, undoable=False)
+        return bool(done)
+
+    def get_task(self, task_id):
+        """Returns the task with task_id, or None."""
+        return self._tasks.get(task_id)
+
+    def archive_completed_tasks(self, older_than_days=settings.ARCHIVE_AFTER_DAYS):
+        """
+        Moves tasks completed more than older_than_days ago to the archive.
+        The archive append is made durable before the live delete, so a crash
+        in between can only duplicate a task in history, never lose it.
+        Runs at startup and, with write-behind, from the flusher every
+        ARCHIVE_CHECK_INTERVAL. Cannot run inside a transaction (it takes
+        io_lock, which must come before the lock a transaction holds).
+        Returns the number of tasks archived.
+        """
+        if self._in_transaction():
+            raise RuntimeError("archive_completed_tasks cannot run inside a transaction")
+        cutoff = time.time() - older_than_days * 86400
+        stale = [t for t in self.snapshot().tasks if t.done and t.completed_at is not None and t.completed_at < cutoff]
+        if not stale:
+            return 0
+        with self.io_lock:
+            self.archive.append([t.to_dict() for t in stale])
+        # Tasks are immutable, so identity tells us nothing changed since the archive copy.
+        # Not synced: other replicas archive the same tasks themselves.
+        self._mutate(lambda: [{"op": "delete_task", "id": t.id, "archived": True}
+                              for t in stale if self._tasks.get(t.id) is t], undoable=False)
+        return len(stale)
+
+    def get_archived_tasks(self):
+        """Returns archived tasks, oldest first. Loads the archive on first call."""
+        return [Task.from_dict(d) for d in self.archive.get_tasks()]
+
+    def get_task_stats(self):
+        """Counts across the live store and the archive (loads the archive)."""
+        tasks = self.snapshot().tasks
+        completed = sum(1 for t in tasks if t.done)
+        archived = self.archive.count()
+        return {
+            "active": len(tasks) - completed,
+            "completed": completed,
+            "archived": archived,
+            "total": len(tasks) + archived
+        }
 
     def get_tasks(self, filter_status=None):
         """
         Returns tasks, optionally filtered by status ('active', 'completed').
         """
+        tasks = self.snapshot().tasks
         if filter_status == 'active':
-            return [t for t in self.data["tasks"] if not t["done"]]
+            return [t for t in tasks if not t.done]
         elif filter_status == 'completed':
-            return [t for t in self.data["tasks"] if t["done"]]
-        return self.data["tasks"]
+            return [t for t in tasks if t.done]
+        return list(tasks)
+
+    def import_tasks(self, stream, fmt=None, chunk_size=1000):
+        """
+        Streams tasks from a CSV or JSON Lines text stream into the store.
+        Rows are validated and given fresh IDs in a single pass, a chunk at a
+        time, and persisted once at the end as one snapshot (no journal record
+        per row), so memory beyond the store itself stays flat.
+        Imports are not undoable and cannot run inside a transaction: they
+        persist as they go, and take io_lock, which must come before the lock
+        a transaction holds. Returns {"imported", "skipped", "errors"},
+        errors being the first few (line, reason) pairs.
+        If reading the stream fails partway (e.g. an I/O error), the rows
+        imported so far are still persisted and announced before the error
+        propagates, so the store, the oplog and the views agree.
+        """
+        if self._in_transaction():
+            raise RuntimeError("import_tasks cannot run inside a transaction")
+        fmt = transfer.detect_format(stream, fmt)
+        rows = transfer.read_rows(stream, fmt)
+        result = {"imported": 0, "skipped": 0, "errors": []}
+        bulk_rows = isinstance(self.storage, SqliteStorage) # The database needs the rows; the file only a snapshot
+        events = []
+        try:
+            with self.io_lock, self.storage.file_lock:
+                events = self._catch_up()
+                try:
+                    while True:
+                        chunk = list(islice(rows, chunk_size))
+                        if not chunk:
+                            break
+                        records = self._import_chunk(chunk, result)
+                        self.oplog.append_local({"op": "add_task", "task": r} for r in records)
+                        if bulk_rows:
+                            self.storage.insert_tasks(records)
+                finally:
+                    batch, snapshot, index_state = self._take_pending(with_snapshot=True)
+                    self._append(batch)
+                    self._write_snapshot(snapshot, index_state)
+        finally:
+            if result["imported"]:
+                events.append(ChangeEvent(TASKS_RELOADED, None, None))
+            self._publish(events)
+        return result
+
+    def _import_chunk(self, chunk, result):
+        """Validates and inserts one chunk of (line_no, row) pairs. Returns the imported records."""
+        records = []
+        with self.lock:
+            for line_no, row in chunk:
+                try:
+                    record = transfer.validate_row(row)
+                    record["id"] = self._allocate_task_id() # Skipped if the row fails below; IDs need not be dense
+                    task = Task.from_dict(record)
+                except ValueError as e:
+                    result["skipped"] += 1
+                    if len(result["errors"]) < 20:
+                        result["errors"].append((line_no, str(e)))
+                    continue
+                self._tasks[task.id] = task
+                records.append(record)
+            self.index.add_tasks((r["id"], r["text"]) for r in records)
+            result["imported"] += len(records)
+            self._version += 1
+        return records
+
+    def export_tasks(self, stream, filter_status=None, fmt=None):
+        """
+        Streams tasks (optionally 'active' or 'completed' only) to a CSV or
+        JSON Lines text stream from an immutable snapshot, one row at a time.
+        Returns the number of tasks written.
+        """
+        fmt = transfer.detect_format(stream, fmt)
+        tasks = self.snapshot().tasks
+        if filter_status == 'active':
+            tasks = (t for t in tasks if not t.done)
+        elif filter_status == 'completed':
+            tasks = (t for t in tasks if t.done)
+        return transfer.write_rows(stream, (t.to_dict() for t in tasks), fmt)
 
     def clear_completed_tasks(self):
         """Removes all completed tasks."""
-        self.data["tasks"] = [t for t in self.data["tasks"] if not t["done"]]
-        self.save()
+        self._mutate(lambda: [{"op": "delete_task", "id": t.id} for t in self._tasks.values() if t.done])
 
     # --- Note Operations ---
 
     def set_notes(self, text):
-        """Updates the persistent notes scratchpad."""
-        if self.data["notes"] != text:
-            self.data["notes"] = text
-            self.save()
+        """Updates the persistent notes scratchpad and records the edit in the notes history."""
+        previous = []
+
+        def build():
+            if self.data["notes"] == text:
+                return None
+            previous.append(self.data["notes"])
+            return [{"op": "set", "key": "notes", "value": text}]
+        self._mutate(build, undoable=False) # Notes have their own version history
+        if previous:
+            self.notes_history.record(text, previous=previous[0])
+
+    def search(self, query, limit=20):
+        """
+        Full-text search over tasks and notes.
+        Every word must match; the last one also matches as a prefix, so this
+        can run per keystroke. Returns {"tasks": [Task, newest first],
+        "notes": [(line_no, line_text), ...]}.
+        """
+        with self.lock:
+            task_ids, line_nos = self.index.search(query, limit)
+            lines = self.index.note_lines
+            return {
+                "tasks": [self._tasks[i] for i in task_ids if i in self._tasks],
+                "notes": [(n, lines[n]) for n in line_nos]
+            }
 
     def get_notes(self):
         """Retrieves the current notes."""
         return self.data.get("notes", "")
 
+    def get_notes_history(self):
+        """Returns the recorded notes versions as [(version, timestamp)], oldest first."""
+        return self.notes_history.versions()
+
+    def get_notes_version(self, version):
+        """Returns the notes text of a recorded version, or None if it has been evicted."""
+        return self.notes_history.get_version(version)
+
     # --- User/Config Operations ---
 
     def get_username(self):
         return self.data.get("username", "User")
     
     def set_username(self, name):
-        self.data["username"] = name
-        self.save()
+        self._commit({"op": "set", "key": "username", "value": name})
 
     def get_weather_location(self):
         return self.data.get("weather_location", {"lat": 0, "lon": 0})
 
     def set_weather_location(self, lat, lon):
-        self.data["weather_location"] = {"lat": lat, "lon": lon}
-        self.save()
+        self._commit({"op": "set", "key": "weather_location", "value": {"lat": lat, "lon": lon}})
@@ -0,0 +1,81 @@
+"""
+Schema migrations for the persisted store.
+
+Every snapshot carries a schema_version. Files written before versioning
+count as version 0. On load, migrate() runs the steps between the file's
+version and SCHEMA_VERSION in order. DataManager then writes the result
+back once, so later startups skip the chain. The hot paths (Task.from_dict,
+journal replay) can therefore assume every task record is complete.
+
+To change the schema, bump SCHEMA_VERSION and append a step to MIGRATIONS.
+Never edit a step that has already shipped.
+"""
+
+SCHEMA_VERSION = 3
+
+TASK_DEFAULTS = {
+    "text": "",
+    "done": False,
+    "created_at": None,
+    "completed_at": None,
+    "priority": "normal"
+}
+
+
+def _normalize_tasks(data):
+    """v0 -> v1: drops malformed entries and fills fields missing from early task records."""
+    tasks = data.get("tasks")
+    normalized = []
+    for task in tasks if isinstance(tasks, list) else []:
+        if not isinstance(task, dict) or not isinstance(task.get("id"), int):
+            continue
+        task = dict(TASK_DEFAULTS, **task)
+        task["done"] = bool(task["done"])
+        normalized.append(task)
+    data["tasks"] = normalized
+
+
+def _renumber_task_ids(data):
+    """v1 -> v2: re-numbers colliding millisecond-timestamp IDs and seeds the ID counter."""
+    next_id = data.get("next_task_id", 1)
+    for task in data["tasks"]:
+        next_id = max(next_id, task["id"] + 1)
+    seen = set()
+    for task in data["tasks"]:
+        if task["id"] in seen:
+            task["id"] = next_id
+            next_id += 1
+        seen.add(task["id"])
+    data["next_task_id"] = next_id
+
+
+def _tag_task_ids(data):
+    """
+    v2 -> v3: next_task_id becomes the counter of replica-tagged IDs
+    (counter << 32 | tag, see app/core/oplog.py). Existing IDs are kept.
+    """
+    highest = max([data["next_task_id"] - 1] + [task["id"] for task in data["tasks"]])
+    data["next_task_id"] = (highest >> 32) + 1
+
+
+# MIGRATIONS[i] upgrades a version-i store to version i + 1
+MIGRATIONS = [
+    _normalize_tasks,
+    _renumber_task_ids,
+    _tag_task_ids
+]
+
+
+def migrate(data):
+    """
+    Upgrades a loaded snapshot dict in place to SCHEMA_VERSION.
+    Returns True if any step ran (the caller should persist the result).
+    A store written by a newer version of the app is left untouched.
+    """
+    version = data.get("schema_version", 0)
+    if version >= SCHEMA_VERSION:
+        return False
+    for step in MIGRATIONS[version:]:
+        step(data)
+    data["schema_version"] = SCHEMA_VERSION
+    return True
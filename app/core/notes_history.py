@@ -0,0 +1,240 @@
+import difflib
+import json
+import os
+import time
+from threading import Lock
+
+
+def diff_lines(old, new):
+    """
+    Line-level delta turning old into new, as a compact op list:
+    n > 0 copies n lines, n < 0 skips -n lines, a list inserts those lines.
+    """
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append(b[j1:j2])
+    return ops
+
+
+def patch_lines(text, ops):
+    """Applies a diff_lines delta to text."""
+    lines = text.splitlines(keepends=True)
+    out = []
+    pos = 0
+    for op in ops:
+        if isinstance(op, list):
+            out.extend(op)
+        elif op > 0:
+            out.extend(lines[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+class NotesHistory:
+    """
+    Bounded version history of the notes scratchpad, kept in a JSON-lines
+    sidecar file.
+
+    Each version is stored as a line delta from the one before it, with a
+    full keyframe at least every KEYFRAME_EVERY versions (or whenever the
+    delta would not be smaller). Rebuilding a version therefore applies at
+    most KEYFRAME_EVERY deltas, however long the history is.
+
+    Notes are saved on every keystroke, so edits within `interval` seconds
+    of the last recorded version are held back: each one replaces the
+    previous held-back edit, and the last of a burst is recorded once the
+    next edit comes `interval` seconds later (or on flush()).
+    Once the encoded history exceeds budget_bytes, the oldest versions are
+    evicted; the new oldest is turned into a keyframe so the chain stays valid.
+    The file is appended to and rewritten only once it doubles the budget.
+    """
+
+    KEYFRAME_EVERY = 32
+
+    def __init__(self, filepath, budget_bytes=512 * 1024, interval=60.0):
+        self.filepath = filepath
+        self.budget_bytes = budget_bytes
+        self.interval = interval
+        self.lock = Lock()
+        self._entries = None # Oldest first: {"v", "t", "k": text} or {"v", "t", "d": delta}
+        self._sizes = []     # Encoded line length of each entry
+        self._bytes = 0      # sum(self._sizes)
+        self._latest = ""    # Text of the newest version, so recording never rebuilds it
+        self._pending = None # (text, timestamp) held back by the interval
+        self._file_bytes = 0
+
+    # --- Recording ---
+
+    def record(self, text, previous=None, now=None):
+        """
+        Records text as the newest version (or holds it back, see class doc).
+        previous seeds an empty history with the text being replaced.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            self._ensure_loaded()
+            if not self._entries and previous:
+                self._commit(previous, now)
+            if self._pending is not None and now - self._pending[1] >= self.interval:
+                self._commit(*self._pending) # The earlier burst of edits ended; keep its final state
+            self._pending = None
+            if text == self._latest:
+                return
+            if self._entries and now - self._entries[-1]["t"] < self.interval:
+                self._pending = (text, now)
+            else:
+                self._commit(text, now)
+
+    def flush(self):
+        """Records a held-back edit immediately (e.g. on shutdown)."""
+        with self.lock:
+            if self._pending is not None:
+                text, now = self._pending
+                self._pending = None
+                self._commit(text, now)
+
+    def _commit(self, text, now):
+        if self._file_bytes != self._disk_size():
+            # Another instance appended since we last read; continue from its versions
+            self._entries = None
+            self._ensure_loaded()
+            if text == self._latest:
+                return
+        entries = self._entries
+        entry = {"v": entries[-1]["v"] + 1 if entries else 1, "t": now, "k": text}
+        line = self._encode(entry)
+        if entries and self._deltas_since_keyframe() < self.KEYFRAME_EVERY - 1:
+            delta = {"v": entry["v"], "t": now, "d": diff_lines(self._latest, text)}
+            delta_line = self._encode(delta)
+            if len(delta_line) < len(line):
+                entry, line = delta, delta_line
+        entries.append(entry)
+        self._sizes.append(len(line))
+        self._bytes += len(line)
+        self._latest = text
+        self._append_line(line)
+        self._evict()
+
+    def _deltas_since_keyframe(self):
+        count = 0
+        for entry in reversed(self._entries):
+            if "k" in entry:
+                break
+            count += 1
+        return count
+
+    def _evict(self):
+        """Drops the oldest versions until the history fits the budget."""
+        evicted = False
+        while len(self._entries) > 1 and self._bytes > self.budget_bytes:
+            oldest = self._entries.pop(0)
+            self._bytes -= self._sizes.pop(0)
+            successor = self._entries[0]
+            if "d" in successor:
+                # The successor's base is gone: store it as a keyframe instead
+                successor = {"v": successor["v"], "t": successor["t"], "k": patch_lines(oldest["k"], successor["d"])}
+                self._entries[0] = successor
+                self._bytes -= self._sizes[0]
+                self._sizes[0] = len(self._encode(successor))
+                self._bytes += self._sizes[0]
+            evicted = True
+        if evicted and self._file_bytes > 2 * self.budget_bytes:
+            self._rewrite()
+
+    # --- Queries ---
+
+    def versions(self):
+        """Returns [(version, timestamp)], oldest first, including a held-back edit."""
+        with self.lock:
+            self._ensure_loaded()
+            result = [(e["v"], e["t"]) for e in self._entries]
+            if self._pending is not None:
+                result.append(((result[-1][0] if result else 0) + 1, self._pending[1]))
+            return result
+
+    def get_version(self, version):
+        """Text of a version, or None if it was evicted or never existed."""
+        with self.lock:
+            self._ensure_loaded()
+            entries = self._entries
+            if self._pending is not None and version == (entries[-1]["v"] if entries else 0) + 1:
+                return self._pending[0]
+            if not entries:
+                return None
+            i = version - entries[0]["v"]
+            if not 0 <= i < len(entries):
+                return None
+            start = i
+            while "k" not in entries[start]:
+                start -= 1
+            text = entries[start]["k"]
+            for entry in entries[start + 1:i + 1]:
+                text = patch_lines(text, entry["d"])
+            return text
+
+    # --- Persistence ---
+
+    def _encode(self, entry):
+        return json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+    def _disk_size(self):
+        try:
+            return os.path.getsize(self.filepath)
+        except OSError:
+            return 0
+
+    def _ensure_loaded(self):
+        """Reads the history file on first use (the file stays small: it is bounded by the budget)."""
+        if self._entries is not None:
+            return
+        self._entries, self._sizes, self._bytes, self._latest = [], [], 0, ""
+        self._file_bytes = self._disk_size()
+        if not self._file_bytes:
+            return
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break # Torn tail from a crash mid-append
+                if self._entries and entry["v"] != self._entries[-1]["v"] + 1:
+                    if "d" in entry:
+                        continue # Delta against a version we do not have (concurrent writers)
+                    self._entries, self._sizes, self._bytes = [], [], 0
+                elif not self._entries and "d" in entry:
+                    continue
+                self._entries.append(entry)
+                self._sizes.append(len(line))
+                self._bytes += len(line)
+                self._latest = entry["k"] if "k" in entry else patch_lines(self._latest, entry["d"])
+        if self._entries:
+            self._evict()
+
+    def _append_line(self, line):
+        try:
+            with open(self.filepath, "a", encoding="utf-8") as f:
+                f.write(line)
+            self._file_bytes = self._disk_size()
+        except IOError as e:
+            print(f"[NotesHistory] Error writing notes history: {e}")
+
+    def _rewrite(self):
+        """Replaces the file with just the retained versions."""
+        tmp_path = self.filepath + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(self._encode(entry) for entry in self._entries)
+            os.replace(tmp_path, self.filepath)
+            self._file_bytes = self._disk_size()
+        except IOError as e:
+            print(f"[NotesHistory] Error compacting notes history: {e}")
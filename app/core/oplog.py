@@ -0,0 +1,262 @@
+"""
+Per-replica operation log, used to sync two data files (e.g. the same
+dashboard on two machines) by exchanging only the operations the other
+side has not seen. See DataManager.sync_with.
+
+Every synced change is logged once as a JSON line
+    {"c": lamport_clock, "r": replica_id, "op": journal_op}
+in a sidecar next to the store. (c, r) is the op's stamp: unique per
+replica, and ordered so that an op made after seeing another one always
+sorts after it. A version vector {replica: highest c seen} summarizes
+what a log contains, so "what the other side lacks" is the entries above
+its vector, found by bisecting a small in-memory index (counters and file
+offsets per replica) and reading just those lines.
+
+Concurrent changes to the same register (a task's existence, one task
+field, one settings key) are resolved last-writer-wins by stamp, which
+both sides compute identically; a delete beats concurrent edits of the
+task. See DataManager.apply_remote_ops.
+"""
+
+import hashlib
+import json
+import os
+import re
+import uuid
+from array import array
+from bisect import bisect_right
+
+# Settings keys that follow the user between machines; session bookkeeping stays local
+SYNCED_KEYS = ("notes", "username", "theme", "weather_location")
+
+# New task IDs are (counter << TASK_ID_TAG_BITS) | replica tag, so replicas never hand out the same ID.
+# Tags come from replica IDs, so two replicas share one with odds of 1 in 2**32; DataManager re-tags on a clash.
+TASK_ID_TAG_BITS = 32
+
+# One cached encoder instead of json.dumps per entry (a bulk import logs one entry per task)
+_encode_op = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+_HEAD_RE = re.compile(rb'\{"c":(\d+),"r":"([0-9a-f]+)","op":\{"op":"(\w+)"')
+
+
+def replica_id(filepath):
+    """Stable ID of the data file at filepath on this machine."""
+    key = f"{uuid.getnode():012x}:{os.path.abspath(filepath)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def registers(op):
+    """The registers an op writes: ("task", id), ("field", id, name) or ("key", name)."""
+    kind = op["op"]
+    if kind == "add_task":
+        task_id = op["task"]["id"]
+        return [("task", task_id)] + [("field", task_id, k) for k in op["task"] if k != "id"]
+    elif kind == "delete_task":
+        return [("task", op["id"])]
+    elif kind == "update_task":
+        return [("field", op["id"], k) for k in op["fields"]]
+    elif kind == "set":
+        return [("key", op["key"])]
+    return []
+
+
+def _synced_op(op):
+    """The replicated form of a journal op (without journal bookkeeping), or None if it stays local."""
+    kind = op["op"]
+    if kind == "add_task":
+        return {"op": kind, "task": op["task"]}
+    elif kind == "delete_task":
+        return None if op.get("archived") else {"op": kind, "id": op["id"]}
+    elif kind == "update_task":
+        return {"op": kind, "id": op["id"], "fields": op["fields"]}
+    elif kind == "set" and op["key"] in SYNCED_KEYS:
+        return {"op": kind, "key": op["key"], "value": op["value"]}
+    return None
+
+
+class OpLog:
+    """
+    The operation log of one data file (see module doc).
+
+    Several processes may share the file: writers hold the store's file
+    lock, and every call first reads whatever others appended. The index
+    is built on first use by scanning only the head of each line.
+
+    Only entries that overwrite something (everything but a task add) can
+    make older ones obsolete, so once those written since the last compaction
+    outweigh half of the rest, the log is compacted: entries that are no longer the latest write of any
+    register are dropped. The last entry of every replica is always kept
+    so version vectors never go backwards. Bulk imports (adds only) thus
+    never trigger a rewrite.
+    """
+
+    # Never compact before the overwriting entries reach this many bytes
+    MIN_COMPACT_BYTES = 256 * 1024
+
+    def __init__(self, filepath, replica):
+        self.filepath = filepath
+        self.replica = replica
+        self.tag = int(replica[:TASK_ID_TAG_BITS // 4], 16) # Default tag; DataManager may override it
+        self.clock = 0
+        self._index = None # replica -> (counters, offsets), both in counter order
+        self._offset = 0
+        self._inode = None
+        self._overwrite_bytes = 0 # Bytes of entries other than task adds, since the last compaction
+
+    # --- Queries ---
+
+    def version_vector(self):
+        self._refresh()
+        return {r: counters[-1] for r, (counters, _) in self._index.items()}
+
+    def since(self, vector):
+        """Entries not covered by vector, in stamp order."""
+        self._refresh()
+        offsets = []
+        for r, (counters, positions) in self._index.items():
+            start = bisect_right(counters, vector.get(r, 0))
+            offsets.extend(positions[start:])
+        entries = []
+        if not offsets:
+            return entries
+        with open(self.filepath, "rb") as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        entries.sort(key=lambda e: (e["c"], e["r"]))
+        return entries
+
+    def unseen(self, entries):
+        """The entries (in stamp order) this log does not contain yet."""
+        vector = self.version_vector()
+        return sorted((e for e in entries if e["c"] > vector.get(e["r"], 0)), key=lambda e: (e["c"], e["r"]))
+
+    # --- Appending (caller holds the store's file lock) ---
+
+    def append_local(self, ops):
+        """Stamps and logs the synced ones among freshly written journal ops."""
+        synced = [op for op in map(_synced_op, ops) if op is not None]
+        if not synced:
+            return
+        self._refresh()
+        entries = []
+        for op in synced:
+            self.clock += 1
+            entries.append({"c": self.clock, "r": self.replica, "op": op})
+        self._write(entries)
+
+    def append_remote(self, entries):
+        """Logs entries received from another replica, keeping their stamps."""
+        if not entries:
+            return
+        self._refresh()
+        self.clock = max(self.clock, max(e["c"] for e in entries))
+        self._write(entries)
+
+    def _write(self, entries):
+        lines = [self._encode(e) for e in entries]
+        try:
+            with open(self.filepath, "ab") as f:
+                if f.tell() != self._offset:
+                    f.truncate(self._offset) # Torn tail from a crash mid-append
+                for entry, line in zip(entries, lines):
+                    self._add_to_index(entry["r"], entry["c"], self._offset)
+                    self._offset += len(line)
+                    if entry["op"]["op"] != "add_task":
+                        self._overwrite_bytes += len(line)
+                f.write(b"".join(lines))
+            self._inode = os.stat(self.filepath).st_ino
+        except IOError as e:
+            print(f"[OpLog] Error writing operation log: {e}")
+            return
+        if self._overwrite_bytes > max(self.MIN_COMPACT_BYTES, (self._offset - self._overwrite_bytes) // 2):
+            self.compact()
+
+    def _encode(self, entry):
+        return f'{{"c":{entry["c"]},"r":"{entry["r"]}","op":{_encode_op(entry["op"])}}}\n'.encode("utf-8")
+
+    # --- Index ---
+
+    def _add_to_index(self, r, c, offset):
+        if r not in self._index:
+            self._index[r] = (array("q"), array("q"))
+        counters, offsets = self._index[r]
+        counters.append(c)
+        offsets.append(offset)
+        if c > self.clock:
+            self.clock = c
+
+    def _refresh(self):
+        """Indexes what was appended since we last looked (everything, if the file was replaced)."""
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            st = None
+        if self._index is None or st is None or st.st_ino != self._inode or st.st_size < self._offset:
+            self._index, self._offset, self._overwrite_bytes = {}, 0, 0
+        if st is None:
+            self._inode = None
+            return
+        self._inode = st.st_ino
+        if st.st_size == self._offset:
+            return
+        with open(self.filepath, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break # Torn tail; the next append truncates it
+                head = _HEAD_RE.match(line)
+                if head is not None:
+                    self._add_to_index(head.group(2).decode("ascii"), int(head.group(1)), self._offset)
+                    if head.group(3) != b"add_task":
+                        self._overwrite_bytes += len(line)
+                self._offset += len(line)
+
+    # --- Compaction ---
+
+    def compact(self):
+        """
+        Rewrites the log with only the entries a peer could still need.
+        Two streaming passes, so only the per-register winners are held in
+        memory. Caller holds the file lock.
+        """
+        self._refresh()
+        exists = {}  # task id -> (stamp, line) of its latest add or delete
+        latest = {}  # other register -> (stamp, line) of its latest write
+        last_of = {} # replica -> (c, line) of its highest entry
+        with open(self.filepath, "rb") as f:
+            for i, line in enumerate(f):
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                op, stamp = entry["op"], (entry["c"], entry["r"])
+                if op["op"] == "add_task" or op["op"] == "delete_task":
+                    winners, keys = exists, [op["task"]["id"] if op["op"] == "add_task" else op["id"]]
+                else:
+                    winners, keys = latest, registers(op)
+                for key in keys:
+                    if key not in winners or stamp > winners[key][0]:
+                        winners[key] = (stamp, i)
+                if entry["c"] > last_of.get(entry["r"], (0, None))[0]:
+                    last_of[entry["r"]] = (entry["c"], i)
+        keep = {i for _, i in exists.values()}
+        keep.update(i for _, i in last_of.values())
+        for register, (stamp, i) in latest.items():
+            if register[0] == "field":
+                # An add carries every field, so only edits made after the task's latest add count
+                alive = exists.get(register[1])
+                if alive is None or stamp < alive[0] or alive[1] not in keep:
+                    continue
+            keep.add(i)
+
+        tmp_path = self.filepath + ".tmp"
+        try:
+            with open(self.filepath, "rb") as src, open(tmp_path, "wb") as dst:
+                dst.writelines(line for i, line in enumerate(src) if i in keep)
+            os.replace(tmp_path, self.filepath)
+        except IOError as e:
+            print(f"[OpLog] Error compacting operation log: {e}")
+            return
+        self._index = None
+        self._refresh()
+        self._overwrite_bytes = 0
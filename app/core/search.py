@@ -0,0 +1,300 @@
+import heapq
+import json
+import os
+import re
+from bisect import bisect_left, insort
+from itertools import islice
+from app.core.oplog import TASK_ID_TAG_BITS
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lower-cased word tokens of text."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _posting_key(task_id):
+    """
+    The key a task is posted under. Task IDs are counter << 32 | replica tag,
+    so every local task has the same low bits, which is all a set uses to
+    pick a slot: posting sets of raw IDs probe several times per lookup.
+    Folding the counter into the low bits fixes that, and keeps the high
+    bits, so the newest task still has the largest key.
+    """
+    return task_id ^ (task_id >> TASK_ID_TAG_BITS)
+
+
+def _task_id(key):
+    """Inverse of _posting_key."""
+    task_id, shifted = key, key >> TASK_ID_TAG_BITS
+    while shifted:
+        task_id ^= shifted
+        shifted >>= TASK_ID_TAG_BITS
+    return task_id
+
+
+class SearchIndex:
+    """
+    Incrementally maintained inverted index over task text and note lines.
+    Postings map token -> task keys (see _posting_key) and token -> note
+    line numbers; a sorted vocabulary gives prefix matching for the word
+    being typed, and the sorted task keys give newest-first order. DataManager
+    updates it from _apply, so it never needs a full rebuild while running,
+    and persists it next to each snapshot so startup does not rebuild either.
+    """
+
+    FORMAT_VERSION = 2 # 2: task postings hold _posting_key values; adds the sorted key list
+    MIN_PREFIX = 2 # Shorter last words match exactly; one-letter prefixes match nearly everything
+    MAX_EXPANSIONS = 64 # Prefix matches considered per query; keeps short prefixes O(1)-ish
+    SCAN_COST = 1.5 # Cost of a membership probe through the filter chain, relative to one inside `a & b`
+    SELECT_COST = 2.5 # Cost per candidate of heapq.nlargest, in the same units
+
+    def __init__(self):
+        self.task_postings = {}  # token -> set(_posting_key(task_id))
+        self.task_keys = []      # sorted keys of every indexed task; walked backwards for newest first
+        self.note_postings = {}  # token -> set(line_no)
+        self.note_lines = []     # line text, so edits can be diffed line-wise
+        self.vocab = []          # sorted tokens present in either posting map
+        self._unsorted = []      # tokens from add_tasks() not merged into vocab yet
+
+    # --- Maintenance ---
+
+    def add_task(self, task_id, text):
+        key = _posting_key(task_id)
+        if not self.task_keys or key > self.task_keys[-1]:
+            self.task_keys.append(key)
+        else:
+            insort(self.task_keys, key)
+        for token in set(tokenize(text)):
+            self._post(self.task_postings, token, key)
+
+    def add_tasks(self, tasks):
+        """
+        Bulk add_task for (task_id, text) pairs, e.g. an import. New tokens
+        are queued and merged into the sorted vocabulary once, on next use,
+        instead of one list insert each.
+        """
+        postings = self.task_postings
+        keys = self.task_keys
+        for task_id, text in tasks:
+            key = _posting_key(task_id)
+            keys.append(key)
+            for token in set(tokenize(text)):
+                bucket = postings.get(token)
+                if bucket is None:
+                    postings[token] = bucket = set()
+                    if token not in self.note_postings:
+                        self._unsorted.append(token)
+                bucket.add(key)
+        keys.sort() # Nearly sorted already: imported IDs are allocated in order
+
+    def _merge_vocab(self):
+        if self._unsorted:
+            self.vocab = sorted(self.vocab + self._unsorted)
+            self._unsorted = []
+
+    def remove_task(self, task_id, text):
+        key = _posting_key(task_id)
+        i = bisect_left(self.task_keys, key)
+        if i < len(self.task_keys) and self.task_keys[i] == key:
+            del self.task_keys[i]
+        for token in set(tokenize(text)):
+            self._unpost(self.task_postings, token, key)
+
+    def set_notes(self, text):
+        """Re-indexes only the lines between the unchanged prefix and suffix."""
+        old, new = self.note_lines, text.split("\n")
+        start = 0
+        limit = min(len(old), len(new))
+        while start < limit and old[start] == new[start]:
+            start += 1
+        end_old, end_new = len(old), len(new)
+        if len(old) == len(new):
+            while end_old > start and old[end_old - 1] == new[end_new - 1]:
+                end_old -= 1
+                end_new -= 1
+        # Otherwise line numbers after the edit shift, so the suffix is re-posted as well
+
+        for line_no in range(start, end_old):
+            for token in set(tokenize(old[line_no])):
+                self._unpost(self.note_postings, token, line_no)
+        for line_no in range(start, end_new):
+            for token in set(tokenize(new[line_no])):
+                self._post(self.note_postings, token, line_no)
+        self.note_lines = new
+
+    def rebuild(self, tasks, notes):
+        self.__init__()
+        self.add_tasks((task.id, task.text) for task in tasks)
+        self.set_notes(notes)
+
+    def _post(self, postings, token, value):
+        bucket = postings.get(token)
+        if bucket is None:
+            postings[token] = bucket = set()
+            self._vocab_add(token)
+        bucket.add(value)
+
+    def _unpost(self, postings, token, value):
+        bucket = postings.get(token)
+        if bucket is None:
+            return
+        bucket.discard(value)
+        if not bucket:
+            del postings[token]
+            if token not in self.task_postings and token not in self.note_postings:
+                self._merge_vocab()
+                i = bisect_left(self.vocab, token)
+                if i < len(self.vocab) and self.vocab[i] == token:
+                    del self.vocab[i]
+
+    def _vocab_add(self, token):
+        self._merge_vocab()
+        i = bisect_left(self.vocab, token)
+        if i == len(self.vocab) or self.vocab[i] != token:
+            self.vocab.insert(i, token)
+
+    # --- Queries ---
+
+    def search(self, query, limit=20):
+        """
+        Returns (task_ids, note_lines) matching every word of query; the last
+        word also matches as a prefix. Task ids come newest (highest) first.
+        """
+        words = tokenize(query)
+        if not words:
+            return [], []
+        terms = [[w] for w in words[:-1]] + [self._expand(words[-1])]
+        task_ids = self._match_tasks(terms, limit)
+        return task_ids, sorted(self._match(self.note_postings, terms))[:limit]
+
+    def _expand(self, word):
+        if len(word) < self.MIN_PREFIX:
+            return [word]
+        self._merge_vocab()
+        i = bisect_left(self.vocab, word)
+        matches = []
+        while i < len(self.vocab) and self.vocab[i].startswith(word) and len(matches) < self.MAX_EXPANSIONS:
+            matches.append(self.vocab[i])
+            i += 1
+        return matches
+
+    def _term_buckets(self, postings, terms):
+        """Posting sets per term (a term matches any of its expansions), or None if one is empty."""
+        per_term = []
+        for expansions in terms:
+            buckets = [postings[t] for t in expansions if t in postings]
+            if not buckets:
+                return None
+            per_term.append(buckets)
+        return per_term
+
+    def _match_tasks(self, terms, limit):
+        per_term = self._term_buckets(self.task_postings, terms)
+        if per_term is None:
+            return []
+        per_term.sort(key=self._term_size) # Most selective first, for both strategies
+        sizes = [self._term_size(buckets) for buckets in per_term]
+
+        # Estimate both strategies in set probes. Intersecting probes at most the
+        # running result per term, then selects the newest `limit` of the result;
+        # walking newest-first stops after about limit / match-density ids, and
+        # each id only reaches a term if it passed the more selective ones.
+        task_count = len(self.task_keys)
+        total = max(task_count, 1)
+        running, intersect_cost = sizes[0], 0.0
+        for size in sizes[1:]:
+            intersect_cost += min(running, size)
+            running *= size / total
+        intersect_cost += running * self.SELECT_COST
+        density, probes = 1.0, 0.0
+        for size in sizes:
+            probes += density
+            density *= size / total
+        scan_cost = min(task_count, limit / density if density else task_count) * probes * self.SCAN_COST
+        if not task_count or scan_cost >= intersect_cost:
+            return [_task_id(key) for key in heapq.nlargest(limit, self._intersect(per_term))]
+
+        # Common words: walk tasks from newest and stop after `limit` hits. The
+        # chained filters keep the per-task membership probes at C level.
+        matches = reversed(self.task_keys)
+        for buckets in per_term:
+            if len(buckets) == 1:
+                matches = filter(buckets[0].__contains__, matches)
+            else:
+                matches = filter(lambda key, buckets=buckets: any(key in b for b in buckets), matches)
+        return [_task_id(key) for key in islice(matches, limit)]
+
+    @staticmethod
+    def _term_size(buckets):
+        return sum(len(b) for b in buckets)
+
+    def _match(self, postings, terms):
+        per_term = self._term_buckets(postings, terms)
+        if per_term is None:
+            return set()
+        per_term.sort(key=self._term_size)
+        return self._intersect(per_term)
+
+    def _intersect(self, per_term):
+        """
+        Intersects the terms (per_term sorted smallest first). Each step costs
+        at most the running result: `a & b` iterates the smaller set, and a
+        prefix term's expansions are intersected one by one rather than merged
+        into a union first. The result may be a posting set itself; callers
+        must not modify it.
+        """
+        first = per_term[0]
+        result = first[0] if len(first) == 1 else set().union(*first)
+        for buckets in per_term[1:]:
+            if not result:
+                break
+            if len(buckets) == 1:
+                result = result & buckets[0]
+            else:
+                result = set().union(*(result & b for b in buckets))
+        return result
+
+    # --- Persistence ---
+
+    def capture(self):
+        """Point-in-time copy of the index for persisting outside the store lock."""
+        return {t: list(ids) for t, ids in self.task_postings.items()}, list(self.task_keys), list(self.note_lines)
+
+    @classmethod
+    def save(cls, filepath, captured, stamp):
+        """Writes a captured index atomically, tagged with the store position it reflects."""
+        task_postings, task_keys, note_lines = captured
+        state = {
+            "version": cls.FORMAT_VERSION,
+            "stamp": stamp,
+            "tasks": task_postings,
+            "keys": task_keys,
+            "notes": note_lines
+        }
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # dumps() uses the C encoder; dump() would encode chunk by chunk in Python
+            f.write(json.dumps(state, separators=(",", ":"), ensure_ascii=False))
+        os.replace(tmp_path, filepath)
+
+    def load(self, filepath, stamp):
+        """Loads a persisted index if it matches stamp. Returns False if a rebuild is needed."""
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("version") != self.FORMAT_VERSION or state.get("stamp") != stamp:
+            return False
+
+        self.__init__()
+        self.task_postings = {token: set(ids) for token, ids in state["tasks"].items()}
+        self.task_keys = state["keys"]
+        self.note_lines = state["notes"]
+        for line_no, line in enumerate(self.note_lines):
+            for token in set(tokenize(line)):
+                self.note_postings.setdefault(token, set()).add(line_no)
+        self.vocab = sorted(self.task_postings.keys() | self.note_postings.keys())
+        return True
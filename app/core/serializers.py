@@ -0,0 +1,130 @@
+import io
+import json
+import marshal
+import struct
+import zlib
+
+
+class JsonSerializer:
+    """
+    Indented JSON; the historical titanium_data.json format.
+    Written as a stream with one task per line, so a large store is never
+    held in memory as one encoded string.
+    """
+
+    name = "json"
+    INDENT = 4
+    SEPARATORS = (", ", ": ")
+    BATCH = 1000 # Tasks encoded per write() call
+
+    def encode(self, data):
+        buffer = io.BytesIO()
+        self.dump(data, buffer)
+        return buffer.getvalue()
+
+    def dump(self, data, f):
+        """Writes data to a binary file; data["tasks"] may be any iterable, e.g. a generator."""
+        nl, pad = ("\n", " " * self.INDENT) if self.INDENT else ("", "")
+        key_sep = self.SEPARATORS[1]
+        enc = json.JSONEncoder(separators=self.SEPARATORS, ensure_ascii=False).encode
+
+        fields = [f"{pad}{enc(key)}{key_sep}{enc(value)}" for key, value in data.items() if key != "tasks"]
+        f.write(("{" + nl + ("," + nl).join(fields)).encode("utf-8"))
+        if "tasks" in data:
+            lead = "," + nl if fields else ""
+            f.write(f'{lead}{pad}"tasks"{key_sep}['.encode("utf-8"))
+            row_sep = "," + nl + pad * 2
+            written = False
+            batch = []
+            for task in data["tasks"]:
+                batch.append(enc(task))
+                if len(batch) == self.BATCH:
+                    f.write(((row_sep if written else nl + pad * 2) + row_sep.join(batch)).encode("utf-8"))
+                    written, batch = True, []
+            if batch:
+                f.write(((row_sep if written else nl + pad * 2) + row_sep.join(batch)).encode("utf-8"))
+                written = True
+            f.write(((nl + pad if written else "") + "]").encode("utf-8"))
+        f.write((nl + "}").encode("utf-8"))
+
+    def decode(self, raw):
+        return json.loads(raw.decode("utf-8"))
+
+    def check(self, raw):
+        """Cheap integrity check without a full parse: a complete document ends with '}'."""
+        return raw[-64:].rstrip().endswith(b"}")
+
+
+class CompactJsonSerializer(JsonSerializer):
+    """JSON without indentation or spaces; readable by anything that reads the old format."""
+
+    name = "json-compact"
+    INDENT = 0
+    SEPARATORS = (",", ":")
+
+
+class BinarySerializer:
+    """
+    Length-prefixed binary snapshot built from the stdlib only.
+    Layout: MAGIC, then a struct header (format version, payload length,
+    CRC32), then the payload as marshal data. marshal handles the plain
+    dict/list/str/int values of the store, and encodes and decodes several
+    times faster than json. The header allows a file to be validated
+    without decoding it.
+    """
+
+    name = "binary"
+    MAGIC = b"TDB\x00"
+    HEADER = struct.Struct("<HQI") # format version, payload length, crc32
+    FORMAT_VERSION = 1
+    MARSHAL_VERSION = 4
+
+    def encode(self, data):
+        if "tasks" in data and not isinstance(data["tasks"], list):
+            data = dict(data, tasks=list(data["tasks"])) # marshal needs the whole structure up front
+        payload = marshal.dumps(data, self.MARSHAL_VERSION)
+        header = self.HEADER.pack(self.FORMAT_VERSION, len(payload), zlib.crc32(payload))
+        return self.MAGIC + header + payload
+
+    def dump(self, data, f):
+        f.write(self.encode(data))
+
+    def decode(self, raw):
+        payload = self._payload(raw)
+        return marshal.loads(payload)
+
+    def check(self, raw):
+        try:
+            self._payload(raw)
+        except ValueError:
+            return False
+        return True
+
+    def _payload(self, raw):
+        start = len(self.MAGIC) + self.HEADER.size
+        if len(raw) < start or not raw.startswith(self.MAGIC):
+            raise ValueError("not a binary snapshot")
+        version, length, crc = self.HEADER.unpack_from(raw, len(self.MAGIC))
+        if version != self.FORMAT_VERSION:
+            raise ValueError(f"unsupported binary snapshot version {version}")
+        payload = raw[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            raise ValueError("truncated or corrupt binary snapshot")
+        return payload
+
+
+SERIALIZERS = {s.name: s for s in (JsonSerializer(), CompactJsonSerializer(), BinarySerializer())}
+
+
+def get_serializer(name):
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown data format: {name}") from None
+
+
+def detect_serializer(raw):
+    """Picks the serializer that can read raw, by its leading bytes."""
+    if raw.startswith(BinarySerializer.MAGIC):
+        return SERIALIZERS["binary"]
+    return SERIALIZERS["json"]
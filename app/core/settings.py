@@ -9,6 +9,20 @@ APP_AUTHOR = "Commander"
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATA_FILE = os.path.join(BASE_DIR, "titanium_data.json")
 
+# Persistence
+DATA_BACKEND = "json" # "json" (snapshot + journal) or "sqlite" (titanium_data.db)
+DATA_FLUSH_INTERVAL = 2.0 # Max seconds a write-behind mutation waits before hitting disk
+DATA_POLL_INTERVAL = 2.0 # Seconds between idle checks for writes by other instances
+DATA_FORMAT = "json" # Snapshot encoding for the json backend: "json", "json-compact" or "binary"
+DATA_BACKUP_GENERATIONS = 3 # Previous snapshots kept as titanium_data.json.1 .. .N
+ARCHIVE_AFTER_DAYS = 7 # Completed tasks older than this move to titanium_data.archive.jsonl.gz
+ARCHIVE_CHECK_INTERVAL = 3600.0 # Seconds between archive runs by the write-behind flusher (also run at startup)
+OPLOG_NOTES_INTERVAL = 60.0 # Notes edits are logged for sync at most this often (and before every sync and save)
+UNDO_BUDGET = 1024 * 1024 # Bytes of undo/redo steps kept in memory before the oldest are dropped
+UNDO_MAX_STEPS = 100 # Undo steps kept at most
+NOTES_HISTORY_INTERVAL = 60.0 # Notes edits closer together than this are folded into one history version
+NOTES_HISTORY_BUDGET = 512 * 1024 # Bytes of notes history kept before the oldest versions are evicted
+
 # Theme configuration
 THEME_MODE = "Dark"
 COLOR_THEME = "blue"
@@ -37,6 +51,12 @@ ENABLE_SPOTIFY = True
 ENABLE_WEATHER = True
 ENABLE_SYSTEM_MONITOR = True
 
+# Media
+MEDIA_BACKEND = "auto" # "spotify" (AppleScript, macOS), "mpris" (D-Bus, Linux; needs jeepney) or "auto"
+MPRIS_PLAYER = "spotify" # MPRIS player to follow when several are running (end of its bus name)
+ARTWORK_CACHE_DIR = os.path.join(BASE_DIR, "artwork_cache") # Pre-sized album artwork, keyed by URL hash
+ARTWORK_CACHE_BYTES = 20 * 1024 * 1024 # Least recently used artwork is evicted beyond this
+
 # Weather Location (Ormond, Melbourne)
 WEATHER_LAT = -37.9038
 WEATHER_LON = 145.0396
@@ -0,0 +1,432 @@
+import json
+import os
+import shutil
+import sqlite3
+from app.core.serializers import detect_serializer, get_serializer
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # No advisory locking (e.g. Windows); a single instance is assumed
+
+
+class FileLock:
+    """
+    Exclusive advisory lock (fcntl.flock) on a sidecar file, shared by every
+    process that opens the same store. Held around each read-modify-write
+    cycle: catching up with other writers, appending, compacting.
+    Not reentrant; callers in one process already serialize on io_lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _file_signature(path):
+    """(inode, size, mtime) of path, or None if missing: changes whenever the file is replaced or written."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class FileStorage:
+    """
+    Snapshot + append-only journal persistence for the DataManager.
+    Every mutation is appended to the journal as one compact JSON line, so a
+    write costs the size of the change rather than the size of the store.
+    The journal is folded back into the snapshot once it outgrows it.
+
+    Snapshots are written to a temp file, fsynced and renamed over the
+    primary, and the previous generations are kept as <file>.1 .. <file>.N
+    (newest first) so a damaged primary can be recovered from.
+
+    The snapshot encoding is pluggable (see app/core/serializers.py) and is
+    detected from the file itself on load, so switching formats needs no
+    migration step. The journal is always compact JSON lines.
+
+    Several processes may share the files: writers hold file_lock and first
+    call sync() to pick up what others wrote. changed() is a stat-only check
+    (snapshot inode/size/mtime, journal size) for polling between writes.
+    """
+
+    # Never compact before the journal reaches this many bytes
+    MIN_COMPACT_BYTES = 64 * 1024
+
+    def __init__(self, filepath, generations=3, data_format="json"):
+        self.filepath = filepath
+        self.journal_path = filepath + ".journal"
+        self.generations = generations
+        self.serializer = get_serializer(data_format)
+        self.seq = 0               # Seq of the last record written to the journal
+        self.base_seq = 0          # Seq folded into the snapshot that was loaded
+        self.journal_bytes = 0     # Journal bytes read or written so far, i.e. our read offset
+        self.snapshot_bytes = 0
+        self.file_lock = FileLock(filepath + ".lock")
+        self._snapshot_sig = None  # Signature of the snapshot as last loaded or written by us
+
+    def exists(self):
+        return any(os.path.exists(path) for path in self._generation_paths())
+
+    def changed(self):
+        """True if another process replaced the snapshot or appended to the journal since we last looked."""
+        if _file_signature(self.filepath) != self._snapshot_sig:
+            return True
+        try:
+            return os.path.getsize(self.journal_path) != self.journal_bytes
+        except OSError:
+            return self.journal_bytes != 0
+
+    def sync(self):
+        """
+        Catches up with other processes. Caller holds file_lock.
+        Returns None if nothing changed, ("records", records) if only the
+        journal grew, or ("reload", (snapshot, records)) after a compaction.
+        """
+        if _file_signature(self.filepath) != self._snapshot_sig:
+            return "reload", self.load()
+        records = self._read_journal(self.journal_bytes)
+        return ("records", records) if records else None
+
+    def _generation_paths(self):
+        """Snapshot paths, newest first: the primary, then <file>.1 .. <file>.N."""
+        return [self.filepath] + [f"{self.filepath}.{i}" for i in range(1, self.generations + 1)]
+
+    def load(self):
+        """
+        Reads the newest valid snapshot and the journal tail that is newer than it.
+        Returns (snapshot_dict, records). Raises if no generation is readable.
+        In the common case only the primary file is read.
+
+        The journal continues the primary it was written after: its records
+        must start right after the snapshot's journal_seq. After recovering
+        an older generation they do not, and replaying them would apply later
+        changes without the ones in between, so the journal is set aside as
+        <journal>.orphaned instead and its changes are reported as lost.
+        """
+        snapshot = None
+        errors = []
+        for path in self._generation_paths():
+            if not os.path.exists(path):
+                continue
+            try:
+                snapshot = self._read_snapshot(path)
+            except (ValueError, IOError) as e:
+                errors.append(f"{os.path.basename(path)}: {e}")
+                if path == self.filepath:
+                    # Keep the damaged primary out of the rotation but on disk for inspection
+                    os.replace(self.filepath, self.filepath + ".corrupt")
+                continue
+            if path != self.filepath:
+                self._restore_generation(path)
+            break
+
+        if snapshot is None:
+            raise IOError("No readable snapshot generation (" + "; ".join(errors) + ")")
+
+        self._snapshot_sig = _file_signature(self.filepath)
+        self.snapshot_bytes = self._snapshot_sig[1]
+        self.seq = self.base_seq = snapshot.get("journal_seq", 0)
+        records = self._read_journal()
+        if records and records[0]["seq"] != self.base_seq + 1:
+            self._orphan_journal(records)
+            records = []
+        return snapshot, records
+
+    def _read_snapshot(self, path):
+        with open(path, "rb") as f:
+            raw = f.read()
+        serializer = detect_serializer(raw)
+        # Cheap integrity check first: a truncated file is rejected without a full decode
+        if not serializer.check(raw):
+            raise ValueError("truncated snapshot")
+        snapshot = serializer.decode(raw)
+        if not isinstance(snapshot, dict):
+            raise ValueError("snapshot is not an object")
+        return snapshot
+
+    def _restore_generation(self, path):
+        """Promotes a backup generation to primary."""
+        print(f"[FileStorage] Recovering data from {os.path.basename(path)}")
+        shutil.copy2(path, self.filepath)
+
+    def _orphan_journal(self, records):
+        """Moves aside a journal that does not continue the loaded snapshot."""
+        print(f"[FileStorage] Journal records {records[0]['seq']}..{records[-1]['seq']} do not follow the recovered "
+              f"snapshot (seq {self.base_seq}); their changes are lost, the journal is kept as "
+              f"{os.path.basename(self.journal_path)}.orphaned")
+        os.replace(self.journal_path, self.journal_path + ".orphaned")
+        self.seq = self.base_seq
+        self.journal_bytes = 0
+
+    def _read_journal(self, offset=0):
+        """Returns journal records (from offset on) newer than self.seq, dropping a torn tail."""
+        records = []
+        if not os.path.exists(self.journal_path):
+            self.journal_bytes = 0
+            return records
+
+        good_offset = offset
+        with open(self.journal_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Partial line from a crash mid-append; everything after it is garbage
+                    break
+                good_offset += len(line)
+                if record.get("seq", 0) > self.seq:
+                    records.append(record)
+                    self.seq = record["seq"]
+
+        if good_offset < os.path.getsize(self.journal_path):
+            print(f"[FileStorage] Truncating torn journal tail at byte {good_offset}")
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_offset)
+        self.journal_bytes = good_offset
+        return records
+
+    def append(self, records):
+        """Stamps records with sequence numbers and appends them to the journal."""
+        lines = []
+        for record in records:
+            self.seq += 1
+            record["seq"] = self.seq
+            lines.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        with open(self.journal_path, "ab") as f:
+            f.write(payload)
+        self.journal_bytes += len(payload)
+
+    def needs_compaction(self):
+        return self.journal_bytes > max(self.MIN_COMPACT_BYTES, self.snapshot_bytes)
+
+    def write_snapshot(self, data):
+        """
+        Atomically writes the full store and resets the journal.
+        The snapshot records the last folded seq, so replaying a journal that
+        survived a crash before the reset cannot apply a record twice.
+        """
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, "wb") as f:
+            self.serializer.dump(dict(data, journal_seq=self.seq), f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._rotate_generations()
+        os.replace(tmp_path, self.filepath)
+        self._fsync_dir()
+        self._snapshot_sig = _file_signature(self.filepath)
+        self.snapshot_bytes = self._snapshot_sig[1]
+
+        with open(self.journal_path, "wb"):
+            pass
+        self.journal_bytes = 0
+
+    def _rotate_generations(self):
+        """Shifts <file>.i to <file>.i+1 and links the current primary in as <file>.1."""
+        if self.generations < 1 or not os.path.exists(self.filepath):
+            return
+        paths = self._generation_paths()
+        for i in range(self.generations - 1, 0, -1):
+            if os.path.exists(paths[i]):
+                os.replace(paths[i], paths[i + 1])
+        if os.path.exists(paths[1]):
+            os.remove(paths[1])
+        try:
+            # A hard link keeps the primary in place, so there is no moment without one
+            os.link(self.filepath, paths[1])
+        except OSError:
+            shutil.copy2(self.filepath, paths[1])
+
+    def close(self):
+        self.file_lock.close() # Every write opens and closes its own file handle
+
+    def _fsync_dir(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.filepath)), os.O_RDONLY)
+        except OSError:
+            return # Directories cannot be opened on every platform (e.g. Windows)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class SqliteStorage:
+    """
+    SQLite persistence for the DataManager (stdlib sqlite3, WAL mode).
+    Tasks live in a table keyed by id and every journal record becomes a
+    single-row statement, so a mutation never touches unrelated rows.
+    Scalar settings are stored as JSON values in a key/value table.
+    Reads are served from DataManager's in-memory state, which also holds
+    unwritten write-behind changes, so the table has no secondary indexes.
+
+    SQLite serializes concurrent writers itself; file_lock additionally makes
+    catch-up plus append atomic across processes, and changed() compares
+    PRAGMA data_version, which moves only when another connection commits.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT,
+            completed_at TEXT,
+            priority TEXT NOT NULL DEFAULT 'normal'
+        );
+        CREATE TABLE IF NOT EXISTS kv (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    TASK_COLUMNS = ("id", "text", "done", "created_at", "completed_at", "priority")
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.seq = 0
+        self.base_seq = 0
+        self._existed = os.path.exists(filepath)
+        # Access is serialized by the DataManager locks, so sharing across threads is safe
+        self.conn = sqlite3.connect(filepath, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.file_lock = FileLock(filepath + ".lock")
+        self._data_version = self._read_data_version()
+
+    def exists(self):
+        return self._existed
+
+    def _read_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed(self):
+        return self._read_data_version() != self._data_version
+
+    def sync(self):
+        """Catches up with other processes (see FileStorage.sync); any foreign commit means a reload."""
+        if not self.changed():
+            return None
+        return "reload", self.load()
+
+    def load(self):
+        """Returns (snapshot_dict, records); the database is always current, so records is empty."""
+        self._data_version = self._read_data_version()
+        snapshot = {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM kv")}
+        snapshot["tasks"] = [self._row_to_task(row) for row in self.conn.execute(
+            "SELECT id, text, done, created_at, completed_at, priority FROM tasks ORDER BY id"
+        )]
+        self.seq = self.base_seq = snapshot.pop("journal_seq", 0)
+        return snapshot, []
+
+    def append(self, records):
+        """Applies journal records as one SQLite transaction."""
+        with self.conn:
+            for record in records:
+                self.seq += 1
+                record["seq"] = self.seq
+                self._execute_record(record)
+            self._put("journal_seq", self.seq)
+
+    def _execute_record(self, record):
+        kind = record["op"]
+        if kind == "add_task":
+            task = record["task"]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tasks (id, text, done, created_at, completed_at, priority) VALUES (?, ?, ?, ?, ?, ?)",
+                self._task_to_row(task)
+            )
+        elif kind == "delete_task":
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (record["id"],))
+        elif kind == "update_task":
+            fields = {k: v for k, v in record["fields"].items() if k in self.TASK_COLUMNS and k != "id"}
+            if fields:
+                assignments = ", ".join(f"{k} = ?" for k in fields)
+                values = [int(v) if k == "done" else v for k, v in fields.items()]
+                self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", values + [record["id"]])
+        elif kind == "set":
+            self._put(record["key"], record["value"])
+
+    def needs_compaction(self):
+        return False
+
+    def write_snapshot(self, data):
+        """
+        Persists the scalar keys and checkpoints the WAL.
+        Task rows are already current because every change goes through append().
+        """
+        with self.conn:
+            for key, value in data.items():
+                if key != "tasks":
+                    self._put(key, value)
+            self._put("journal_seq", self.seq)
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self._existed = True
+
+    def insert_tasks(self, tasks):
+        """
+        Inserts and commits one chunk of a bulk import (task dicts), which the
+        oplog already holds. next_task_id is only persisted by the snapshot
+        that ends the import, which a reload after a crash does not need: it
+        claims the IDs of the rows it finds. Caller holds the DataManager io_lock.
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO tasks (id, text, done, created_at, completed_at, priority) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._task_to_row(t) for t in tasks)
+            )
+
+    def replace_all(self, data):
+        """Replaces the whole database with data; used for the one-shot JSON migration."""
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self.conn.executemany(
+                "INSERT INTO tasks (id, text, done, created_at, completed_at, priority) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._task_to_row(t) for t in data.get("tasks", []))
+            )
+            self.conn.execute("DELETE FROM kv")
+        self.write_snapshot(data)
+
+    def close(self):
+        self.conn.close()
+        self.file_lock.close()
+
+    def _put(self, key, value):
+        self.conn.execute(
+            "INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+
+    def _task_to_row(self, task):
+        return (
+            task["id"], task["text"], int(task["done"]),
+            task["created_at"], task["completed_at"], task["priority"]
+        )
+
+    def _row_to_task(self, row):
+        task = dict(zip(self.TASK_COLUMNS, row))
+        task["done"] = bool(task["done"])
+        return task
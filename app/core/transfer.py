@@ -0,0 +1,119 @@
+"""
+Streaming task import/export formats (CSV and JSON Lines).
+
+Everything here works row by row on generators, so files of any size
+pass through in constant memory. DataManager.import_tasks and
+export_tasks drive these helpers against the live store.
+"""
+
+import csv
+import json
+import os
+import re
+
+TASK_FIELDS = ("id", "text", "done", "created_at", "completed_at", "priority")
+FORMATS = ("csv", "jsonl")
+
+_TRUE = {"1", "true", "yes", "y", "x", "done"}
+_FALSE = {"", "0", "false", "no", "n"}
+_TIME_RE = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}$")
+
+
+def detect_format(stream, fmt=None):
+    """Explicit fmt, else the stream's file extension, else JSON Lines."""
+    if fmt is None:
+        ext = os.path.splitext(getattr(stream, "name", "") or "")[1].lower()
+        fmt = "csv" if ext == ".csv" else "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown task format: {fmt} (expected one of {', '.join(FORMATS)})")
+    return fmt
+
+
+def read_rows(stream, fmt):
+    """
+    Yields (line_no, row) pairs from a text stream. Rows are dicts, or a
+    string saying why the line could not be parsed; validate_row rejects
+    those, so one malformed line is skipped instead of ending the import.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # The reader resumes on the next line; line_num is not advanced past the bad one
+                yield reader.line_num + 1, f"malformed CSV: {e}"
+                continue
+            yield reader.line_num, row
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else "not a JSON object"
+
+
+def validate_row(row):
+    """
+    Returns a task record (JSON schema, without an id) for an imported row.
+    Raises ValueError with a short reason if the row cannot be imported.
+    Timestamps must be "YYYY-MM-DD HH:MM"; they are parsed by Task.from_dict.
+    """
+    if isinstance(row, str):
+        raise ValueError(row) # Unparseable; see read_rows
+    text = row.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("missing text")
+    done = _parse_bool(row.get("done"))
+    priority = row.get("priority") or "normal"
+    if not isinstance(priority, str):
+        raise ValueError(f"invalid priority: {priority!r}")
+    return {
+        "text": text.strip(),
+        "done": done,
+        "created_at": _parse_time(row.get("created_at"), "created_at"),
+        "completed_at": _parse_time(row.get("completed_at"), "completed_at") if done else None,
+        "priority": priority.strip().lower()
+    }
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    key = str(value).strip().lower()
+    if key in _TRUE:
+        return True
+    if key in _FALSE:
+        return False
+    raise ValueError(f"invalid done flag: {value!r}")
+
+
+def _parse_time(value, field):
+    # Shape only; the date itself is checked when the record becomes a Task (cached parse)
+    if value in (None, ""):
+        return None
+    if not isinstance(value, str) or not _TIME_RE.match(value.strip()):
+        raise ValueError(f"invalid {field}: {value!r} (expected YYYY-MM-DD HH:MM)")
+    return value.strip()
+
+
+def write_rows(stream, records, fmt):
+    """Writes task records (JSON schema dicts) to a text stream. Returns the row count."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=TASK_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+        return count
+    for record in records:
+        stream.write(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+        count += 1
+    return count
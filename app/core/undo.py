@@ -0,0 +1,100 @@
+import json
+from collections import deque
+
+TASK_OPS = ("add_task", "delete_task", "update_task")
+
+
+def command_scope(command):
+    """"tasks" if every op of a command changes tasks, else "settings" (it changes a setting)."""
+    if all(op["op"] in TASK_OPS or op["op"] == "noop" for op, _ in command):
+        return "tasks"
+    return "settings"
+
+
+class UndoLog:
+    """
+    Bounded undo/redo stacks of store commands.
+    A command is the list of (op, inverse_op) pairs made by one user action
+    (one mutator call or one transaction), in apply order. Undoing applies
+    the inverses in reverse; redoing applies the ops again. Both are
+    ordinary journal ops, so they persist like any other mutation.
+
+    Every command has a scope (see command_scope), and undo/redo can be
+    limited to one, so the tasks card's undo never reverts a settings save
+    made after it. Scopes touch disjoint state, so a new command only
+    invalidates what could be redone in its own scope.
+
+    The undo stack is a ring buffer: once the commands on both stacks
+    exceed budget_bytes (measured as encoded JSON) or max_steps, the oldest
+    undo steps are dropped.
+    """
+
+    def __init__(self, budget_bytes=1024 * 1024, max_steps=100):
+        self.budget_bytes = budget_bytes
+        self.max_steps = max_steps
+        self._undo = deque() # (command, size, scope), oldest first
+        self._redo = []      # (command, size, scope), most recently undone last
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._undo)
+
+    def can_undo(self, scope=None):
+        return self._newest(self._undo, scope) is not None
+
+    def can_redo(self, scope=None):
+        return self._newest(self._redo, scope) is not None
+
+    def record(self, command):
+        """Pushes a new user action; it invalidates everything in its scope that could be redone."""
+        scope = command_scope(command)
+        kept = [entry for entry in self._redo if entry[2] != scope]
+        self._bytes -= sum(size for _, size, entry_scope in self._redo if entry_scope == scope)
+        self._redo = kept
+        size = len(json.dumps(command, separators=(",", ":"), ensure_ascii=False))
+        self._undo.append((command, size, scope))
+        self._bytes += size
+        while self._undo and (self._bytes > self.budget_bytes or len(self._undo) > self.max_steps):
+            _, dropped, _ = self._undo.popleft()
+            self._bytes -= dropped
+
+    def pop_undo(self, scope=None):
+        """Moves the newest command (of scope, if given) to the redo stack and returns it (None if none)."""
+        entry = self._take(self._undo, scope)
+        if entry is None:
+            return None
+        self._redo.append(entry)
+        return entry[0]
+
+    def pop_redo(self, scope=None):
+        """Moves the most recently undone command (of scope, if given) back to the undo stack and returns it."""
+        entry = self._take(self._redo, scope)
+        if entry is None:
+            return None
+        self._undo.append(entry)
+        return entry[0]
+
+    def _newest(self, stack, scope):
+        """Index of the newest entry of scope (any scope if None) in stack, or None."""
+        for i in range(len(stack) - 1, -1, -1):
+            if scope is None or stack[i][2] == scope:
+                return i
+        return None
+
+    def _take(self, stack, scope):
+        i = self._newest(stack, scope)
+        if i is None:
+            return None
+        entry = stack[i]
+        del stack[i]
+        return entry
+
+    def remap_task(self, old_id, new_id):
+        """Points recorded ops at a task's new ID (see DataManager._move_local_task)."""
+        for command, _, _ in list(self._undo) + self._redo:
+            for pair in command:
+                for op in pair:
+                    if op["op"] == "add_task" and op["task"]["id"] == old_id:
+                        op["task"]["id"] = new_id
+                    elif op["op"] in ("delete_task", "update_task") and op["id"] == old_id:
+                        op["id"] = new_id
@@ -0,0 +1,183 @@
+import certifi
+import hashlib
+import os
+import ssl
+import threading
+import urllib.request
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image
+from app.core import settings
+
+
+class ArtworkCache:
+    """
+    Album artwork on disk, so a track seen before costs no download.
+
+    Entries are keyed by the SHA-1 of the artwork URL. A miss downloads
+    the image once, decodes it and renders every size in `sizes` (square,
+    LANCZOS), saved as <key>-<size>.jpg. A hit is one read of a small
+    pre-rendered file: no download, no decode of the original, no resize.
+
+    The cache is capped at `max_bytes`; least recently used entries go
+    first. Recency is the files' mtime, which a hit refreshes, so it
+    survives restarts. Concurrent requests for one URL (e.g. the music
+    widget and the media page on a track change) share one download.
+    `stats` counts hits, misses and evictions.
+    """
+
+    SIZES = (60, 400)
+    JPEG_QUALITY = 90
+    TIMEOUT = 10.0
+
+    def __init__(self, directory=settings.ARTWORK_CACHE_DIR, max_bytes=settings.ARTWORK_CACHE_BYTES, sizes=SIZES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sizes = tuple(sorted(sizes, reverse=True))
+        self.lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,    # Downloads, successful or not
+            "evictions": 0, # Entries removed to stay under max_bytes
+            "bytes": 0      # On disk
+        }
+        self._entries = None # key -> bytes on disk, least recently used first; scanned on first use
+        self._inflight = {}  # key -> Event set when its download finishes
+        # certifi's CA bundle, as in weather_service: python.org macOS builds have no system store.
+        # Built once, since loading the bundle per download is slow.
+        self._ssl = ssl.create_default_context(cafile=certifi.where())
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def get(self, url, size):
+        """
+        The artwork at url as a size x size PIL image (size is one of
+        `sizes`), from the cache or downloaded into it. Returns None if it
+        cannot be fetched or decoded.
+        """
+        if size not in self.sizes:
+            raise ValueError(f"No {size}px variant; cached sizes are {self.sizes}")
+        key = self.key(url)
+        while True:
+            with self.lock:
+                self._load_index()
+                waiting = self._inflight.get(key)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                elif waiting is None:
+                    self._inflight[key] = threading.Event()
+                    self.stats["misses"] += 1
+                    break
+            if waiting is not None:
+                waiting.wait() # Another thread is downloading it
+                continue
+            image = self._read(key, size)
+            if image is not None:
+                with self.lock:
+                    self.stats["hits"] += 1
+                return image
+            with self.lock:
+                self._drop(key) # Deleted or damaged on disk; download it again
+        try:
+            images = self._download(url)
+            if images is not None:
+                self._store(key, images)
+        finally:
+            with self.lock:
+                self._inflight.pop(key).set()
+        return images[size] if images is not None else None
+
+    def _path(self, key, size):
+        return os.path.join(self.directory, f"{key}-{size}.jpg")
+
+    def _read(self, key, size):
+        path = self._path(key, size)
+        try:
+            image = Image.open(path)
+            image.load()
+            os.utime(path)
+            return image
+        except (OSError, SyntaxError, ValueError):
+            return None
+
+    def _download(self, url):
+        """Fetches and renders every size of the artwork at url; None on failure."""
+        try:
+            with urllib.request.urlopen(url, context=self._ssl, timeout=self.TIMEOUT) as u:
+                raw = u.read()
+            image = Image.open(BytesIO(raw))
+            image.draft("RGB", (self.sizes[0], self.sizes[0])) # Lets JPEG decode at a reduced scale
+            image = image.convert("RGB")
+        except Exception as e:
+            print(f"[ArtworkCache] Cannot fetch {url}: {e}")
+            return None
+        images = {}
+        for size in self.sizes: # Largest first; each smaller size is rendered from the previous one
+            image = image.resize((size, size), Image.Resampling.LANCZOS)
+            images[size] = image
+        return images
+
+    def _store(self, key, images):
+        total = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for size, image in images.items():
+                path = self._path(key, size)
+                tmp_path = path + ".tmp"
+                image.save(tmp_path, "JPEG", quality=self.JPEG_QUALITY)
+                os.replace(tmp_path, path)
+                total += os.path.getsize(path)
+        except OSError as e:
+            print(f"[ArtworkCache] Cannot store artwork: {e}")
+            with self.lock:
+                self._drop(key)
+            return
+        with self.lock:
+            self._entries[key] = total
+            self.stats["bytes"] += total
+            self._evict()
+
+    def _load_index(self):
+        """Scans the cache directory once; entries are ordered by their files' latest mtime."""
+        if self._entries is not None:
+            return
+        found = {} # key -> [bytes, latest mtime]
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            key, _, rest = name.partition("-")
+            if not rest.endswith(".jpg"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entry = found.setdefault(key, [0, 0.0])
+            entry[0] += st.st_size
+            entry[1] = max(entry[1], st.st_mtime)
+        ordered = sorted(found.items(), key=lambda item: item[1][1])
+        self._entries = OrderedDict((key, size) for key, (size, _) in ordered)
+        self.stats["bytes"] = sum(self._entries.values())
+        self._evict()
+
+    def _evict(self):
+        while self.stats["bytes"] > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        """Forgets an entry and deletes its files (lock held)."""
+        self.stats["bytes"] -= self._entries.pop(key, 0)
+        for size in self.sizes:
+            try:
+                os.remove(self._path(key, size))
+            except OSError:
+                pass
+
+
+# The shared instance used by the UI
+cache = ArtworkCache()
@@ -0,0 +1,171 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+def closed_track(title):
+    """The track shown while no player is available."""
+    return {
+        "title": title,
+        "artist": "--",
+        "album": "--",
+        "position": 0,
+        "duration": 100,
+        "playing": False,
+        "closed": True
+    }
+
+
+class MediaBackend(ABC):
+    """
+    Common interface of the media player backends MediaHub hands out.
+
+    A backend keeps `current_track` (title, artist, album, artwork_url,
+    position and duration in seconds, playing) up to date while started,
+    and calls every callback with it when something changes. How it learns
+    about changes is up to the backend: SpotifyService polls AppleScript,
+    MprisBackend listens for D-Bus signals.
+
+    Transport commands never block the caller. They are queued for the
+    backend's worker thread and coalesced with commands still waiting
+    there: two play/pauses cancel out, and consecutive skips add up to one
+    skip by their sum (next, next, prev is a skip by 1). current_track is
+    updated optimistically right away (play state flipped, or position 0
+    after a skip); the worker's next status read, which follows the
+    commands, replaces it with the real state. Reads that complete while
+    commands are still waiting are dropped, so they cannot undo the
+    optimistic state.
+
+    Subclasses implement start_polling(), stop_polling(), _wake_worker()
+    and _send_command(), run _run_commands() in their worker before
+    reading the status, and report each status they read through
+    _publish().
+    """
+
+    DRIFT_TOLERANCE = 1.5 # Seconds a reported position may differ from the extrapolated one before it counts as a seek
+
+    def __init__(self):
+        self.running = False
+        self.current_track = {
+            "title": "Not playing",
+            "artist": "Unknown Artist",
+            "album": "Unknown Album",
+            "position": 0,
+            "duration": 0,
+            "playing": False
+        }
+        self.polled_at = time.monotonic() # When current_track["position"] was read
+        self.callbacks = []
+        self.command_stats = {
+            "requested": 0, # Command calls (button clicks)
+            "sent": 0       # Commands sent to the player after coalescing
+        }
+        self._commands = [] # Waiting for the worker: ["toggle", 1] or ["skip", step]
+        self._commands_lock = threading.Lock()
+
+    def add_callback(self, func):
+        self.callbacks.append(func)
+
+    @abstractmethod
+    def start_polling(self):
+        """Starts following the player in the background."""
+
+    @abstractmethod
+    def stop_polling(self):
+        """Stops following the player and releases its resources."""
+
+    def position(self):
+        """The current playback position in seconds, extrapolated from the last read while playing."""
+        track, polled_at = self.current_track, self.polled_at
+        pos = track["position"]
+        if track["playing"]:
+            pos += time.monotonic() - polled_at
+        return min(pos, track["duration"]) if track["duration"] else pos
+
+    # --- Actions ---
+
+    def play_pause(self):
+        self._queue_command("toggle", 1)
+
+    def next_track(self):
+        self._queue_command("skip", 1)
+
+    def prev_track(self):
+        self._queue_command("skip", -1)
+
+    def _queue_command(self, kind, step):
+        with self._commands_lock:
+            self.command_stats["requested"] += 1
+            last = self._commands[-1] if self._commands else None
+            if last is None or last[0] != kind:
+                self._commands.append([kind, step])
+            elif kind == "toggle":
+                self._commands.pop()
+            else:
+                last[1] += step
+                if last[1] == 0:
+                    self._commands.pop()
+        self._show_optimistic(kind)
+        self._wake_worker()
+
+    def _show_optimistic(self, kind):
+        track = dict(self.current_track)
+        if track.get("closed"):
+            return
+        if kind == "toggle":
+            track["position"] = self.position()
+            track["playing"] = not track["playing"]
+        else:
+            track["position"] = 0
+            track["playing"] = True
+        self.polled_at = time.monotonic()
+        self.current_track = track
+        self._notify()
+
+    def _run_commands(self):
+        """Sends the waiting commands (in the worker thread)."""
+        with self._commands_lock:
+            commands, self._commands = self._commands, []
+        for kind, step in commands:
+            try:
+                self._send_command(kind, step)
+            except Exception as e:
+                print(f"[{type(self).__name__}] Command {kind} {step} failed: {e}")
+        return bool(commands)
+
+    @abstractmethod
+    def _wake_worker(self):
+        """Makes the worker run the waiting commands soon."""
+
+    @abstractmethod
+    def _send_command(self, kind, step):
+        """Makes the player toggle play/pause ("toggle"), or skip `step` tracks (negative: back)."""
+
+    def _publish(self, new_track, read_at=None):
+        """
+        Makes new_track (with its position as of read_at, default now) the
+        current track, and notifies the callbacks if it changed. Returns
+        True if they were notified. A status read while commands are
+        waiting is stale and dropped (returns False).
+        """
+        if self._commands:
+            return False
+        changed = self._changed(self.current_track, new_track)
+        self.polled_at = time.monotonic() if read_at is None else read_at
+        self.current_track = new_track
+        if changed:
+            self._notify()
+        return changed
+
+    def _changed(self, old, new):
+        """True if new differs from old in more than the expected progress of the position."""
+        if any(old.get(key) != new.get(key) for key in new if key != "position"):
+            return True
+        return abs(self.position() - new["position"]) > self.DRIFT_TOLERANCE
+
+    def _notify(self):
+        for func in self.callbacks:
+            try:
+                func(self.current_track)
+            except:
+                pass
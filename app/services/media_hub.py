@@ -0,0 +1,100 @@
+import sys
+import threading
+from app.core import settings
+from app.services.mpris_backend import MprisBackend
+from app.services.spotify_service import SpotifyService
+
+
+class MediaHub:
+    """
+    Process-wide registry of media services, so every widget showing the
+    player shares one service (one polling thread, one script helper)
+    instead of each creating its own.
+
+    subscribe() hands out the shared service (a MediaBackend) for a
+    backend, settings.MEDIA_BACKEND by default, creating and starting it
+    for the first subscriber; every status update is fanned out to all
+    subscribers. The service is reference counted by its subscribers and
+    stopped when the last one unsubscribes.
+    """
+
+    FACTORIES = {
+        "spotify": SpotifyService,
+        "mpris": MprisBackend
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._services = {}    # backend -> service
+        self._subscribers = {} # backend -> [callback]
+
+    @staticmethod
+    def resolve(backend=None):
+        """
+        The backend name to use for `backend`, resolving None and "auto":
+        MPRIS on Linux when a session bus is reachable, otherwise Spotify's
+        AppleScript interface (macOS).
+        """
+        backend = backend or settings.MEDIA_BACKEND
+        if backend == "auto":
+            return "mpris" if sys.platform.startswith("linux") and MprisBackend.available() else "spotify"
+        return backend
+
+    def subscribe(self, callback, backend=None):
+        """
+        Registers callback(track) for a backend's updates and returns the
+        shared service (for commands such as play_pause). If the service is
+        already running, callback immediately gets the current track.
+        """
+        backend = self.resolve(backend)
+        with self.lock:
+            service = self._services.get(backend)
+            started = service is None
+            if started:
+                if backend not in self.FACTORIES:
+                    raise ValueError(f"Unknown media backend: {backend}")
+                service = self.FACTORIES[backend]()
+                service.add_callback(lambda track: self._fan_out(backend, track))
+                self._services[backend] = service
+                self._subscribers[backend] = []
+            self._subscribers[backend].append(callback)
+        if started:
+            service.start_polling()
+        else:
+            self._deliver([callback], service.current_track)
+        return service
+
+    def unsubscribe(self, callback, backend=None):
+        """Detaches callback; stops the service once nobody is subscribed."""
+        backend = self.resolve(backend)
+        with self.lock:
+            subscribers = self._subscribers.get(backend)
+            if not subscribers or callback not in subscribers:
+                return
+            subscribers.remove(callback)
+            if subscribers:
+                return
+            service = self._services.pop(backend)
+            del self._subscribers[backend]
+        service.stop_polling()
+
+    def subscriber_count(self, backend=None):
+        backend = self.resolve(backend)
+        with self.lock:
+            return len(self._subscribers.get(backend, ()))
+
+    def _fan_out(self, backend, track):
+        with self.lock:
+            subscribers = list(self._subscribers.get(backend, ()))
+        self._deliver(subscribers, track)
+
+    def _deliver(self, subscribers, track):
+        for callback in subscribers:
+            try:
+                callback(track)
+            except Exception as e:
+                print(f"[MediaHub] Error in subscriber: {e}")
+
+
+# The shared instance used by the UI
+hub = MediaHub()
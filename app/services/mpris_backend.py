@@ -0,0 +1,249 @@
+import os
+import queue
+import threading
+from app.core import settings
+from app.services.media_backend import MediaBackend, closed_track
+try:
+    import jeepney
+    import jeepney.io.threading
+except ImportError:
+    jeepney = None
+
+MPRIS_PREFIX = "org.mpris.MediaPlayer2."
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+PLAYER_IFACE = "org.mpris.MediaPlayer2.Player"
+PROPERTIES_IFACE = "org.freedesktop.DBus.Properties"
+COMMANDS = "commands" # Queued next to the signals to make the listener run the waiting commands
+
+
+class MprisBackend(MediaBackend):
+    """
+    The Linux MediaBackend: follows a media player through its MPRIS
+    interface on the D-Bus session bus. Requires jeepney.
+
+    Instead of polling, a listener thread subscribes to the player's
+    PropertiesChanged and Seeked signals and to NameOwnerChanged for MPRIS
+    names, so it does no work while nothing happens. Between signals,
+    position() extrapolates the position (MPRIS does not signal its
+    progress); the position is only read when the track or play state
+    changes.
+
+    The listener thread is also the command worker. Commands are sent
+    without waiting for their replies (a skip by n is n pipelined Next or
+    Previous calls, MPRIS has no skip by n), followed by a full read of the
+    player's properties. The player handles calls in order, so the read
+    sees their effect; signals it sent before that read are skipped.
+
+    The player whose name ends in `player` (e.g. "spotify") is followed if
+    it is running, otherwise the first MPRIS player found; players coming
+    and going are picked up. `bus` is "SESSION" or a D-Bus address, e.g. a
+    private bus running tools/fake_mpris_player.py.
+    """
+
+    CALL_TIMEOUT = 2.0
+
+    def __init__(self, bus="SESSION", player=settings.MPRIS_PLAYER):
+        super().__init__()
+        self.bus = bus
+        self.player = player
+        self.stats = {
+            "signals": 0,      # Signals received from the bus
+            "calls": 0,        # Method calls made, reads and commands alike
+            "notifications": 0
+        }
+        self._events = queue.Queue()
+        self._router = None
+        self._name = None   # Well-known name of the followed player
+        self._owner = None  # Its unique connection name, the sender of its signals
+        self._props = {}    # Its Player properties, unwrapped
+        self._synced_serial = 0 # Serial of its reply to the last full read; its older signals are stale
+
+    @staticmethod
+    def available():
+        """True if jeepney is installed and there is a session bus to talk to."""
+        return jeepney is not None and bool(os.environ.get("DBUS_SESSION_BUS_ADDRESS"))
+
+    def start_polling(self):
+        """Starts the listener thread."""
+        if not self.running:
+            self.running = True
+            thread = threading.Thread(target=self._listen, daemon=True)
+            thread.start()
+
+    def stop_polling(self):
+        """Stops the listener thread and closes the bus connection."""
+        self.running = False
+        self._events.put(None)
+
+    def _listen(self):
+        try:
+            conn = jeepney.io.threading.open_dbus_connection(self.bus)
+        except Exception as e:
+            print(f"[MprisBackend] Cannot connect to D-Bus: {e}")
+            self._show_closed()
+            self.running = False
+            return
+        router = jeepney.io.threading.DBusRouter(conn)
+        bus = jeepney.io.threading.Proxy(jeepney.message_bus, router, timeout=self.CALL_TIMEOUT)
+        rules = [
+            jeepney.MatchRule(type="signal", interface=PROPERTIES_IFACE, member="PropertiesChanged", path=MPRIS_PATH),
+            jeepney.MatchRule(type="signal", interface=PLAYER_IFACE, member="Seeked", path=MPRIS_PATH),
+            jeepney.MatchRule(type="signal", sender="org.freedesktop.DBus", interface="org.freedesktop.DBus",
+                              member="NameOwnerChanged")
+        ]
+        rules[0].add_arg_condition(0, PLAYER_IFACE)
+        rules[2].add_arg_condition(0, MPRIS_PREFIX.rstrip("."), kind="namespace")
+        filters = [router.filter(rule, queue=self._events) for rule in rules]
+        try:
+            # Subscribe before the first read, so no change in between is missed
+            for rule in rules:
+                self._call(bus.AddMatch, rule)
+            self._router = router
+            self._follow(bus)
+            while self.running:
+                msg = self._events.get()
+                if msg is None:
+                    continue
+                try:
+                    if msg is COMMANDS:
+                        self._run_commands()
+                        self._resync()
+                        continue
+                    self.stats["signals"] += 1
+                    self._handle(bus, msg)
+                except (jeepney.DBusErrorResponse, TimeoutError) as e:
+                    print(f"[MprisBackend] Error reading {self._name}: {e}")
+                    self._follow(bus)
+        except Exception as e:
+            print(f"[MprisBackend] Listener stopped: {e}")
+            self._show_closed()
+        finally:
+            self.running = False
+            self._router = None
+            for handle in filters:
+                handle.close()
+            router.close()
+            conn.close()
+
+    def _handle(self, bus, msg):
+        fields = msg.header.fields
+        member = fields.get(jeepney.HeaderFields.member)
+        if member == "NameOwnerChanged":
+            name, _, new_owner = msg.body
+            if name == self._name or (new_owner and self._prefers(name)) or self._name is None:
+                self._follow(bus)
+            return
+        if fields.get(jeepney.HeaderFields.sender) != self._owner:
+            return # Another player
+        if msg.header.serial < self._synced_serial:
+            return # Sent before the last full read, which covered it
+        if member == "Seeked":
+            self._publish(self._track(msg.body[0] / 1e6))
+            return
+        _, changed, invalidated = msg.body
+        self._props.update((key, value) for key, (_, value) in changed.items())
+        if invalidated:
+            self._read_props()
+        if "Position" in changed:
+            position = changed["Position"][1] / 1e6
+        elif "Metadata" in changed or "PlaybackStatus" in changed:
+            position = self._read_position()
+        else:
+            position = self.position()
+        self._publish(self._track(position))
+
+    def _prefers(self, name):
+        return bool(self.player) and name.startswith(MPRIS_PREFIX + self.player)
+
+    def _choose_player(self, bus):
+        players = sorted(name for name in self._call(bus.ListNames)[0] if name.startswith(MPRIS_PREFIX))
+        preferred = [name for name in players if self._prefers(name)]
+        return (preferred or players or [None])[0]
+
+    def _follow(self, bus):
+        """(Re)chooses the player to follow and reads its full state."""
+        self._name = self._choose_player(bus)
+        self._owner = None
+        self._props = {}
+        self._synced_serial = 0
+        if self._name is None:
+            self._show_closed()
+            return
+        try:
+            self._owner = self._call(bus.GetNameOwner, self._name)[0]
+            self._read_props()
+            self._publish(self._track(self._read_position()))
+        except (jeepney.DBusErrorResponse, TimeoutError):
+            # Quit while being read; its NameOwnerChanged brings us back here
+            self._owner = None
+            self._show_closed()
+
+    def _resync(self):
+        """Reads the followed player's full state again."""
+        if self._owner is not None:
+            self._read_props()
+            self._publish(self._track(self._read_position()))
+
+    def _address(self):
+        return jeepney.DBusAddress(MPRIS_PATH, bus_name=self._owner, interface=PLAYER_IFACE)
+
+    def _read_props(self):
+        reply = self._get(jeepney.Properties(self._address()).get_all())
+        self._synced_serial = reply.header.serial
+        props = jeepney.wrappers.unwrap_msg(reply)[0]
+        self._props = {key: value for key, (_, value) in props.items()}
+
+    def _read_position(self):
+        try:
+            reply = self._get(jeepney.Properties(self._address()).get("Position"))
+            return jeepney.wrappers.unwrap_msg(reply)[0][1] / 1e6
+        except jeepney.DBusErrorResponse:
+            return 0 # Position is optional
+
+    def _call(self, method, *args):
+        self.stats["calls"] += 1
+        return method(*args)
+
+    def _get(self, msg):
+        self.stats["calls"] += 1
+        return self._router.send_and_get_reply(msg, timeout=self.CALL_TIMEOUT)
+
+    def _track(self, position):
+        """current_track for the followed player's properties, at the given position (seconds)."""
+        meta = {key: value for key, (_, value) in self._props.get("Metadata", {}).items()}
+        artist = meta.get("xesam:artist")
+        if isinstance(artist, (list, tuple)):
+            artist = ", ".join(artist)
+        duration = meta.get("mpris:length", 0) / 1e6
+        return {
+            "title": meta.get("xesam:title") or "Unknown Title",
+            "artist": artist or "Unknown Artist",
+            "album": meta.get("xesam:album") or "Unknown Album",
+            "artwork_url": meta.get("mpris:artUrl") or None,
+            "position": min(position, duration) if duration else position,
+            "duration": duration,
+            "playing": self._props.get("PlaybackStatus") == "Playing"
+        }
+
+    def _show_closed(self):
+        self._publish(closed_track("No Media Player"))
+
+    def _publish(self, new_track, read_at=None):
+        changed = super()._publish(new_track, read_at)
+        if changed:
+            self.stats["notifications"] += 1
+        return changed
+
+    # --- Actions ---
+
+    def _wake_worker(self):
+        self._events.put(COMMANDS)
+
+    def _send_command(self, kind, step):
+        if self._owner is None:
+            return
+        method = "PlayPause" if kind == "toggle" else "Next" if step > 0 else "Previous"
+        for _ in range(1 if kind == "toggle" else abs(step)):
+            self.stats["calls"] += 1
+            self.command_stats["sent"] += 1
+            self._router.send(jeepney.new_method_call(self._address(), method))
@@ -0,0 +1,231 @@
+import os
+import select
+import subprocess
+import threading
+import time
+
+# Consecutive requests the helper must fail before ScriptHost gives up on
+# it and runs every later script with a one-shot `osascript -e`
+MAX_HELPER_FAILURES = 3
+
+# Runs inside `osascript -l JavaScript`: reads framed AppleScript sources
+# from stdin, runs each with NSAppleScript and writes a framed result.
+# Request:  "<id> <byte length>\n<source>"
+# Response: "<id> ok|err <byte length>\n<result text or error message>"
+HELPER_JS = r'''
+ObjC.import("Foundation");
+var input = $.NSFileHandle.fileHandleWithStandardInput;
+var output = $.NSFileHandle.fileHandleWithStandardOutput;
+var buffer = $.NSMutableData.alloc.init;
+var NEWLINE = $("\n").dataUsingEncoding($.NSUTF8StringEncoding);
+var BOOLEAN_TYPES = [0x626f6f6c, 0x74727565, 0x66616c73]; // 'bool', 'true', 'fals'
+
+function take(n) {
+    while (buffer.length < n) {
+        var chunk = input.availableData;
+        if (chunk.length === 0) { $.exit(0); }
+        buffer.appendData(chunk);
+    }
+    var range = $.NSMakeRange(0, n);
+    var data = buffer.subdataWithRange(range);
+    buffer.replaceBytesInRangeWithBytesLength(range, null, 0);
+    return $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+}
+
+function takeLine() {
+    var found;
+    while ((found = buffer.rangeOfDataOptionsRange(NEWLINE, 0, $.NSMakeRange(0, buffer.length))).location > buffer.length) {
+        var chunk = input.availableData;
+        if (chunk.length === 0) { $.exit(0); }
+        buffer.appendData(chunk);
+    }
+    var line = take(found.location);
+    take(1);
+    return line;
+}
+
+function run(source) {
+    var error = Ref();
+    var result = $.NSAppleScript.alloc.initWithSource(source).executeAndReturnError(error);
+    if (!result || result.isNil()) {
+        return ["err", ObjC.unwrap(error[0].objectForKey("NSAppleScriptErrorMessage")) || "error"];
+    }
+    var text = result.stringValue;
+    if (text && !text.isNil()) { return ["ok", text.js]; }
+    // Booleans print as true/false like osascript's; other non-text results as nothing
+    if (BOOLEAN_TYPES.indexOf(result.descriptorType) >= 0) { return ["ok", result.booleanValue ? "true" : "false"]; }
+    return ["ok", ""];
+}
+
+while (true) {
+    var header = takeLine().split(" ");
+    var reply = run(take(parseInt(header[1], 10)));
+    var body = $(reply[1]).dataUsingEncoding($.NSUTF8StringEncoding);
+    output.writeData($(header[0] + " " + reply[0] + " " + body.length + "\n").dataUsingEncoding($.NSUTF8StringEncoding));
+    output.writeData(body);
+}
+'''
+
+
+class ScriptHost:
+    """
+    A long-lived osascript process that runs AppleScript on request, so a
+    script costs a pipe round trip instead of fork/exec plus interpreter
+    startup. Requests and responses are length-prefixed (see HELPER_JS)
+    and tagged with a request id, one at a time.
+
+    The helper is started on first use. If it dies, the request is retried
+    once in a fresh helper. A request that exceeds `timeout` seconds kills
+    the helper (the next request starts a new one) and returns None.
+    After MAX_HELPER_FAILURES failed requests in a row (e.g. HELPER_JS does
+    not run on this macOS), the helper is abandoned and each script runs
+    in its own `osascript -e`, as before the helper existed.
+
+    `executable` can point to a stand-in for osascript, such as
+    tools/fake_osascript.py, which speaks the same protocol.
+    """
+
+    def __init__(self, executable="osascript", timeout=5.0):
+        self.executable = executable
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.stats = {
+            "launches": 0, # Helper processes started
+            "requests": 0,
+            "timeouts": 0,
+            "crashes": 0,  # Helpers that died mid-request
+            "oneshots": 0  # Scripts run with `osascript -e` after the helper was abandoned
+        }
+        self._proc = None
+        self._buffer = b""
+        self._next_id = 1
+        self._closed = False
+        self._failures = 0 # Consecutive requests the helper failed
+        self.fallback = False
+
+    def run(self, script):
+        """
+        Runs one AppleScript. Returns its result text ("" if the script
+        raised an AppleScript error, like osascript's empty stdout), or
+        None if the helper could not run it (not installed, timed out).
+        """
+        with self.lock:
+            if self._closed:
+                return None
+            self.stats["requests"] += 1
+            if self.fallback:
+                return self._run_oneshot(script)
+            result = self._run_helper(script)
+            if result is not None:
+                self._failures = 0
+                return result
+            self._failures += 1
+            if self._failures >= MAX_HELPER_FAILURES:
+                self.fallback = True
+                self._stop()
+                return self._run_oneshot(script)
+            return None
+
+    def close(self):
+        """Stops the helper for good; later requests return None."""
+        with self.lock:
+            self._closed = True
+            self._stop()
+
+    def _run_helper(self, script):
+        for _ in range(2):
+            if not self._ensure_started():
+                return None
+            try:
+                return self._request(script)
+            except EOFError:
+                self.stats["crashes"] += 1
+                self._stop()
+            except TimeoutError:
+                self.stats["timeouts"] += 1
+                self._stop()
+                return None
+        return None
+
+    def _run_oneshot(self, script):
+        self.stats["oneshots"] += 1
+        try:
+            result = subprocess.run(
+                [self.executable, "-e", script], capture_output=True, timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            self.stats["timeouts"] += 1
+            return None
+        except OSError:
+            return None
+        output = result.stdout.decode("utf-8", "replace")
+        # osascript ends its output with a newline that the helper's replies don't have
+        return output[:-1] if output.endswith("\n") else output
+
+    def _ensure_started(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return True
+        self._stop()
+        try:
+            self._proc = subprocess.Popen(
+                [self.executable, "-l", "JavaScript", "-e", HELPER_JS],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+            )
+        except OSError:
+            return False
+        self.stats["launches"] += 1
+        return True
+
+    def _stop(self):
+        proc, self._proc = self._proc, None
+        self._buffer = b""
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        for pipe in (proc.stdin, proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def _request(self, script):
+        request_id = self._next_id
+        self._next_id += 1
+        payload = script.encode("utf-8")
+        try:
+            self._proc.stdin.write(f"{request_id} {len(payload)}\n".encode("ascii") + payload)
+        except (BrokenPipeError, OSError):
+            raise EOFError
+        deadline = time.monotonic() + self.timeout
+        while True:
+            header = self._read_until(b"\n", deadline).decode("ascii").split()
+            body = self._read_exactly(int(header[2]), deadline)
+            if int(header[0]) == request_id:
+                return body.decode("utf-8") if header[1] == "ok" else ""
+            # A reply to an older request (cannot normally happen: each one is awaited); skip it
+
+    def _read_until(self, marker, deadline):
+        while marker not in self._buffer:
+            self._fill(deadline)
+        line, _, self._buffer = self._buffer.partition(marker)
+        return line
+
+    def _read_exactly(self, n, deadline):
+        while len(self._buffer) < n:
+            self._fill(deadline)
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+    def _fill(self, deadline):
+        fd = self._proc.stdout.fileno()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            raise TimeoutError
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            raise EOFError
+        self._buffer += chunk
@@ -1,24 +1,70 @@
-import subprocess
 import threading
 import time
+from app.services.media_backend import MediaBackend, closed_track
+from app.services.script_host import ScriptHost
 
-class SpotifyService:
+# Separates the fields of the batched status record (ASCII unit separator,
+# which cannot appear in track metadata typed by a human)
+FIELD_SEP = "\x1f"
+
+# One script per poll: every field the widget shows, as one record
+STATUS_SCRIPT = '''
+if application "Spotify" is running then
+    tell application "Spotify"
+        set sep to character id 31
+        return "running" & sep & (player state as string) & sep & (name of current track as string) ¬
+            & sep & (artist of current track as string) & sep & (album of current track as string) ¬
+            & sep & (artwork url of current track as string) & sep & (player position as string) ¬
+            & sep & (duration of current track as string)
+    end tell
+else
+    return "closed"
+end if
+'''
+STATUS_FIELDS = ("running", "state", "title", "artist", "album", "artwork_url", "position", "duration")
+
+class SpotifyService(MediaBackend):
     """
-    Controls Spotify on macOS using AppleScript (osascript).
+    The macOS MediaBackend: controls Spotify using AppleScript (osascript).
     Requires Spotify desktop application to be installed.
+
+    Each poll reads the whole player status with one batched script
+    (STATUS_SCRIPT); if its output cannot be parsed (e.g. an older Spotify
+    without one of the properties), that poll falls back to one script per
+    field. get_poll_stats() reports process launches and latency per poll.
+
+    Scripts run in one long-lived osascript helper (see ScriptHost), so a
+    poll normally launches no process at all. `osascript` may name a
+    stand-in executable, e.g. tools/fake_osascript.py for testing on Linux.
+
+    Polling is adaptive: while playing, position() extrapolates the
+    playback position from a monotonic clock, so full polls only run every
+    PLAYING_INTERVAL seconds (and just after the track should end), every
+    PAUSED_INTERVAL when paused and CLOSED_INTERVAL when Spotify is closed.
+    The polling thread is also the command worker: a command wakes it to
+    run the command scripts (a coalesced skip by n is one script) and poll
+    right after. Callbacks fire only when the
+    track, play state or artwork changes, or the position jumps (a seek).
     """
-    
-    def __init__(self):
-        self.running = False
-        self.current_track = {
-            "title": "Not playing",
-            "artist": "Unknown Artist",
-            "album": "Unknown Album",
-            "position": 0,
-            "duration": 0,
-            "playing": False
+
+    PLAYING_INTERVAL = 5.0
+    PAUSED_INTERVAL = 10.0
+    CLOSED_INTERVAL = 30.0
+
+    def __init__(self, osascript="osascript"):
+        super().__init__()
+        self.host = ScriptHost(osascript)
+        self._wake = threading.Event()
+        self.poll_stats = {
+            "polls": 0,
+            "notifications": 0, # Polls that found a change and called back
+            "scripts": 0,       # Scripts run, polls and commands alike
+            "poll_launches": 0, # osascript processes started during polls
+            "fallbacks": 0,     # Polls that needed the per-field scripts
+            "last_launches": 0,
+            "last_ms": 0.0,
+            "total_ms": 0.0
         }
-        self.callbacks = []
 
     def start_polling(self):
         """Starts background thread to check Spotify state."""
@@ -27,56 +73,76 @@ class SpotifyService:
             thread = threading.Thread(target=self._poll_loop, daemon=True)
             thread.start()
 
-    def add_callback(self, func):
-        self.callbacks.append(func)
+    def stop_polling(self):
+        """Stops the polling thread and the script helper."""
+        self.running = False
+        self._wake.set()
+        self.host.close()
+
+    def poll_now(self):
+        """Makes the polling thread read the status right away."""
+        self._wake.set()
+
+    def get_poll_stats(self):
+        """Returns the poll counters plus per-poll averages (launches, milliseconds)."""
+        stats = dict(self.poll_stats, launches=self._launches(), helper=dict(self.host.stats))
+        polls = max(stats["polls"], 1)
+        stats["avg_launches"] = stats["poll_launches"] / polls
+        stats["avg_ms"] = stats["total_ms"] / polls
+        return stats
+
+    def _launches(self):
+        """osascript processes started so far: helpers, plus one per script once the helper is abandoned."""
+        return self.host.stats["launches"] + self.host.stats["oneshots"]
 
     def _poll_loop(self):
         while self.running:
             try:
+                self._run_commands()
                 self._update_status()
-                time.sleep(1) # Poll every second
+                delay = self._next_poll_delay()
             except Exception as e:
                 # print(f"Spotify Poll Error: {e}")
-                time.sleep(5)
+                delay = 5
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _wake_worker(self):
+        self.poll_now()
+
+    def _next_poll_delay(self):
+        track = self.current_track
+        if track["playing"]:
+            # Catch the track change soon after the current one should end
+            remaining = track["duration"] - self.position()
+            return max(0.5, min(self.PLAYING_INTERVAL, remaining + 0.5))
+        if track["title"] == "Spotify Closed":
+            return self.CLOSED_INTERVAL
+        return self.PAUSED_INTERVAL
+
+    def _run_raw(self, script):
+        """Executes an AppleScript command; returns its raw output, or None if osascript could not run it."""
+        self.poll_stats["scripts"] += 1
+        return self.host.run(script)
 
     def _run_script(self, script):
         """Executes an AppleScript command."""
-        try:
-            command = ['osascript', '-e', script]
-            result = subprocess.run(command, capture_output=True, text=True)
-            return result.stdout.strip()
-        except Exception as e:
-            # print(f"AppleScript Error: {e}")
-            return None
+        output = self._run_raw(script)
+        return output.strip() if output is not None else None
 
     def _update_status(self):
-        # Check if Spotify is running
-        is_running = self._run_script('application "Spotify" is running')
-        if is_running != "true":
-            new_track = {
-                "title": "Spotify Closed",
-                "artist": "--",
-                "album": "--",
-                "position": 0,
-                "duration": 100,
-                "playing": False
-            }
+        start = time.perf_counter()
+        launches = self._launches()
+        status = self._read_status()
+        if status is None:
+            self.poll_stats["fallbacks"] += 1
+            status = self._read_status_per_field()
+
+        if status["running"] != "true":
+            new_track = closed_track("Spotify Closed")
         else:
-            state = self._run_script('tell application "Spotify" to player state as string')
-            playing = (state == "playing")
-            
-            title = self._run_script('tell application "Spotify" to name of current track as string')
-            artist = self._run_script('tell application "Spotify" to artist of current track as string')
-            album = self._run_script('tell application "Spotify" to album of current track as string')
-            artwork_url = self._run_script('tell application "Spotify" to artwork url of current track as string')
-            
-            # Position and Duration are in seconds (or ms depending on API, usually seconds via AppleScript)
-            # AppleScript for position: user can get 'player position'
-            # AppleScript for duration: 'duration of current track' (ms)
-            
-            pos = self._run_script('tell application "Spotify" to player position as string')
-            dur = self._run_script('tell application "Spotify" to duration of current track as string')
-            
+            # Position is in seconds (with the locale's decimal comma), duration in ms
+            pos, dur = status["position"], status["duration"]
             try:
                 pos = float(pos.replace(',', '.')) if pos else 0
                 dur = int(dur) / 1000 if dur else 0 # duration is in ms
@@ -85,36 +151,69 @@ class SpotifyService:
                 dur = 1
 
             new_track = {
-                "title": title if title else "Unknown Title",
-                "artist": artist if artist else "Unknown Artist",
-                "album": album if album else "Unknown Album",
-                "artwork_url": artwork_url if artwork_url else None,
+                "title": status["title"] if status["title"] else "Unknown Title",
+                "artist": status["artist"] if status["artist"] else "Unknown Artist",
+                "album": status["album"] if status["album"] else "Unknown Album",
+                "artwork_url": status["artwork_url"] if status["artwork_url"] else None,
                 "position": pos,
                 "duration": dur,
-                "playing": playing
+                "playing": status["state"] == "playing"
             }
-        
-        # Only notify if changed significantly (or maybe every second to update progress bar)
-        self.current_track = new_track
-        self._notify()
 
-    def _notify(self):
-        for func in self.callbacks:
-            try:
-                func(self.current_track)
-            except:
-                pass
+        stats = self.poll_stats
+        stats["polls"] += 1
+        stats["last_launches"] = self._launches() - launches
+        stats["poll_launches"] += stats["last_launches"]
+        stats["last_ms"] = (time.perf_counter() - start) * 1000
+        stats["total_ms"] += stats["last_ms"]
 
-    # --- Actions ---
+        if self._publish(new_track):
+            stats["notifications"] += 1
+
+    def _read_status(self):
+        """
+        Reads every status field with one script.
+        Returns a dict of STATUS_FIELDS strings ("running" is "true" or
+        "false"), or None if the output was not a valid record.
+        """
+        output = self._run_raw(STATUS_SCRIPT)
+        if output is None:
+            return {"running": "false"} # osascript is unavailable or timed out; per-field calls would fail too
+        output = output.rstrip("\r\n")
+        if output == "closed":
+            return {"running": "false"}
+        fields = output.split(FIELD_SEP)
+        if len(fields) != len(STATUS_FIELDS) or fields[0] != "running":
+            return None
+        status = dict(zip(STATUS_FIELDS, (f.strip() for f in fields)))
+        status["running"] = "true"
+        return status
 
-    def play_pause(self):
-        self._run_script('tell application "Spotify" to playpause')
-        self._update_status()
+    def _read_status_per_field(self):
+        """The pre-batching path: one script per field."""
+        if self._run_script('application "Spotify" is running') != "true":
+            return {"running": "false"}
+        return {
+            "running": "true",
+            "state": self._run_script('tell application "Spotify" to player state as string'),
+            "title": self._run_script('tell application "Spotify" to name of current track as string'),
+            "artist": self._run_script('tell application "Spotify" to artist of current track as string'),
+            "album": self._run_script('tell application "Spotify" to album of current track as string'),
+            "artwork_url": self._run_script('tell application "Spotify" to artwork url of current track as string'),
+            "position": self._run_script('tell application "Spotify" to player position as string'),
+            "duration": self._run_script('tell application "Spotify" to duration of current track as string')
+        }
 
-    def next_track(self):
-        self._run_script('tell application "Spotify" to next track')
-        self._update_status()
+    # --- Actions ---
 
-    def prev_track(self):
-        self._run_script('tell application "Spotify" to previous track')
-        self._update_status()
+    def _send_command(self, kind, step):
+        if kind == "toggle":
+            script = 'tell application "Spotify" to playpause'
+        else:
+            command = "next track" if step > 0 else "previous track"
+            if abs(step) == 1:
+                script = f'tell application "Spotify" to {command}'
+            else:
+                script = f'tell application "Spotify"\n    repeat {abs(step)} times\n        {command}\n    end repeat\nend tell'
+        self.command_stats["sent"] += 1
+        self._run_script(script)
@@ -27,7 +27,7 @@ class Dashboard(ctk.CTk):
         self.configure(fg_color=Styles.BG_APP)
 
         # --- Data & State ---
-        self.db = DataManager(settings.DATA_FILE)
+        self.db = DataManager(settings.DATA_FILE, write_behind=True, backend=settings.DATA_BACKEND)
         self.current_page = None
 
         # --- Layout ---
@@ -80,7 +80,7 @@ class Dashboard(ctk.CTk):
         return frame
 
     def on_closing(self):
-        self.db.save()
+        self.db.close() # Final synchronous flush of write-behind state
         self.destroy()
 
 if __name__ == "__main__":
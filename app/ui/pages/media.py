@@ -1,9 +1,8 @@
 import customtkinter as ctk
-import urllib.request
 import threading
-from io import BytesIO
 from PIL import Image, ImageFilter
-from app.services.spotify_service import SpotifyService
+from app.services.artwork_cache import cache as artwork_cache
+from app.services.media_hub import hub as media_hub
 from app.ui.styles import Styles
 
 class MediaPage(ctk.CTkFrame):
@@ -13,8 +12,6 @@ class MediaPage(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="transparent")
         
-        self.spotify = SpotifyService()
-        self.spotify.add_callback(self.update_ui)
         self.last_art_url = None
         self.default_img = self._create_placeholder()
         
@@ -78,11 +75,17 @@ class MediaPage(ctk.CTkFrame):
         self.controls = ctk.CTkFrame(self.info_frame, fg_color="transparent")
         self.controls.pack(fill="x", pady=40)
         
-        self.btn_prev = self._make_btn("⏮", self.spotify.prev_track, 60)
-        self.btn_play = self._make_btn("▶", self.spotify.play_pause, 80, True)
-        self.btn_next = self._make_btn("⏭", self.spotify.next_track, 60)
-        
-        self.spotify.start_polling()
+        self.btn_prev = self._make_btn("⏮", lambda: self.spotify.prev_track(), 60)
+        self.btn_play = self._make_btn("▶", lambda: self.spotify.play_pause(), 80, True)
+        self.btn_next = self._make_btn("⏭", lambda: self.spotify.next_track(), 60)
+
+        # Shared with every other player view; polling starts with the first subscriber
+        self.spotify = media_hub.subscribe(self.update_ui)
+        self._tick_progress()
+
+    def destroy(self):
+        media_hub.unsubscribe(self.update_ui)
+        super().destroy()
 
     def _create_placeholder(self):
         img = Image.new('RGB', (400, 400), color='#222')
@@ -138,6 +141,15 @@ class MediaPage(ctk.CTkFrame):
         except Exception as e:
             pass
 
+    def _tick_progress(self):
+        """Moves the progress bar and elapsed time between polls, from the extrapolated position."""
+        dur = self.spotify.current_track["duration"]
+        if dur > 0:
+            pos = self.spotify.position()
+            self.progress.set(min(pos / dur, 1.0))
+            self.lbl_pos.configure(text=self._fmt_time(pos))
+        self.after(250, self._tick_progress)
+
     def _fmt_time(self, seconds):
         if not seconds: return "0:00"
         m = int(seconds // 60)
@@ -146,17 +158,10 @@ class MediaPage(ctk.CTkFrame):
 
     def _fetch_art(self, url):
         try:
-            # Bypass SSL for images too just in case
-            import ssl
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            with urllib.request.urlopen(url, context=ctx) as u:
-                raw = u.read()
-            
-            image = Image.open(BytesIO(raw))
-            image = image.resize((400, 400), Image.Resampling.LANCZOS)
+            # Pre-rendered at 400px by the cache, so no resize here
+            image = artwork_cache.get(url, 400)
+            if image is None or url != self.last_art_url:
+                return
             ctk_img = ctk.CTkImage(light_image=image, dark_image=image, size=(400, 400))
             
             self.art_label.configure(image=ctk_img)
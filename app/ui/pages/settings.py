@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from app.core.data_manager import SETTINGS_CHANGED
 from app.ui.styles import Styles
 
 class SettingsPage(ctk.CTkFrame):
@@ -62,6 +63,24 @@ class SettingsPage(ctk.CTkFrame):
             text_color=Styles.TEXT_SEC
         ).pack(pady=20)
 
+        self.db.subscribe(self._on_db_change)
+
+    def _on_db_change(self, event):
+        if event.kind == SETTINGS_CHANGED and event.key in ("username", "weather_location"):
+            self.after(0, lambda: self._reload_setting(event.key))
+
+    def _reload_setting(self, key):
+        if key == "username":
+            self.name_var.set(self.db.get_username())
+        else:
+            loc = self.db.get_weather_location()
+            self.lat_var.set(str(loc["lat"]))
+            self.lon_var.set(str(loc["lon"]))
+
+    def destroy(self):
+        self.db.unsubscribe(self._on_db_change)
+        super().destroy()
+
     def _add_section_header(self, text):
         container = ctk.CTkFrame(self.content, fg_color="transparent")
         container.pack(fill="x", pady=(20, 10))
@@ -101,15 +120,17 @@ class SettingsPage(ctk.CTkFrame):
 
     def save_settings(self):
         try:
-            # Save Name
-            new_name = self.name_var.get().strip()
-            if new_name:
-                self.db.set_username(new_name)
-            
-            # Save Weather
-            lat = float(self.lat_var.get())
-            lon = float(self.lon_var.get())
-            self.db.set_weather_location(lat, lon)
+            # One write for the whole form; invalid input rolls the name back too
+            with self.db.transaction():
+                # Save Name
+                new_name = self.name_var.get().strip()
+                if new_name:
+                    self.db.set_username(new_name)
+                
+                # Save Weather
+                lat = float(self.lat_var.get())
+                lon = float(self.lon_var.get())
+                self.db.set_weather_location(lat, lon)
             
             # Helper Feedback
             self.btn_save.configure(text="Saved!", fg_color=Styles.SECONDARY)
@@ -1,10 +1,9 @@
 import customtkinter as ctk
 import threading
 import time
-import urllib.request
-from io import BytesIO
 from PIL import Image, ImageOps, ImageFilter
-from app.services.spotify_service import SpotifyService
+from app.services.artwork_cache import cache as artwork_cache
+from app.services.media_hub import hub as media_hub
 from app.ui.styles import Styles
 
 class MusicPlayerWidget(ctk.CTkFrame):
@@ -15,8 +14,6 @@ class MusicPlayerWidget(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color=Styles.BG_CARD, corner_radius=Styles.RADIUS_L, border_width=1, border_color=Styles.BORDER_FOCUS)
         
-        self.spotify = SpotifyService()
-        self.spotify.add_callback(self.update_ui)
         self.last_art_url = None
         self.default_image = self._create_placeholder_image()
         
@@ -56,9 +53,9 @@ class MusicPlayerWidget(ctk.CTkFrame):
         self.controls_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.controls_frame.grid(row=0, column=2, padx=20, pady=20)
         
-        self.btn_prev = self._make_btn("⏮", self.spotify.prev_track)
-        self.btn_play = self._make_btn("▶", self.spotify.play_pause, size=40, highlight=True)
-        self.btn_next = self._make_btn("⏭", self.spotify.next_track)
+        self.btn_prev = self._make_btn("⏮", lambda: self.spotify.prev_track())
+        self.btn_play = self._make_btn("▶", lambda: self.spotify.play_pause(), size=40, highlight=True)
+        self.btn_next = self._make_btn("⏭", lambda: self.spotify.next_track())
 
         # 4. Progress (Bottom)
         self.progress = ctk.CTkProgressBar(
@@ -72,10 +69,14 @@ class MusicPlayerWidget(ctk.CTkFrame):
         self.progress.grid(row=1, column=1, columnspan=2, sticky="ew", padx=(0, 20), pady=(0, 20))
         self.progress.set(0)
 
-        # Start Services
-        self.spotify.start_polling()
+        # Start Services (shared with every other player view; polling starts with the first subscriber)
+        self.spotify = media_hub.subscribe(self.update_ui)
         self.start_progress_update()
 
+    def destroy(self):
+        media_hub.unsubscribe(self.update_ui)
+        super().destroy()
+
     def _create_placeholder_image(self):
         # Create a grey placeholder
         img = Image.new('RGB', (60, 60), color='#333333')
@@ -133,16 +134,10 @@ class MusicPlayerWidget(ctk.CTkFrame):
 
     def _fetch_art(self, url):
         try:
-            import ssl
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            
-            with urllib.request.urlopen(url, context=ctx) as u:
-                raw_data = u.read()
-            
-            image = Image.open(BytesIO(raw_data))
-            # Resize
+            # Pre-rendered at 60px by the cache; downloaded only the first time
+            image = artwork_cache.get(url, 60)
+            if image is None or url != self.last_art_url:
+                return # Failed, or the track changed meanwhile
             ctk_img = ctk.CTkImage(light_image=image, dark_image=image, size=(60, 60))
             
             # Update on main thread
@@ -152,4 +147,8 @@ class MusicPlayerWidget(ctk.CTkFrame):
             print(f"Art Fetch Error: {e}")
 
     def start_progress_update(self):
-        self.after(1000, self.start_progress_update)
+        """Advances the progress bar between polls from the service's extrapolated position (no script calls)."""
+        dur = self.spotify.current_track["duration"]
+        if dur > 0:
+            self.progress.set(min(self.spotify.position() / dur, 1.0))
+        self.after(250, self.start_progress_update)
@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from app.core.data_manager import NOTES_CHANGED
 from app.ui.styles import Styles
 
 class NotesWidget(ctk.CTkFrame):
@@ -42,11 +43,39 @@ class NotesWidget(ctk.CTkFrame):
         self.txt.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
         # Load
-        self.txt.insert("0.0", db.get_notes())
+        self._saved = db.get_notes() # Last text saved or loaded, to tell our own change events from foreign ones
+        self.txt.insert("0.0", self._saved)
         self.txt.bind("<KeyRelease>", self.save)
+        self.db.subscribe(self._on_db_change)
 
     def save(self, event=None):
-        content = self.txt.get("0.0", "end")
+        content = self.txt.get("0.0", "end-1c") # Without the newline Tk keeps at the end
+        if content == self._saved:
+            return # e.g. a cursor key
+        self._saved = content
         self.db.set_notes(content)
         self.save_lbl.configure(text="SAVING...", text_color=Styles.WARNING)
         self.after(1000, lambda: self.save_lbl.configure(text="SAVED", text_color=Styles.SECONDARY))
+
+    def _on_db_change(self, event):
+        if event.kind == NOTES_CHANGED:
+            self.after(0, self._reload_if_changed)
+
+    def _reload_if_changed(self):
+        text = self.db.get_notes()
+        if text == self._saved:
+            return # Our own save; the textbox has it already, maybe with newer keystrokes
+        self._saved = text
+        if text == self.txt.get("0.0", "end-1c"):
+            return
+        # A foreign change (sync, another instance, undo): keep the cursor and scroll position
+        cursor = self.txt.index("insert")
+        top = self.txt.yview()[0]
+        self.txt.delete("0.0", "end")
+        self.txt.insert("0.0", text)
+        self.txt.mark_set("insert", cursor)
+        self.txt.yview_moveto(top)
+
+    def destroy(self):
+        self.db.unsubscribe(self._on_db_change)
+        super().destroy()
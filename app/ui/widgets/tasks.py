@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from app.core.data_manager import TASK_ADDED, TASK_UPDATED, TASK_REMOVED, TASKS_RELOADED
 from app.ui.styles import Styles
 
 class TaskManagerWidget(ctk.CTkFrame):
@@ -33,6 +34,20 @@ class TaskManagerWidget(ctk.CTkFrame):
         )
         self.add_btn.pack(side="right")
 
+        # Undo (reverts the last task add/toggle/delete, e.g. an accidental ✕; never a settings save)
+        self.undo_btn = ctk.CTkButton(
+            self.header_frame,
+            text="↶",
+            width=30, height=30,
+            corner_radius=15,
+            fg_color="transparent",
+            hover_color=Styles.BG_CARD_HOVER,
+            text_color=Styles.TEXT_SEC,
+            font=("Arial", 18),
+            command=self.undo
+        )
+        self.undo_btn.pack(side="right", padx=(0, 5))
+
         # Input (Floating)
         self.input_entry = ctk.CTkEntry(
             self, 
@@ -51,7 +66,16 @@ class TaskManagerWidget(ctk.CTkFrame):
         self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color="transparent", label_text=None)
         self.scroll_frame.pack(fill="both", expand=True, padx=10, pady=(0, 20))
 
+        # Active rows first, completed rows below; each group in ID (creation) order
+        self.active_frame = ctk.CTkFrame(self.scroll_frame, fg_color="transparent")
+        self.active_frame.pack(fill="x")
+        self.done_frame = ctk.CTkFrame(self.scroll_frame, fg_color="transparent")
+        self.done_frame.pack(fill="x")
+        self.empty_lbl = ctk.CTkLabel(self.scroll_frame, text="All objectives complete.", text_color=Styles.TEXT_SEC)
+        self.rows = {}
+
         self.refresh_ui()
+        self.db.subscribe(self._on_db_change)
 
     def show_add(self):
         self.input_entry.focus_set()
@@ -61,28 +85,59 @@ class TaskManagerWidget(ctk.CTkFrame):
         if text:
             self.db.add_task(text)
             self.input_entry.delete(0, "end")
-            self.refresh_ui()
 
     def refresh_ui(self):
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
+        """Full rebuild; used on startup and after bulk changes. Other changes arrive as events."""
+        for row in self.rows.values():
+            row.destroy()
+        self.rows = {}
 
-        tasks = self.db.get_tasks()
-        sorted_tasks = sorted(tasks, key=lambda x: x["done"])
+        for t in self.db.get_tasks():
+            self.build_row(t)
+        self._update_empty_state()
 
-        if not tasks:
-            ctk.CTkLabel(self.scroll_frame, text="All objectives complete.", text_color=Styles.TEXT_SEC).pack(pady=40)
-            return
+    def _on_db_change(self, event):
+        # Changes may come from background threads; touch widgets on the Tk loop only
+        if event.kind in (TASK_ADDED, TASK_UPDATED, TASK_REMOVED):
+            self.after(0, lambda: self._apply_change(event))
+        elif event.kind == TASKS_RELOADED:
+            self.after(0, self.refresh_ui)
 
-        for t in sorted_tasks:
-            self.build_row(t)
+    def _apply_change(self, event):
+        old = self.rows.pop(event.task_id, None)
+        if old is not None:
+            old.destroy()
+        if event.kind != TASK_REMOVED:
+            task = self.db.get_task(event.task_id)
+            if task is not None:
+                self.build_row(task)
+        self._update_empty_state()
+
+    def _update_empty_state(self):
+        if self.rows:
+            self.empty_lbl.pack_forget()
+        else:
+            self.empty_lbl.pack(pady=40)
 
     def build_row(self, task):
-        row = ctk.CTkFrame(self.scroll_frame, fg_color="transparent", height=40)
-        row.pack(fill="x", pady=2, padx=5)
+        container = self.done_frame if task.done else self.active_frame
+        row = ctk.CTkFrame(container, fg_color="transparent", height=40)
+        row.task_id = task.id
+
+        # Keep ID order within the group: pack before the first row with a larger ID.
+        # New tasks have the largest ID, so the scan only runs when a row moves groups.
+        successor = None
+        siblings = container.pack_slaves()
+        if siblings and siblings[-1].task_id > task.id:
+            successor = next(w for w in siblings if w.task_id > task.id)
+        if successor is not None:
+            row.pack(fill="x", pady=2, padx=5, before=successor)
+        else:
+            row.pack(fill="x", pady=2, padx=5)
+        self.rows[task.id] = row
         
         # Checkbox
-        is_done = task["done"]
+        is_done = task.done
         chk_color = Styles.SECONDARY if is_done else Styles.BORDER_COLOR
         
         chk = ctk.CTkButton(
@@ -93,7 +148,7 @@ class TaskManagerWidget(ctk.CTkFrame):
             fg_color=chk_color, 
             hover_color=chk_color,
             font=("Arial", 14, "bold"),
-            command=lambda id=task["id"]: self.toggle(id)
+            command=lambda id=task.id: self.toggle(id)
         )
         chk.pack(side="left", padx=10)
         
@@ -101,7 +156,7 @@ class TaskManagerWidget(ctk.CTkFrame):
         text_color = Styles.TEXT_SEC if is_done else "white"
         font = (Styles.FONT_FAMILY, 14, "overstrike") if is_done else Styles.BODY
         
-        lbl = ctk.CTkLabel(row, text=task["text"], font=font, text_color=text_color, anchor="w")
+        lbl = ctk.CTkLabel(row, text=task.text, font=font, text_color=text_color, anchor="w")
         lbl.pack(side="left", fill="x", expand=True)
         
         # Delete
@@ -112,14 +167,19 @@ class TaskManagerWidget(ctk.CTkFrame):
             fg_color="transparent", 
             text_color="#FF3B30", 
             hover_color=Styles.BG_CARD_HOVER,
-            command=lambda id=task["id"]: self.delete(id)
+            command=lambda id=task.id: self.delete(id)
         )
         del_btn.pack(side="right")
 
     def toggle(self, id):
         self.db.toggle_task(id)
-        self.refresh_ui()
 
     def delete(self, id):
         self.db.delete_task(id)
-        self.refresh_ui()
+
+    def undo(self):
+        self.db.undo("tasks")
+
+    def destroy(self):
+        self.db.unsubscribe(self._on_db_change)
+        super().destroy()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The app is run from the repository root rather than installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.data_manager import DataManager # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh store in a temporary directory, closed after the test."""
+    db = DataManager(str(tmp_path / "data.json"))
+    yield db
+    db.close()
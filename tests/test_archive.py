@@ -0,0 +1,43 @@
+from app.core.archive import TaskArchive
+from app.core.data_manager import DataManager
+
+
+def texts(tasks):
+    return [t.text for t in tasks]
+
+
+def test_completed_tasks_move_to_the_archive(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("active")
+    db.toggle_task(db.add_task("done").id)
+    assert db.archive_completed_tasks(older_than_days=7) == 0 # Completed just now
+
+    assert db.archive_completed_tasks(older_than_days=-1) == 1
+    assert texts(db.get_tasks()) == ["active"]
+    assert texts(db.get_archived_tasks()) == ["done"]
+    assert db.get_task_stats() == {"active": 1, "completed": 0, "archived": 1, "total": 2}
+    db.undo("tasks") # Archiving is not an undo step: this reverts the toggle of a task now gone
+    assert texts(db.get_tasks()) == ["active"]
+    db.close()
+
+    db = DataManager(path)
+    assert texts(db.get_archived_tasks()) == ["done"]
+    db.close()
+
+
+def test_archive_keeps_one_copy_of_a_task_archived_twice(tmp_path):
+    archive = TaskArchive(str(tmp_path / "archive.jsonl.gz"))
+    task = {"id": 1, "text": "twice", "done": True}
+    archive.append([task])
+    archive.append([task, {"id": 2, "text": "other", "done": True}])
+    assert [t["id"] for t in TaskArchive(archive.filepath).get_tasks()] == [1, 2]
+
+
+def test_torn_archive_tail_keeps_earlier_batches(tmp_path):
+    archive = TaskArchive(str(tmp_path / "archive.jsonl.gz"))
+    archive.append([{"id": 1, "text": "kept", "done": True}])
+    archive.append([{"id": 2, "text": "torn", "done": True}])
+    with open(archive.filepath, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 10)
+    assert [t["id"] for t in TaskArchive(archive.filepath).get_tasks()] == [1]
@@ -0,0 +1,117 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image # noqa: E402
+
+from app.services.artwork_cache import ArtworkCache # noqa: E402
+
+
+def make_art(n):
+    image = Image.effect_noise((640, 640), 40 + n).convert("RGB")
+    buf = BytesIO()
+    Image.blend(image, Image.new("RGB", (640, 640), (n * 53 % 256, 90, 30)), 0.6).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="module")
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        art = {f"/art{n}.jpg": make_art(n) for n in range(4)}
+        served = []
+        gate = threading.Event()
+
+        def do_GET(self):
+            self.gate.wait(5)
+            body = self.art.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.served.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", Handler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def base(server):
+    url, handler = server
+    handler.served.clear()
+    handler.gate.set()
+    return url, handler
+
+
+def test_a_miss_renders_every_size_and_later_hits_read_the_file(tmp_path, base):
+    url, handler = base
+    cache = ArtworkCache(str(tmp_path), max_bytes=10 ** 7)
+    assert cache.get(url + "/art0.jpg", 400).size == (400, 400)
+    assert cache.get(url + "/art0.jpg", 60).size == (60, 60)
+    assert cache.stats["misses"] == 1 and cache.stats["hits"] == 1
+
+    restarted = ArtworkCache(str(tmp_path), max_bytes=10 ** 7)
+    assert restarted.get(url + "/art0.jpg", 60).size == (60, 60)
+    assert restarted.stats["hits"] == 1
+    assert handler.served == ["/art0.jpg"]
+
+
+def test_concurrent_requests_share_one_download(tmp_path, base):
+    url, handler = base
+    cache = ArtworkCache(str(tmp_path), max_bytes=10 ** 7)
+    handler.gate.clear() # Hold the download until every thread has asked
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(url + "/art1.jpg", 400))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    handler.gate.set()
+    for t in threads:
+        t.join()
+    assert len(results) == 5 and all(image is not None for image in results)
+    assert handler.served == ["/art1.jpg"]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, base):
+    url, _ = base
+    probe = ArtworkCache(str(tmp_path / "probe"))
+    probe.get(url + "/art0.jpg", 60)
+    entry = probe.stats["bytes"]
+
+    cache = ArtworkCache(str(tmp_path / "cache"), max_bytes=int(entry * 2.5))
+    cache.get(url + "/art0.jpg", 60)
+    cache.get(url + "/art1.jpg", 60)
+    cache.get(url + "/art0.jpg", 60) # art1 is now the least recently used
+    cache.get(url + "/art2.jpg", 60)
+    assert cache.stats["evictions"] == 1
+    assert not os.path.exists(cache._path(cache.key(url + "/art1.jpg"), 60))
+    assert os.path.exists(cache._path(cache.key(url + "/art0.jpg"), 60))
+
+
+def test_failures_return_none_and_damaged_files_are_fetched_again(tmp_path, base):
+    url, handler = base
+    cache = ArtworkCache(str(tmp_path), max_bytes=10 ** 7)
+    assert cache.get(url + "/missing.jpg", 60) is None
+    assert cache.get(url + "/missing.jpg", 60) is None # Not cached
+    assert cache.stats["misses"] == 2
+
+    cache.get(url + "/art3.jpg", 60)
+    with open(cache._path(cache.key(url + "/art3.jpg"), 60), "wb") as f:
+        f.write(b"not a jpeg")
+    assert cache.get(url + "/art3.jpg", 60).size == (60, 60)
+    assert handler.served == ["/art3.jpg", "/art3.jpg"]
+    with pytest.raises(ValueError):
+        cache.get(url + "/art3.jpg", 100)
@@ -0,0 +1,142 @@
+import multiprocessing
+import random
+import threading
+import time
+
+from app.core.data_manager import DataManager
+
+
+def test_threaded_writers_readers_and_saves(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path, write_behind=True, flush_interval=0.02)
+    errors = []
+    stop = threading.Event()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        mine = []
+        try:
+            for i in range(300):
+                roll = rng.random()
+                if roll < 0.5 or not mine:
+                    mine.append(db.add_task(f"w{seed}-{i}").id)
+                elif roll < 0.8:
+                    db.toggle_task(rng.choice(mine))
+                elif roll < 0.95:
+                    db.delete_task(mine.pop(rng.randrange(len(mine))))
+                else:
+                    db.set_notes(f"notes from writer {seed} at {i}")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            while not stop.is_set():
+                snap = db.snapshot()
+                ids = [t.id for t in snap.tasks]
+                assert len(ids) == len(set(ids)), "duplicate task id in snapshot"
+                db.get_tasks("active")
+        except Exception as e:
+            errors.append(e)
+
+    def saver():
+        try:
+            while not stop.wait(0.01):
+                db.save()
+        except Exception as e:
+            errors.append(e)
+
+    background = [threading.Thread(target=reader) for _ in range(2)] + [threading.Thread(target=saver)]
+    writers = [threading.Thread(target=writer, args=(seed,)) for seed in range(6)]
+    for t in background + writers:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    for t in background:
+        t.join()
+
+    expected = [t.to_dict() for t in db.get_tasks()]
+    notes = db.get_notes()
+    db.close()
+    assert errors == []
+
+    reopened = DataManager(path)
+    try:
+        assert [t.to_dict() for t in reopened.get_tasks()] == expected
+        assert reopened.get_notes() == notes
+    finally:
+        reopened.close()
+
+
+def test_snapshot_is_unaffected_by_later_writes(db):
+    db.add_task("first")
+    snap = db.snapshot()
+    db.add_task("second")
+    db.toggle_task(snap.tasks[0].id)
+    assert [(t.text, t.done) for t in snap.tasks] == [("first", False)]
+
+
+def _find_task(db, ids, text):
+    """Current ID of one of our tasks; another process may have moved it to a fresh ID."""
+    task = db.get_task(ids[text])
+    if task is None or task.text != text:
+        ids[text] = next(t.id for t in db.get_tasks() if t.text == text)
+    return ids[text]
+
+
+def _process_worker(path, proc, n, results):
+    try:
+        rng = random.Random(proc)
+        db = DataManager(path, write_behind=proc % 2 == 0, flush_interval=0.02)
+        ids, done = {}, {}
+        for i in range(n):
+            roll = rng.random()
+            if roll < 0.6 or not ids:
+                text = f"p{proc}-{i}"
+                ids[text] = db.add_task(text).id
+                done[text] = False
+            elif roll < 0.85:
+                text = rng.choice(list(ids))
+                with db.transaction():
+                    db.toggle_task(_find_task(db, ids, text))
+                done[text] = not done[text]
+            else:
+                text = rng.choice(list(ids))
+                with db.transaction():
+                    db.delete_task(_find_task(db, ids, text))
+                del ids[text], done[text]
+            if i % 25 == 0:
+                db.save() # Compact now and then so the others have to reload
+        time.sleep(0.3)
+        db.poll_changes()
+        foreign = sum(1 for t in db.get_tasks() if not t.text.startswith(f"p{proc}-"))
+        db.close()
+        results.put((proc, done, foreign))
+    except Exception as e:
+        results.put((proc, repr(e), 0))
+
+
+def test_processes_sharing_one_store(tmp_path):
+    path = str(tmp_path / "data.json")
+    DataManager(path).close()
+
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_process_worker, args=(path, p, 120, results)) for p in range(3)]
+    for p in procs:
+        p.start()
+    reports = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join()
+
+    expected = {}
+    for proc, done, foreign in reports:
+        assert isinstance(done, dict), f"process {proc} raised {done}"
+        assert foreign > 0, f"process {proc} never saw the others' tasks"
+        expected.update(done)
+
+    db = DataManager(path)
+    tasks = db.get_tasks()
+    db.close()
+    assert len({t.id for t in tasks}) == len(tasks)
+    assert {t.text: t.done for t in tasks} == expected
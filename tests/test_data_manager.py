@@ -0,0 +1,43 @@
+import pytest
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def test_transaction_rollback_restores_state(db):
+    db.add_task("kept")
+    next_id = db.data["next_task_id"]
+    stats = db.get_write_stats()
+
+    with pytest.raises(ValueError):
+        with db.transaction():
+            db.add_task("rolled back")
+            db.toggle_task(db.get_tasks()[0].id)
+            db.set_notes("rolled back")
+            raise ValueError
+    assert texts(db) == ["kept"]
+    assert not db.get_tasks()[0].done
+    assert db.get_notes() == ""
+    assert db.data["next_task_id"] == next_id
+    assert db.get_write_stats() == stats
+
+
+def test_nested_rollback_keeps_outer_changes(db):
+    with db.transaction():
+        db.add_task("outer")
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.add_task("inner")
+                raise ValueError
+    assert texts(db) == ["outer"]
+    db.undo() # The committed transaction is one undo step
+    assert texts(db) == []
+
+
+def test_persisting_calls_refuse_to_run_inside_a_transaction(db):
+    with db.transaction():
+        with pytest.raises(RuntimeError):
+            db.archive_completed_tasks()
+        with pytest.raises(RuntimeError):
+            db.version_vector()
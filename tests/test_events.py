@@ -0,0 +1,66 @@
+import pytest
+
+from app.core.data_manager import (
+    NOTES_CHANGED, SETTINGS_CHANGED, TASK_ADDED, TASK_REMOVED, TASK_UPDATED, ChangeEvent, DataManager
+)
+
+
+@pytest.fixture
+def events(db):
+    received = []
+    db.subscribe(received.append)
+    return received
+
+
+def test_each_mutation_publishes_one_event(db, events):
+    task = db.add_task("watched")
+    db.toggle_task(task.id)
+    db.delete_task(task.id)
+    db.set_notes("notes")
+    db.set_username("Ada")
+    assert events == [
+        ChangeEvent(TASK_ADDED, task.id, None),
+        ChangeEvent(TASK_UPDATED, task.id, None),
+        ChangeEvent(TASK_REMOVED, task.id, None),
+        ChangeEvent(NOTES_CHANGED, None, "notes"),
+        ChangeEvent(SETTINGS_CHANGED, None, "username")
+    ]
+
+
+def test_no_event_for_a_no_op(db, events):
+    db.delete_task(12345)
+    db.toggle_task(12345)
+    assert events == []
+
+
+def test_transaction_events_wait_for_commit_and_vanish_on_rollback(db, events):
+    with db.transaction():
+        kept = db.add_task("kept")
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.add_task("rolled back")
+                raise ValueError
+        assert events == []
+    assert events == [ChangeEvent(TASK_ADDED, kept.id, None)]
+
+
+def test_a_failing_subscriber_does_not_block_the_others(db, events):
+    def broken(event):
+        raise RuntimeError("subscriber bug")
+    db.unsubscribe(events.append)
+    db.subscribe(broken)
+    db.subscribe(events.append)
+    db.add_task("still delivered")
+    assert [e.kind for e in events] == [TASK_ADDED]
+
+
+def test_changes_from_another_instance_are_published_by_poll_changes(db, events):
+    other = DataManager(db.filepath)
+    try:
+        task = other.add_task("from elsewhere")
+        other.flush()
+    finally:
+        other.close()
+    assert db.poll_changes()
+    assert ChangeEvent(TASK_ADDED, task.id, None) in events
+    assert [t.text for t in db.get_tasks()] == ["from elsewhere"]
@@ -0,0 +1,76 @@
+import json
+import os
+
+from app.core.data_manager import DataManager
+from app.core.storage import FileStorage
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def journal_records(path):
+    with open(path + ".journal", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_mutations_are_appended_without_rewriting_the_snapshot(db):
+    path = db.storage.filepath
+    db.save()
+    snapshot = os.stat(path)
+
+    task = db.add_task("first")
+    db.toggle_task(task.id)
+    db.set_notes("hello")
+    db.flush()
+
+    assert os.stat(path).st_mtime_ns == snapshot.st_mtime_ns
+    assert [r["op"] for r in journal_records(path)] == ["add_task", "update_task", "set"]
+
+
+def test_reopening_replays_the_journal(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.save()
+    task = db.add_task("journal only")
+    db.toggle_task(task.id)
+    db.flush()
+    db.storage.close() # Not close(): its save would fold the journal into the snapshot
+
+    db = DataManager(path)
+    assert [(t.text, t.done) for t in db.get_tasks()] == [("journal only", True)]
+    db.close()
+
+
+def test_journal_is_compacted_once_it_outgrows_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileStorage, "MIN_COMPACT_BYTES", 1024)
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    for i in range(100):
+        db.add_task(f"task {i}")
+        db.flush()
+    assert os.path.exists(path + ".1") # Compacted at least twice
+    assert os.path.getsize(path + ".journal") <= max(1024, os.path.getsize(path))
+    db.storage.close()
+
+    db = DataManager(path)
+    assert len(db.get_tasks()) == 100
+    db.close()
+
+
+def test_stale_journal_is_not_applied_twice(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("once")
+    db.flush()
+    with open(path + ".journal", "rb") as f:
+        stale = f.read()
+    db.save()
+    db.storage.close()
+    # A crash between writing the snapshot and truncating the journal
+    with open(path + ".journal", "wb") as f:
+        f.write(stale)
+
+    db = DataManager(path)
+    assert texts(db) == ["once"]
+    db.close()
@@ -0,0 +1,75 @@
+from app.services.media_backend import MediaBackend, closed_track
+
+
+class RecordingBackend(MediaBackend):
+    """Queues commands like a real backend; the test plays the worker."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+        self.current_track = {"title": "Intro", "artist": "The Fakes", "album": "Stubbed Out",
+                              "position": 42.0, "duration": 215.0, "playing": True}
+
+    def start_polling(self):
+        self.running = True
+
+    def stop_polling(self):
+        self.running = False
+
+    def _wake_worker(self):
+        pass
+
+    def _send_command(self, kind, step):
+        self.command_stats["sent"] += 1
+        self.sent.append((kind, step))
+
+
+def test_skips_add_up_and_toggles_cancel_out():
+    backend = RecordingBackend()
+    backend.next_track()
+    backend.next_track()
+    backend.prev_track()
+    backend.play_pause()
+    backend.play_pause()
+    backend.next_track()
+    backend._run_commands()
+    # next, next, prev -> +1; the toggles cancel; the last next then joins the skip
+    assert backend.sent == [("skip", 2)]
+    assert backend.command_stats == {"requested": 6, "sent": 1}
+
+
+def test_opposite_skips_send_nothing():
+    backend = RecordingBackend()
+    backend.next_track()
+    backend.prev_track()
+    assert not backend._run_commands()
+    assert backend.sent == []
+
+
+def test_commands_show_optimistic_state_at_once():
+    backend = RecordingBackend()
+    seen = []
+    backend.add_callback(lambda track: seen.append(dict(track)))
+    backend.play_pause()
+    assert not backend.current_track["playing"]
+    assert backend.current_track["position"] >= 42.0
+    backend.next_track()
+    assert backend.current_track["playing"] and backend.current_track["position"] == 0
+    assert len(seen) == 2
+
+
+def test_reads_while_commands_wait_are_dropped():
+    backend = RecordingBackend()
+    backend.play_pause()
+    stale = dict(backend.current_track, playing=True) # Read before the command reached the player
+    assert not backend._publish(stale)
+    assert not backend.current_track["playing"]
+    backend._run_commands()
+    assert backend._publish(dict(backend.current_track, title="Second Song"))
+
+
+def test_no_optimistic_state_while_the_player_is_closed():
+    backend = RecordingBackend()
+    backend.current_track = closed_track("Spotify Closed")
+    backend.play_pause()
+    assert backend.current_track == closed_track("Spotify Closed")
@@ -0,0 +1,78 @@
+import pytest
+
+from app.services import media_hub
+from app.services.media_backend import MediaBackend
+from app.services.media_hub import MediaHub
+
+
+class FakeBackend(MediaBackend):
+    instances = []
+
+    def __init__(self):
+        super().__init__()
+        self.stopped = False
+        FakeBackend.instances.append(self)
+
+    def start_polling(self):
+        self.running = True
+        self._publish(dict(self.current_track, title="Intro"))
+
+    def stop_polling(self):
+        self.running = False
+        self.stopped = True
+
+    def _wake_worker(self):
+        pass
+
+    def _send_command(self, kind, step):
+        pass
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    FakeBackend.instances = []
+    monkeypatch.setattr(MediaHub, "FACTORIES", {"fake": FakeBackend})
+    return MediaHub()
+
+
+def test_subscribers_share_one_service(hub):
+    first, second = [], []
+    service = hub.subscribe(first.append, "fake")
+    assert hub.subscribe(second.append, "fake") is service
+    assert len(FakeBackend.instances) == 1
+    assert [t["title"] for t in first] == ["Intro"]
+    assert [t["title"] for t in second] == ["Intro"] # The current track, right away
+
+    service._publish(dict(service.current_track, title="Second Song"))
+    assert [t["title"] for t in first] == [t["title"] for t in second] == ["Intro", "Second Song"]
+
+
+def test_service_stops_with_the_last_subscriber(hub):
+    first, second = [], []
+    service = hub.subscribe(first.append, "fake")
+    hub.subscribe(second.append, "fake")
+    hub.unsubscribe(first.append, "fake")
+    assert not service.stopped and hub.subscriber_count("fake") == 1
+    hub.unsubscribe(second.append, "fake")
+    assert service.stopped and hub.subscriber_count("fake") == 0
+    hub.unsubscribe(second.append, "fake") # Already gone: ignored
+
+    assert hub.subscribe(first.append, "fake") is not service
+
+
+def test_a_failing_subscriber_does_not_block_the_others(hub):
+    def broken(track):
+        raise RuntimeError("subscriber bug")
+    received = []
+    hub.subscribe(broken, "fake")
+    service = hub.subscribe(received.append, "fake")
+    service._publish(dict(service.current_track, title="Second Song"))
+    assert [t["title"] for t in received] == ["Intro", "Second Song"]
+
+
+def test_unknown_and_auto_backends(hub, monkeypatch):
+    with pytest.raises(ValueError):
+        hub.subscribe(lambda track: None, "winamp")
+    monkeypatch.setattr(media_hub.sys, "platform", "darwin")
+    assert MediaHub.resolve("auto") == "spotify"
+    assert MediaHub.resolve("mpris") == "mpris"
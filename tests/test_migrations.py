@@ -0,0 +1,33 @@
+import json
+
+from app.core.data_manager import DataManager
+from app.core.migrations import SCHEMA_VERSION, migrate
+
+
+def test_colliding_legacy_ids_are_renumbered(tmp_path):
+    path = tmp_path / "data.json"
+    # Before versioning, IDs were millisecond timestamps and two tasks could share one
+    path.write_text(json.dumps({"tasks": [
+        {"id": 1700000000000, "text": "a", "done": False},
+        {"id": 1700000000000, "text": "b", "done": True},
+        {"id": "broken", "text": "dropped"}
+    ]}))
+
+    db = DataManager(str(path))
+    tasks = db.get_tasks()
+    assert [t.text for t in tasks] == ["a", "b"]
+    assert tasks[0].id == 1700000000000
+    assert tasks[1].id != tasks[0].id
+    assert tasks[1].priority == "normal" # Filled in by the v0 -> v1 step
+    db.add_task("c")
+    assert len({t.id for t in db.get_tasks()}) == 3
+    db.close()
+
+    with open(path) as f:
+        assert json.load(f)["schema_version"] == SCHEMA_VERSION
+
+
+def test_current_store_is_left_alone():
+    data = {"schema_version": SCHEMA_VERSION, "next_task_id": 7, "tasks": []}
+    assert not migrate(data)
+    assert data["next_task_id"] == 7
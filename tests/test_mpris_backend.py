@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("jeepney")
+if shutil.which("dbus-daemon") is None:
+    pytest.skip("needs dbus-daemon for a private session bus", allow_module_level=True)
+
+from app.services.mpris_backend import MprisBackend # noqa: E402
+
+FAKE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_mpris_player.py")
+
+
+@pytest.fixture
+def bus():
+    daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    players = []
+
+    def start_player(name):
+        proc = subprocess.Popen([sys.executable, FAKE, name], stdout=subprocess.PIPE,
+                                env=dict(os.environ, DBUS_SESSION_BUS_ADDRESS=address))
+        assert proc.stdout.readline().strip() == b"ready"
+        players.append(proc)
+        return proc
+
+    address = daemon.stdout.readline().decode().strip()
+    yield address, start_player
+    for proc in players:
+        proc.kill()
+        proc.wait()
+    daemon.kill()
+    daemon.wait()
+
+
+def start_backend(address):
+    backend = MprisBackend(bus=address, player="spotify")
+    backend.threads = set(threading.enumerate())
+    backend.start_polling()
+    return backend
+
+
+def stop_backend(backend):
+    """Stops the listener and waits for its threads, so the bus outlives its connection."""
+    backend.stop_polling()
+    for thread in set(threading.enumerate()) - backend.threads:
+        thread.join(timeout=3)
+
+
+@pytest.fixture
+def backend(bus):
+    address, start_player = bus
+    start_player("spotify")
+    backend = start_backend(address)
+    yield backend
+    stop_backend(backend)
+
+
+def wait_for(backend, predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate(backend.current_track):
+        assert time.monotonic() < deadline, f"timed out; track is {backend.current_track}"
+        time.sleep(0.005)
+
+
+def test_state_arrives_on_start_and_follows_commands(backend):
+    wait_for(backend, lambda t: t["title"] == "Intro" and t["playing"])
+    assert backend.current_track["artist"] == "The Fakes"
+    backend.next_track()
+    wait_for(backend, lambda t: t["title"] == "Second Song")
+    backend.play_pause()
+    wait_for(backend, lambda t: not t["playing"])
+
+
+def test_quick_skips_are_coalesced_and_not_flipped_back(backend):
+    wait_for(backend, lambda t: t["title"] == "Intro")
+    seen = []
+    backend.add_callback(lambda track: seen.append(track["title"]))
+    for _ in range(5):
+        backend.next_track()
+    wait_for(backend, lambda t: t["title"] == "Encore, Live") # 5 tracks on in a list of 3
+    time.sleep(0.2)
+    assert backend.current_track["title"] == "Encore, Live" and seen[-1] == "Encore, Live"
+    assert backend.command_stats["requested"] == 5
+
+
+def test_no_work_while_idle(backend):
+    wait_for(backend, lambda t: t["title"] == "Intro")
+    time.sleep(0.2)
+    before = dict(backend.stats)
+    time.sleep(0.5)
+    assert backend.stats == before
+
+
+def test_follows_another_player_when_the_preferred_one_quits(bus):
+    address, start_player = bus
+    spotify = start_player("spotify")
+    backend = start_backend(address)
+    try:
+        wait_for(backend, lambda t: t["title"] == "Intro")
+        vlc = start_player("vlc")
+        time.sleep(0.2)
+        assert backend._name == "org.mpris.MediaPlayer2.spotify"
+        spotify.kill()
+        wait_for(backend, lambda t: backend._name == "org.mpris.MediaPlayer2.vlc" and t["title"] == "Intro")
+        vlc.kill()
+        wait_for(backend, lambda t: t["title"] == "No Media Player")
+        start_player("spotify")
+        wait_for(backend, lambda t: t["title"] == "Intro")
+    finally:
+        stop_backend(backend)
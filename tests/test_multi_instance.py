@@ -0,0 +1,53 @@
+from app.core.data_manager import DataManager
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def test_two_instances_adding_at_once_keep_both_tasks(tmp_path):
+    path = str(tmp_path / "data.json")
+    a, b = DataManager(path), DataManager(path)
+    a.add_task("from a")
+    b.add_task("from b") # Allocated before b has seen a's add
+    a.flush()
+    b.flush()
+    a.poll_changes()
+    assert sorted(texts(a)) == sorted(texts(b)) == ["from a", "from b"]
+    assert len({t.id for t in a.get_tasks()}) == 2
+    a.close()
+    b.close()
+
+    db = DataManager(path)
+    assert sorted(texts(db)) == ["from a", "from b"]
+    db.close()
+
+
+def test_poll_changes_is_false_when_nothing_changed(tmp_path):
+    path = str(tmp_path / "data.json")
+    a, b = DataManager(path), DataManager(path)
+    a.poll_changes()
+    b.poll_changes()
+    assert not a.poll_changes()
+    b.set_username("Ada")
+    b.flush()
+    assert a.poll_changes()
+    assert a.get_username() == "Ada"
+    assert not a.poll_changes()
+    a.close()
+    b.close()
+
+
+def test_instance_catches_up_after_another_compacts(tmp_path):
+    path = str(tmp_path / "data.json")
+    a, b = DataManager(path), DataManager(path)
+    for i in range(3):
+        b.add_task(f"task {i}")
+        b.save() # Replaces the snapshot and resets the journal under a
+    a.add_task("after compaction")
+    a.close()
+    b.close()
+
+    db = DataManager(path)
+    assert texts(db) == ["task 0", "task 1", "task 2", "after compaction"]
+    db.close()
@@ -0,0 +1,72 @@
+import random
+
+from app.core.notes_history import NotesHistory, diff_lines, patch_lines
+
+
+def history(tmp_path, **kwargs):
+    return NotesHistory(str(tmp_path / "notes_history.jsonl"), **kwargs)
+
+
+def test_diff_and_patch_round_trip():
+    rng = random.Random(2)
+    text = "".join(f"line {i}\n" for i in range(50))
+    for _ in range(100):
+        lines = text.splitlines(keepends=True)
+        i = rng.randrange(len(lines) + 1)
+        lines[i:i + rng.randint(0, 3)] = [f"edit {rng.random()}\n"] * rng.randint(0, 2)
+        new = "".join(lines) + ("tail without newline" if rng.random() < 0.2 else "")
+        assert patch_lines(text, diff_lines(text, new)) == new
+        text = new
+
+
+def test_every_version_is_rebuilt_across_keyframes(tmp_path):
+    notes = history(tmp_path, interval=0)
+    texts = []
+    lines = [f"line {i}\n" for i in range(40)]
+    for i in range(NotesHistory.KEYFRAME_EVERY * 3):
+        lines[i % 40] = f"line {i % 40} v{i}\n"
+        text = "".join(lines)
+        texts.append(text)
+        notes.record(text, now=i)
+    assert [v for v, _ in notes.versions()] == list(range(1, len(texts) + 1))
+
+    reloaded = history(tmp_path, interval=0) # From the file, as on the next start
+    for version, text in enumerate(texts, 1):
+        assert reloaded.get_version(version) == text
+
+
+def test_a_burst_of_edits_is_recorded_once(tmp_path):
+    notes = history(tmp_path, interval=60)
+    notes.record("first", now=0)
+    for i in range(1, 20):
+        notes.record(f"typing {i}", now=i)
+    assert len(notes.versions()) == 2 # The held-back edit is listed
+    notes.record("after a pause", now=100)
+    assert [notes.get_version(v) for v, _ in notes.versions()] == ["first", "typing 19", "after a pause"]
+
+
+def test_budget_evicts_the_oldest_and_keeps_the_chain_valid(tmp_path):
+    notes = history(tmp_path, budget_bytes=4096, interval=0)
+    lines = [f"line {i}\n" for i in range(30)]
+    texts = {}
+    for i in range(300):
+        lines[i % 30] = f"line {i % 30}.{i}\n"
+        text = "".join(lines)
+        notes.record(text, now=i)
+        texts[i + 1] = text
+    versions = [v for v, _ in notes.versions()]
+    assert versions[0] > 1 and versions[-1] == 300
+    assert notes.get_version(1) is None
+    for version in versions:
+        assert notes.get_version(version) == texts[version]
+    reloaded = history(tmp_path, budget_bytes=4096, interval=0)
+    assert [v for v, _ in reloaded.versions()] == versions
+    assert reloaded.get_version(versions[0]) == texts[versions[0]]
+
+
+def test_data_manager_seeds_history_with_the_replaced_notes(db):
+    db.notes_history.interval = 0
+    db.set_notes("old notes")
+    db.set_notes("new notes")
+    versions = [v for v, _ in db.get_notes_history()]
+    assert [db.get_notes_version(v) for v in versions] == ["old notes", "new notes"]
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from app.services.script_host import MAX_HELPER_FAILURES, ScriptHost
+
+FAKE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_osascript.py")
+
+
+@pytest.fixture
+def host():
+    host = ScriptHost(FAKE, timeout=2.0)
+    yield host
+    host.close()
+
+
+@pytest.mark.parametrize("text", ["plain", "two\nlines", "ünïcødé ♫", "1 ok 99\nnot a header", "", " padded ", "x" * 100000])
+def test_echo_round_trips_byte_for_byte(host, text):
+    assert host.run("echo " + text) == text
+    assert host.run("echo again") == "again"
+    assert host.stats["launches"] == 1
+
+
+def test_crashed_helper_is_restarted(host, monkeypatch):
+    monkeypatch.setenv("FAKE_OSASCRIPT_CRASH_EVERY", "3")
+    results = [host.run(f"echo {i}") for i in range(20)]
+    assert results == [str(i) for i in range(20)]
+    assert host.stats["crashes"] > 0
+    assert host.stats["launches"] == host.stats["crashes"] + 1
+    assert not host.fallback
+
+
+def test_timeout_kills_the_helper_and_the_next_request_works():
+    host = ScriptHost(FAKE, timeout=0.3)
+    try:
+        assert host.run("hang") is None
+        assert host.stats["timeouts"] == 1
+        assert host.run("echo after") == "after"
+        assert host.stats["launches"] == 2
+    finally:
+        host.close()
+
+
+def test_falls_back_to_oneshot_osascript_after_repeated_failures(host, monkeypatch):
+    # Every helper dies on its first request; `-e` runs never read the variable
+    monkeypatch.setenv("FAKE_OSASCRIPT_CRASH_EVERY", "1")
+    for _ in range(MAX_HELPER_FAILURES - 1):
+        assert host.run("echo lost") is None
+    assert host.run("echo rescued") == "rescued"
+    assert host.fallback
+    assert host.run("echo two\nlines") == "two\nlines"
+    launches = host.stats["launches"]
+    assert host.run("echo later") == "later"
+    assert host.stats["launches"] == launches
+    assert host.stats["oneshots"] == 3
+
+
+def test_success_resets_the_failure_count(host):
+    for _ in range(MAX_HELPER_FAILURES * 2):
+        assert host.run("crash") is None
+        assert host.run("echo ok") == "ok"
+    assert not host.fallback
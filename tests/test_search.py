@@ -0,0 +1,73 @@
+import json
+import random
+
+import pytest
+
+from app.core.data_manager import DataManager
+from app.core.search import SearchIndex
+
+WORDS = "buy milk call mom review report email boss fix bug write docs".split()
+
+
+def texts(result):
+    return [t.text for t in result["tasks"]]
+
+
+def test_every_word_must_match_and_the_last_is_a_prefix(db):
+    db.add_task("Call mom")
+    db.add_task("call the bank")
+    db.add_task("review the report")
+    assert texts(db.search("call mom")) == ["Call mom"]
+    assert texts(db.search("ca")) == ["call the bank", "Call mom"] # Newest first
+    assert texts(db.search("the rev")) == ["review the report"]
+    assert texts(db.search("mom bank")) == []
+    assert texts(db.search("  ")) == []
+
+
+def test_results_follow_edits(db):
+    task = db.add_task("buy milk")
+    db.set_notes("first line\nbuy bread\nmilk run")
+    assert db.search("milk")["notes"] == [(2, "milk run")]
+    db.delete_task(task.id)
+    assert texts(db.search("milk")) == []
+    db.set_notes("first line\nbuy milk")
+    assert db.search("buy mi")["notes"] == [(1, "buy milk")]
+
+
+def test_persisted_index_matches_a_rebuild(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    for i in range(50):
+        db.add_task(f"task {i} {WORDS[i % len(WORDS)]}")
+    db.close()
+
+    db = DataManager(path)
+    with open(db.index_path, encoding="utf-8") as f:
+        assert json.load(f)["version"] == SearchIndex.FORMAT_VERSION
+    loaded = [texts(db.search(q)) for q in ("task", "buy", "re", "task 4")]
+    db.index.rebuild(db.get_tasks(), db.get_notes())
+    assert [texts(db.search(q)) for q in ("task", "buy", "re", "task 4")] == loaded
+    db.close()
+
+
+@pytest.mark.parametrize("scan_cost", [0.0, 1e9]) # Always walk newest-first / always intersect
+def test_both_strategies_agree_with_brute_force(scan_cost, monkeypatch):
+    monkeypatch.setattr(SearchIndex, "SCAN_COST", scan_cost)
+    rng = random.Random(5)
+    tasks = {}
+    for counter in range(1, 3000):
+        task_id = counter << 32 | rng.choice([0x1234, 0xBEEF]) # Tagged IDs, as DataManager allocates them
+        tasks[task_id] = " ".join(rng.sample(WORDS, 3))
+    index = SearchIndex()
+    index.add_tasks(tasks.items())
+    for task_id in list(tasks)[::7]:
+        index.remove_task(task_id, tasks.pop(task_id))
+
+    for query in ["buy", "buy milk", "mom call re", "bug fix docs", "boss em"]:
+        words = query.split()
+        expected = sorted(
+            (i for i, text in tasks.items()
+             if all(w in text.split() for w in words[:-1]) and any(t.startswith(words[-1]) for t in text.split())),
+            reverse=True
+        )[:20]
+        assert index.search(query)[0] == expected, query
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.core.data_manager import DataManager
+from app.core.serializers import SERIALIZERS, detect_serializer, get_serializer
+
+DATA = {
+    "schema_version": 3,
+    "notes": "ünïcødé\nnotes",
+    "weather_location": {"lat": -37.8, "lon": 144.9},
+    "tasks": [{"id": i, "text": f"task {i}", "done": i % 2 == 0, "completed_at": None} for i in range(2500)]
+}
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_round_trip_and_detection(name):
+    serializer = get_serializer(name)
+    raw = serializer.encode(DATA)
+    assert serializer.decode(raw) == DATA
+    assert serializer.check(raw)
+    assert detect_serializer(raw).decode(raw) == DATA
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_streamed_tasks_match_a_list(name):
+    serializer = get_serializer(name)
+    streamed = serializer.encode(dict(DATA, tasks=(t for t in DATA["tasks"])))
+    assert serializer.decode(streamed) == DATA
+
+
+def test_json_output_is_plain_json():
+    for name in ("json", "json-compact"):
+        assert json.loads(get_serializer(name).encode(DATA)) == DATA
+    assert json.loads(get_serializer("json").encode({"tasks": []})) == {"tasks": []}
+    assert json.loads(get_serializer("json").encode({})) == {}
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_truncation_fails_the_check(name):
+    serializer = get_serializer(name)
+    raw = serializer.encode(DATA)
+    assert not serializer.check(raw[:len(raw) // 2])
+
+
+def test_binary_rejects_a_flipped_byte():
+    serializer = get_serializer("binary")
+    raw = bytearray(serializer.encode(DATA))
+    raw[-10] ^= 0xFF
+    with pytest.raises(ValueError):
+        serializer.decode(bytes(raw))
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        get_serializer("yaml")
+
+
+def test_store_switches_format_without_migration(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path, data_format="json")
+    db.add_task("written as json")
+    db.close()
+
+    db = DataManager(path, data_format="binary")
+    assert [t.text for t in db.get_tasks()] == ["written as json"]
+    db.add_task("written as binary")
+    db.close()
+    with open(path, "rb") as f:
+        assert f.read(4) == get_serializer("binary").MAGIC
+
+    db = DataManager(path, data_format="json")
+    assert [t.text for t in db.get_tasks()] == ["written as json", "written as binary"]
+    db.close()
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+from app.services import spotify_service
+from app.services.spotify_service import SpotifyService
+
+FAKE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_osascript.py")
+
+
+@pytest.fixture
+def spotify():
+    service = SpotifyService(osascript=FAKE)
+    yield service
+    service.stop_polling()
+
+
+def test_a_poll_runs_one_script(spotify):
+    for _ in range(5):
+        spotify._update_status()
+    stats = spotify.get_poll_stats()
+    assert (stats["polls"], stats["scripts"], stats["fallbacks"], stats["launches"]) == (5, 5, 0, 1)
+    track = spotify.current_track
+    assert (track["title"], track["artist"], track["album"]) == ("Intro", "The Fakes", "Stubbed Out")
+    assert track["artwork_url"] == "https://i.scdn.co/image/fake1"
+    assert track["duration"] == 215 and track["playing"]
+
+
+def test_an_unparsable_record_falls_back_to_per_field_scripts(spotify, monkeypatch):
+    monkeypatch.setattr(spotify_service, "STATUS_SCRIPT", "echo not a status record")
+    spotify._update_status()
+    stats = spotify.get_poll_stats()
+    assert stats["fallbacks"] == 1
+    assert stats["scripts"] == 1 + 8 # The batched script, then "is running" and seven fields
+    assert spotify.current_track["title"] == "Intro"
+
+
+def test_closed_spotify(spotify, monkeypatch):
+    monkeypatch.setenv("FAKE_SPOTIFY_CLOSED", "1")
+    spotify._update_status()
+    assert spotify.current_track["title"] == "Spotify Closed"
+    assert spotify.current_track["closed"]
+    assert spotify.get_poll_stats()["fallbacks"] == 0
+
+
+def playing_track(**fields):
+    track = {"title": "Intro", "artist": "The Fakes", "album": "Stubbed Out", "artwork_url": None,
+             "position": 10.0, "duration": 200.0, "playing": True}
+    track.update(fields)
+    return track
+
+
+def test_position_is_extrapolated_while_playing(spotify, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    spotify._publish(playing_track())
+    now[0] += 3
+    assert spotify.position() == pytest.approx(13.0)
+    now[0] += 500
+    assert spotify.position() == 200.0 # Capped at the duration
+    spotify._publish(playing_track(playing=False))
+    now[0] += 3
+    assert spotify.position() == 10.0
+
+
+def test_poll_delay_follows_the_play_state(spotify):
+    spotify._publish(playing_track())
+    assert spotify._next_poll_delay() == SpotifyService.PLAYING_INTERVAL
+    spotify._publish(playing_track(position=198.0))
+    assert spotify._next_poll_delay() == pytest.approx(2.5, abs=0.1) # Just after the track should end
+    spotify._publish(playing_track(playing=False))
+    assert spotify._next_poll_delay() == SpotifyService.PAUSED_INTERVAL
+    spotify._publish(spotify_service.closed_track("Spotify Closed"))
+    assert spotify._next_poll_delay() == SpotifyService.CLOSED_INTERVAL
+
+
+def test_callbacks_fire_on_changes_only(spotify, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    seen = []
+    spotify.add_callback(lambda track: seen.append((track["title"], track["position"])))
+    spotify._publish(playing_track())
+    now[0] += 5
+    spotify._publish(playing_track(position=15.2)) # Expected progress
+    spotify._publish(playing_track(position=60.0)) # A seek
+    spotify._publish(playing_track(title="Second Song", position=0.0))
+    assert seen == [("Intro", 10.0), ("Intro", 60.0), ("Second Song", 0.0)]
+
+
+def test_queued_clicks_run_as_one_script(spotify):
+    spotify._update_status()
+    for _ in range(5):
+        spotify.next_track()
+    spotify.play_pause()
+    spotify.play_pause()
+    assert spotify.current_track["position"] < 0.1 and spotify.current_track["playing"] # Optimistic
+    spotify.start_polling()
+    deadline = time.monotonic() + 3
+    while spotify.current_track["title"] != "Encore, Live": # 5 tracks on in a list of 3
+        assert time.monotonic() < deadline, spotify.current_track
+        time.sleep(0.005)
+    assert spotify.command_stats == {"requested": 7, "sent": 1}
@@ -0,0 +1,56 @@
+import io
+import sqlite3
+
+from app.core.data_manager import DataManager
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def test_mutations_persist(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path, backend="sqlite")
+    db.add_task("a")
+    db.add_task("b", priority="high")
+    db.toggle_task(db.get_tasks()[0].id)
+    db.delete_task(db.get_tasks()[1].id)
+    db.set_notes("notes")
+    db.close()
+
+    db = DataManager(path, backend="sqlite")
+    assert texts(db) == ["a"]
+    assert db.get_tasks()[0].done
+    assert db.get_notes() == "notes"
+    db.close()
+
+
+def test_json_store_is_migrated_once(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("from json")
+    db.set_username("Ada")
+    db.close()
+
+    db = DataManager(path, backend="sqlite")
+    assert texts(db) == ["from json"]
+    assert db.get_username() == "Ada"
+    db.add_task("in sqlite")
+    db.close()
+    assert texts(DataManager(path)) == ["from json"] # The JSON store is left as it was
+    db = DataManager(path, backend="sqlite")
+    assert texts(db) == ["from json", "in sqlite"]
+    db.close()
+
+
+def test_import_chunks_are_committed(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path, backend="sqlite")
+    rows = "".join(f"task {i}\n" for i in range(2500))
+    db.import_tasks(io.StringIO("text\n" + rows), fmt="csv", chunk_size=1000)
+
+    # Another connection sees every row without waiting for close()
+    conn = sqlite3.connect(str(tmp_path / "data.db"))
+    assert conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 2500
+    conn.close()
+    db.close()
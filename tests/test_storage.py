@@ -0,0 +1,62 @@
+import os
+
+from app.core.data_manager import DataManager
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def test_truncated_primary_recovers_previous_generation(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("first")
+    db.save()
+    db.add_task("second")
+    db.save()
+    db.storage.close() # Not close(): its save would write one more generation
+    with open(path, "r+b") as f:
+        f.truncate(20)
+
+    db = DataManager(path)
+    assert texts(db) == ["first"] # From data.json.1
+    assert os.path.exists(path + ".corrupt")
+    db.add_task("after recovery")
+    db.close()
+    assert texts(DataManager(path)) == ["first", "after recovery"]
+
+
+def test_journal_of_newer_primary_is_not_replayed_onto_recovered_generation(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("first")
+    db.save()
+    db.add_task("second")
+    db.save()
+    db.add_task("journal only")
+    db.flush()
+    db.storage.close()
+    with open(path, "r+b") as f:
+        f.truncate(20)
+
+    db = DataManager(path)
+    # Replaying would bring back "journal only" without "second"
+    assert texts(db) == ["first"]
+    assert os.path.exists(path + ".journal.orphaned")
+    db.close()
+
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("kept")
+    db.flush()
+    db.storage.close()
+    with open(path + ".journal", "ab") as f:
+        f.write(b'{"op":"add_task","task":{"id":99,"te')
+
+    db = DataManager(path)
+    assert texts(db) == ["kept"]
+    db.add_task("next")
+    db.close()
+    assert texts(DataManager(path)) == ["kept", "next"]
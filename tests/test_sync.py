@@ -0,0 +1,44 @@
+import shutil
+
+from app.core.data_manager import DataManager
+
+
+def replicas(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    a = DataManager(str(tmp_path / "a" / "data.json"))
+    a.add_task("shared")
+    a.save()
+    shutil.copy(a.filepath, tmp_path / "b" / "data.json") # A hand copy of the data file
+    return a, DataManager(str(tmp_path / "b" / "data.json"))
+
+
+def state(db):
+    return [t.to_dict() for t in db.get_tasks()], db.get_notes()
+
+
+def test_sync_converges(tmp_path):
+    a, b = replicas(tmp_path)
+    a.add_task("from a")
+    b.toggle_task(b.get_tasks()[0].id)
+    b.set_notes("from b")
+    a.sync_with(b)
+    assert state(a) == state(b)
+    assert a.get_notes() == "from b"
+    assert a.sync_with(b) == (0, 0)
+    a.close()
+    b.close()
+
+
+def test_shared_replica_tag_is_replaced(tmp_path):
+    a, b = replicas(tmp_path)
+    b.oplog.tag = a.oplog.tag # Force the 1-in-2**32 clash
+    a.add_task("from a")
+    a.sync_with(b)
+    assert b._replica_tag() != a._replica_tag()
+    b.add_task("from b")
+    a.sync_with(b)
+    assert state(a) == state(b)
+    assert len({t.id for t in a.get_tasks()}) == 3
+    a.close()
+    b.close()
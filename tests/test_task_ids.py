@@ -0,0 +1,32 @@
+from app.core.data_manager import DataManager
+
+
+def test_ids_are_unique_within_one_second(db):
+    ids = [db.add_task(f"task {i}").id for i in range(200)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_deleted_ids_are_never_reused(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("kept")
+    last = db.add_task("deleted").id
+    db.delete_task(last)
+    assert db.add_task("after delete").id > last
+    db.close()
+
+    db = DataManager(path)
+    assert db.add_task("after reopen").id > last
+    db.close()
+
+
+def test_get_task_follows_updates_and_deletes(db):
+    task = db.add_task("look me up")
+    assert db.get_task(task.id) is task
+    toggled = db.toggle_task(task.id)
+    assert db.get_task(task.id) is toggled and toggled.done
+    assert db.delete_task(task.id)
+    assert db.get_task(task.id) is None
+    assert not db.delete_task(task.id)
+    assert db.toggle_task(task.id) is None
@@ -0,0 +1,33 @@
+import time
+
+from app.core.data_manager import Task
+
+
+def test_tasks_are_slotted():
+    task = Task(1, "slotted")
+    assert not hasattr(task, "__dict__")
+
+
+def test_dict_round_trip_keeps_minute_timestamps():
+    record = {
+        "id": 7, "text": "round trip", "done": True,
+        "created_at": "2024-03-01 09:15", "completed_at": "2024-03-02 18:40", "priority": "high"
+    }
+    task = Task.from_dict(record)
+    assert isinstance(task.created_at, int) and isinstance(task.completed_at, int)
+    assert task.to_dict() == record
+
+
+def test_with_fields_returns_an_updated_copy():
+    task = Task(1, "original", created_at=int(time.time()))
+    done = task.with_fields({"done": True, "completed_at": "2024-03-02 18:40"})
+    assert not task.done and task.completed_at is None
+    assert done.done and done.format_time(done.completed_at) == "2024-03-02 18:40"
+    assert done.with_fields({"completed_at": None}).completed_at is None
+
+
+def test_toggle_stores_epoch_seconds(db):
+    task = db.toggle_task(db.add_task("toggle me").id)
+    assert isinstance(task.created_at, int)
+    assert task.completed_at >= task.created_at - 60
+    assert db.toggle_task(task.id).completed_at is None
@@ -0,0 +1,95 @@
+import io
+import json
+
+import pytest
+
+from app.core.data_manager import TASKS_RELOADED, DataManager
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def reopened(db):
+    """The store as a fresh process would see it if this one died now."""
+    db.storage.close()
+    return DataManager(db.filepath)
+
+
+def test_csv_import_reports_bad_rows(db):
+    csv_text = (
+        "text,done,priority,created_at\n"
+        "write report,no,high,2024-05-01 09:30\n"
+        ",no,normal,\n"
+        "bad flag,maybe,normal,\n"
+        "bad time,yes,normal,yesterday\n"
+        "plain,,,\n"
+    )
+    result = db.import_tasks(io.StringIO(csv_text), fmt="csv")
+
+    assert result["imported"] == 2
+    assert result["skipped"] == 3
+    assert [line for line, _ in result["errors"]] == [3, 4, 5]
+    reasons = [reason for _, reason in result["errors"]]
+    assert reasons[0] == "missing text"
+    assert "done" in reasons[1]
+    assert "created_at" in reasons[2]
+    assert texts(db) == ["write report", "plain"]
+    assert db.get_tasks()[0].priority == "high"
+
+
+def test_malformed_csv_row_is_skipped(db):
+    rows = [f"task {i},no" for i in range(2500)]
+    rows[2100] = "x" * 200_000 + ",no" # Over the csv module's field size limit, in the third chunk
+    result = db.import_tasks(io.StringIO("text,done\n" + "\n".join(rows) + "\n"), fmt="csv", chunk_size=1000)
+
+    assert result["imported"] == 2499
+    assert result["skipped"] == 1
+    assert "malformed CSV" in result["errors"][0][1]
+    assert len(reopened(db).get_tasks()) == 2499
+
+
+def test_reader_failure_persists_what_was_imported(db):
+    events = []
+    db.subscribe(events.append)
+
+    def lines():
+        yield "text\n"
+        for i in range(2500):
+            yield f"task {i}\n"
+        raise OSError("disk went away")
+
+    with pytest.raises(OSError):
+        db.import_tasks(lines(), fmt="csv", chunk_size=1000)
+    # The two full chunks made it; the rows of the chunk being read when it failed did not
+    assert len(db.get_tasks()) == 2000
+    assert [e.kind for e in events] == [TASKS_RELOADED]
+    assert len(reopened(db).get_tasks()) == 2000
+
+
+def test_jsonl_round_trip(db, tmp_path):
+    db.add_task("one", priority="high")
+    db.toggle_task(db.get_tasks()[0].id)
+    db.add_task("two")
+    out = io.StringIO()
+    db.export_tasks(out, fmt="jsonl")
+    lines = out.getvalue().splitlines()
+    assert [json.loads(line)["text"] for line in lines] == ["one", "two"]
+
+    other = DataManager(str(tmp_path / "other.json"))
+    result = other.import_tasks(io.StringIO(out.getvalue() + "not json\n"), fmt="jsonl")
+    assert result["imported"] == 2
+    assert result["errors"] == [(3, "not a JSON object")]
+    assert [(t.text, t.done, t.priority) for t in other.get_tasks()] == [("one", True, "high"), ("two", False, "normal")]
+    other.close()
+
+
+def test_import_refuses_to_run_inside_a_transaction(db):
+    with db.transaction():
+        with pytest.raises(RuntimeError):
+            db.import_tasks(io.StringIO("text\nx\n"), fmt="csv")
+
+
+def test_unknown_import_format_is_rejected(db):
+    with pytest.raises(ValueError):
+        db.import_tasks(io.StringIO(""), fmt="xml")
@@ -0,0 +1,102 @@
+from app.core.data_manager import DataManager
+from app.core.undo import UndoLog
+
+
+def texts(db):
+    return [t.text for t in db.get_tasks()]
+
+
+def test_undo_and_redo_walk_the_stack(db):
+    db.add_task("a")
+    db.add_task("b")
+    db.toggle_task(db.get_tasks()[0].id)
+
+    assert db.undo()
+    assert not db.get_tasks()[0].done
+    assert db.undo()
+    assert texts(db) == ["a"]
+    assert db.redo()
+    assert texts(db) == ["a", "b"]
+    assert db.redo()
+    assert db.get_tasks()[0].done
+    assert not db.can_redo()
+
+
+def test_new_change_clears_redo(db):
+    db.add_task("a")
+    db.undo()
+    assert db.can_redo()
+    db.add_task("b")
+    assert not db.can_redo()
+    assert not db.redo()
+    assert texts(db) == ["b"]
+
+
+def test_deleted_task_comes_back_with_its_fields(db):
+    db.add_task("a", priority="high")
+    task = db.get_tasks()[0]
+    db.toggle_task(task.id)
+    before = db.get_task(task.id).to_dict()
+    db.delete_task(task.id)
+    db.undo()
+    restored = db.get_task(task.id)
+    assert restored.to_dict() == before
+    assert restored.done and restored.priority == "high"
+
+
+def test_transaction_undoes_as_one_step(db):
+    with db.transaction():
+        db.add_task("a")
+        db.add_task("b")
+    db.undo()
+    assert texts(db) == []
+
+
+def test_tasks_scope_skips_settings_saves(db):
+    db.add_task("a")
+    with db.transaction(): # As SettingsPage.save_settings does
+        db.set_username("Ada")
+        db.set_weather_location(1.0, 2.0)
+
+    assert db.undo("tasks")
+    assert texts(db) == []
+    assert db.get_username() == "Ada"
+    assert db.get_weather_location() == {"lat": 1.0, "lon": 2.0}
+    assert not db.can_undo("tasks")
+    assert db.can_undo("settings")
+
+    # A task change does not invalidate the settings redo, and vice versa
+    db.undo("settings")
+    db.add_task("b")
+    assert db.can_redo("settings")
+    assert db.redo("settings")
+    assert db.get_username() == "Ada"
+    assert texts(db) == ["b"]
+
+
+def test_log_drops_oldest_steps_over_budget():
+    log = UndoLog(budget_bytes=10_000, max_steps=3)
+    for i in range(5):
+        log.record([({"op": "set", "key": "theme", "value": i}, {"op": "set", "key": "theme", "value": i - 1})])
+    assert len(log) == 3
+    assert log.pop_undo()[0][0]["value"] == 4
+
+    small = UndoLog(budget_bytes=200, max_steps=100)
+    for i in range(20):
+        small.record([({"op": "add_task", "task": {"id": i, "text": "x" * 40}}, {"op": "delete_task", "id": i})])
+    assert 0 < len(small) < 20
+
+
+def test_undo_is_persisted_like_any_mutation(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path)
+    db.add_task("a")
+    db.delete_task(db.add_task("b").id)
+    db.undo()
+    db.flush()
+    db.storage.close() # Journal only: the undo must replay like any other op
+
+    db = DataManager(path)
+    assert texts(db) == ["a", "b"]
+    assert not db.can_undo() # The stacks are in memory only
+    db.close()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+
+from app.core.data_manager import DataManager
+
+
+@pytest.fixture
+def thread_errors(monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", lambda args: errors.append(args.exc_value))
+    return errors
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_close_stops_the_flusher_before_closing_storage(tmp_path, backend, thread_errors):
+    path = str(tmp_path / "data.json")
+    for round in range(3):
+        db = DataManager(path, write_behind=True, backend=backend)
+        db.add_task(f"task {round}")
+        db.close()
+        assert not db._flusher.is_alive()
+        if backend == "json":
+            assert db.storage.file_lock._fd is None # Not reopened by a late flush
+    assert thread_errors == []
+
+    db = DataManager(path, backend=backend)
+    assert [t.text for t in db.get_tasks()] == ["task 0", "task 1", "task 2"]
+    db.close()
+
+
+def test_write_behind_coalesces_a_burst(tmp_path):
+    db = DataManager(str(tmp_path / "data.json"), write_behind=True)
+    for i in range(50):
+        db.add_task(f"t{i}")
+    db.flush()
+    stats = db.get_write_stats()
+    assert stats["pending"] == 0
+    assert stats["physical_writes"] < stats["mutations"]
+    db.close()
+
+
+def test_flusher_writes_without_an_explicit_flush(tmp_path):
+    path = str(tmp_path / "data.json")
+    db = DataManager(path, write_behind=True, flush_interval=0.02)
+    db.add_task("background")
+    assert db.get_write_stats()["pending"] > 0 # The caller did not wait for the disk
+    deadline = time.monotonic() + 3
+    while db.get_write_stats()["pending"]:
+        assert time.monotonic() < deadline, "the flusher never wrote"
+        time.sleep(0.01)
+    db.storage.close() # Simulated crash: no final save
+
+    db = DataManager(path)
+    assert [t.text for t in db.get_tasks()] == ["background"]
+    db.close()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Measures ArtworkCache against a local HTTP server serving 640x640 JPEG
+artwork (the size Spotify's artwork URLs return), compared with what the
+views did per track change before the cache (download, decode, LANCZOS
+resize to 400px).
+
+Also checks that concurrent requests for one URL download it once, that
+the size cap evicts least recently used entries, and that a new cache
+instance (an app restart) still hits.
+
+Usage: python tools/bench_artwork_cache.py [tracks]   (default: 20)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from app.services.artwork_cache import ArtworkCache
+
+ART_SIZE = 640
+
+
+def make_art(n):
+    """A noisy gradient, so JPEG sizes are realistic."""
+    image = Image.effect_noise((ART_SIZE, ART_SIZE), 40 + n % 20).convert("RGB")
+    tint = Image.new("RGB", (ART_SIZE, ART_SIZE), ((n * 53) % 256, (n * 97) % 256, (n * 31) % 256))
+    buf = BytesIO()
+    Image.blend(image, tint, 0.6).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+class ArtHandler(BaseHTTPRequestHandler):
+    art = {}
+    served = 0
+
+    def do_GET(self):
+        body = self.art.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        type(self).served += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def uncached(url):
+    with urllib.request.urlopen(url) as u:
+        raw = u.read()
+    return Image.open(BytesIO(raw)).resize((400, 400), Image.Resampling.LANCZOS)
+
+
+def timed(fn, urls):
+    start = time.perf_counter()
+    for url in urls:
+        fn(url)
+    return (time.perf_counter() - start) * 1000 / len(urls)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ArtHandler.art = {f"/art/{i}.jpg": make_art(i) for i in range(n)}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArtHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/art/{i}.jpg" for i in range(n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ArtworkCache(os.path.join(tmp, "art"), max_bytes=64 * 1024 * 1024)
+        print(f"uncached (download + decode + resize to 400): {timed(uncached, urls):.2f} ms per track")
+        print(f"cache miss (download, render 400 + 60):       {timed(lambda u: cache.get(u, 400), urls):.2f} ms per track")
+        print(f"cache hit, 400px:                             {timed(lambda u: cache.get(u, 400), urls):.2f} ms per track")
+        print(f"cache hit, 60px:                              {timed(lambda u: cache.get(u, 60), urls):.2f} ms per track")
+        print(f"stats: {cache.stats}, {cache.stats['bytes'] // n} bytes per entry")
+        if cache.stats["misses"] != n or cache.stats["hits"] != 2 * n:
+            raise SystemExit(f"FAILED: unexpected counters {cache.stats}")
+
+        restarted = ArtworkCache(cache.directory, max_bytes=cache.max_bytes)
+        if restarted.get(urls[0], 60) is None or restarted.stats["hits"] != 1:
+            raise SystemExit(f"FAILED: no hit after a restart: {restarted.stats}")
+        print("restart: hit from disk")
+
+        fresh = ArtworkCache(os.path.join(tmp, "fresh"))
+        served = ArtHandler.served
+        threads = [threading.Thread(target=fresh.get, args=(urls[0], 60 if i % 2 else 400)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if ArtHandler.served - served != 1:
+            raise SystemExit(f"FAILED: {ArtHandler.served - served} downloads for one URL")
+        print(f"concurrent: 8 requests for one URL, 1 download, {fresh.stats}")
+
+        per_entry = cache.stats["bytes"] // n
+        small = ArtworkCache(os.path.join(tmp, "small"), max_bytes=per_entry * 5)
+        for url in urls:
+            small.get(url, 60)
+            small.get(urls[0], 60) # Kept recent, so never evicted
+        if small.stats["bytes"] > small.max_bytes or small.key(urls[0]) not in small._entries:
+            raise SystemExit(f"FAILED: cap or recency not respected: {small.stats}")
+        print(f"capped at 5 entries: {small.stats}")
+    server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Encode/decode time and size of each snapshot serializer on synthetic stores.
+
+Usage: python tools/bench_serializers.py [sizes...]   (default: 1000 10000 100000)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.serializers import SERIALIZERS, detect_serializer
+
+REPEAT = 5
+
+
+def make_store(n):
+    return {
+        "tasks": [
+            {
+                "id": i,
+                "text": f"Task number {i} with a realistic amount of text",
+                "done": i % 3 == 0,
+                "created_at": "2026-01-01 09:00",
+                "completed_at": "2026-01-02 10:00" if i % 3 == 0 else None,
+                "priority": ("low", "normal", "high")[i % 3]
+            }
+            for i in range(1, n + 1)
+        ],
+        "notes": "Scratchpad line\n" * 200,
+        "username": "Bench",
+        "theme": "dark",
+        "weather_location": {"lat": -37.9, "lon": 145.0},
+        "next_task_id": n + 1,
+        "session_count": 42,
+        "journal_seq": 0
+    }
+
+
+def best_of(func):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    for n in sizes:
+        store = make_store(n)
+        for name, serializer in SERIALIZERS.items():
+            encode_s, raw = best_of(lambda: serializer.encode(store))
+            decode_s, decoded = best_of(lambda: detect_serializer(raw).decode(raw))
+            assert decoded == store, f"{name} did not round-trip"
+            print(
+                f"{n:>7} {name:<13} encode {encode_s * 1000:8.1f} ms"
+                f"  decode {decode_s * 1000:8.1f} ms  size {len(raw) / 1024:9.1f} KB"
+            )
+
+
+if __name__ == "__main__":
+    main()
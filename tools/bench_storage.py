@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compares the JSON (snapshot + journal) and SQLite DataManager backends.
+
+Usage: python tools/bench_storage.py [sizes...]   (default: 1000 10000 100000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.data_manager import DataManager
+from app.core.storage import FileStorage, SqliteStorage
+
+MUTATIONS = 200
+
+
+def make_data(n):
+    return {
+        "tasks": [
+            {
+                "id": i,
+                "text": f"Task number {i} with a realistic amount of text",
+                "done": i % 3 == 0,
+                "created_at": "2026-01-01 09:00",
+                "completed_at": "2026-01-02 10:00" if i % 3 == 0 else None,
+                "priority": ("low", "normal", "high")[i % 3]
+            }
+            for i in range(1, n + 1)
+        ],
+        "notes": "",
+        "username": "Bench",
+        "session_count": 0
+    }
+
+
+def seed(backend, path, data):
+    if backend == "json":
+        FileStorage(path).write_snapshot(data)
+    else:
+        storage = SqliteStorage(os.path.splitext(path)[0] + ".db")
+        storage.replace_all(data)
+        storage.close()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(backend, n):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.json")
+        seed(backend, path, make_data(n))
+
+        load_s, db = timed(lambda: DataManager(path, backend=backend))
+        ids = [t.id for t in db.get_tasks()[-MUTATIONS:]]
+
+        toggle_s, _ = timed(lambda: [db.toggle_task(i) for i in ids])
+        query_s, active = timed(lambda: db.get_tasks("active"))
+        delete_s, _ = timed(lambda: [db.delete_task(i) for i in ids])
+        db.close()
+
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        print(
+            f"{backend:<7}{n:>8}  load {load_s * 1000:9.1f} ms"
+            f"  toggle {toggle_s / len(ids) * 1000:7.3f} ms"
+            f"  delete {delete_s / len(ids) * 1000:7.3f} ms"
+            f"  active-query {query_s * 1000:8.2f} ms ({len(active)})"
+            f"  disk {size / 1024:9.1f} KB"
+        )
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    for n in sizes:
+        for backend in ("json", "sqlite"):
+            run(backend, n)
+
+
+if __name__ == "__main__":
+    main()
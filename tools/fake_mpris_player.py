@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+A fake MPRIS media player, for exercising MprisBackend without a desktop
+session. It plays the same three tracks as fake_osascript.py, owns
+org.mpris.MediaPlayer2.NAME (default "spotify") on the session bus named
+by DBUS_SESSION_BUS_ADDRESS, answers Properties Get/GetAll for the Player
+interface and handles PlayPause/Play/Pause/Next/Previous/Seek, emitting
+PropertiesChanged and Seeked like a real player. Prints "ready" once it
+owns its name.
+
+Usage: DBUS_SESSION_BUS_ADDRESS=... python tools/fake_mpris_player.py [NAME]
+(tools/stress_mpris.py starts a private bus and players itself)
+"""
+
+import sys
+
+from jeepney import (DBusAddress, HeaderFields, MessageType, message_bus, new_error, new_method_return,
+                     new_signal)
+from jeepney.io.blocking import open_dbus_connection
+
+from fake_osascript import TRACKS, FakeSpotify
+
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+PLAYER_IFACE = "org.mpris.MediaPlayer2.Player"
+PROPERTIES_IFACE = "org.freedesktop.DBus.Properties"
+
+
+def properties(player):
+    """The Player interface properties, as D-Bus variants."""
+    title, artist, album, art, duration = TRACKS[player.track]
+    metadata = {
+        "mpris:trackid": ("o", f"/org/mpris/MediaPlayer2/track/{player.track}"),
+        "mpris:length": ("x", duration * 1000),
+        "mpris:artUrl": ("s", art),
+        "xesam:title": ("s", title),
+        "xesam:artist": ("as", [artist]),
+        "xesam:album": ("s", album)
+    }
+    return {
+        "PlaybackStatus": ("s", "Playing" if player.playing else "Paused"),
+        "Metadata": ("a{sv}", metadata),
+        "Position": ("x", int(player.position() * 1e6)),
+        "Rate": ("d", 1.0),
+        "CanPlay": ("b", True),
+        "CanPause": ("b", True),
+        "CanGoNext": ("b", True),
+        "CanGoPrevious": ("b", True),
+        "CanSeek": ("b", True),
+        "CanControl": ("b", True)
+    }
+
+
+def control(player, member, body):
+    """Runs a Player method. Returns True if it exists."""
+    if member == "PlayPause" or (member == "Play" and not player.playing) or (member == "Pause" and player.playing):
+        player.play_pause()
+    elif member == "Next":
+        player.skip(1)
+    elif member == "Previous":
+        player.skip(-1)
+    elif member == "Seek":
+        player.seek(max(0.0, player.position() + body[0] / 1e6))
+    elif member not in ("Play", "Pause"):
+        return False
+    return True
+
+
+def serve(conn, player):
+    emitter = DBusAddress(MPRIS_PATH, interface=PROPERTIES_IFACE)
+    while True:
+        msg = conn.receive()
+        if msg.header.message_type != MessageType.method_call:
+            continue
+        fields = msg.header.fields
+        interface, member = fields.get(HeaderFields.interface), fields.get(HeaderFields.member)
+        if interface == PROPERTIES_IFACE and member == "GetAll":
+            props = properties(player) if msg.body[0] == PLAYER_IFACE else {}
+            conn.send(new_method_return(msg, "a{sv}", (props,)))
+        elif interface == PROPERTIES_IFACE and member == "Get" and msg.body[1] in properties(player):
+            conn.send(new_method_return(msg, "v", (properties(player)[msg.body[1]],)))
+        elif interface == PLAYER_IFACE:
+            before = properties(player)
+            if not control(player, member, msg.body):
+                conn.send(new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod"))
+                continue
+            conn.send(new_method_return(msg))
+            after = properties(player)
+            changed = {key: value for key, value in after.items() if key != "Position" and before[key] != value}
+            if changed:
+                conn.send(new_signal(emitter, "PropertiesChanged", "sa{sv}as", (PLAYER_IFACE, changed, [])))
+            if member == "Seek":
+                seeked = DBusAddress(MPRIS_PATH, interface=PLAYER_IFACE)
+                conn.send(new_signal(seeked, "Seeked", "x", (after["Position"][1],)))
+        else:
+            conn.send(new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod"))
+
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "spotify"
+    conn = open_dbus_connection(bus="SESSION")
+    conn.send_and_get_reply(message_bus.RequestName("org.mpris.MediaPlayer2." + name))
+    print("ready", flush=True)
+    serve(conn, FakeSpotify())
+
+
+if __name__ == "__main__":
+    main()
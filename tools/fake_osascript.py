@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Stand-in for macOS osascript, for exercising SpotifyService and
+ScriptHost on Linux. It understands the scripts SpotifyService sends and
+answers them from a simulated Spotify player (three tracks, position
+advancing in real time while playing).
+
+    fake_osascript.py -e SCRIPT                  run one script, print the result
+    fake_osascript.py -l JavaScript -e HELPER    serve framed requests like ScriptHost's helper
+
+Test hooks: a script "crash" kills the helper without replying, "hang"
+never replies, "echo TEXT" returns TEXT. FAKE_OSASCRIPT_CRASH_EVERY=N
+crashes on every Nth request, FAKE_SPOTIFY_CLOSED=1 reports Spotify as
+not running.
+
+Usage: SpotifyService(osascript="tools/fake_osascript.py")
+"""
+
+import os
+import re
+import sys
+import time
+
+TRACKS = [
+    ("Intro", "The Fakes", "Stubbed Out", "https://i.scdn.co/image/fake1", 215000),
+    ("Second Song", "The Fakes", "Stubbed Out", "https://i.scdn.co/image/fake1", 187000),
+    ("Encore, Live", "Other Band", "Mocked Up", "https://i.scdn.co/image/fake2", 302000)
+]
+
+
+class FakeSpotify:
+    def __init__(self):
+        self.track = 0
+        self.playing = True
+        self.offset = 0.0 # Position when the clock was last (re)started
+        self.started = time.monotonic()
+
+    def position(self):
+        pos = self.offset + (time.monotonic() - self.started if self.playing else 0)
+        return min(pos, TRACKS[self.track][4] / 1000)
+
+    def seek(self, pos):
+        self.offset, self.started = pos, time.monotonic()
+
+    def skip(self, step):
+        self.track = (self.track + step) % len(TRACKS)
+        self.seek(0.0)
+
+    def run(self, script):
+        """Returns (ok, text) for one AppleScript source."""
+        if script.startswith("echo "):
+            return True, script[5:]
+        closed = os.environ.get("FAKE_SPOTIFY_CLOSED") == "1"
+        title, artist, album, art, duration = TRACKS[self.track]
+        if 'if application "Spotify" is running' in script:
+            if closed:
+                return True, "closed"
+            fields = ["running", "playing" if self.playing else "paused", title, artist, album, art,
+                      f"{self.position():.3f}".replace(".", ","), str(duration)]
+            return True, "\x1f".join(fields)
+        if 'application "Spotify" is running' in script:
+            return True, "false" if closed else "true"
+        if closed:
+            return False, "Spotify got an error: Application isn't running."
+        statements = [line.strip() for line in script.replace(" to ", "\n").splitlines()]
+        repeat = re.search(r"repeat (\d+) times", script)
+        for command, action in (("playpause", self.play_pause), ("next track", lambda: self.skip(1)),
+                                ("previous track", lambda: self.skip(-1))):
+            if command in statements:
+                for _ in range(int(repeat.group(1)) if repeat else 1):
+                    action()
+                return True, ""
+        for prop, value in (("player state", "playing" if self.playing else "paused"), ("name of", title),
+                            ("artist of", artist), ("album of", album), ("artwork url", art),
+                            ("player position", f"{self.position():.3f}".replace(".", ",")),
+                            ("duration of", str(duration))):
+            if prop in script:
+                return True, value
+        return False, "syntax error"
+
+    def play_pause(self):
+        self.seek(self.position())
+        self.playing = not self.playing
+
+
+def serve(player):
+    """The ScriptHost protocol: "<id> <len>\\n<source>" in, "<id> ok|err <len>\\n<text>" out."""
+    crash_every = int(os.environ.get("FAKE_OSASCRIPT_CRASH_EVERY", "0"))
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    served = 0
+    while True:
+        header = stdin.readline()
+        if not header:
+            return
+        request_id, length = header.split()
+        script = stdin.read(int(length)).decode("utf-8")
+        served += 1
+        if script == "crash" or (crash_every and served % crash_every == 0):
+            os._exit(3)
+        if script == "hang":
+            time.sleep(3600)
+        ok, text = player.run(script)
+        body = text.encode("utf-8")
+        stdout.write(b"%s %s %d\n" % (request_id, b"ok" if ok else b"err", len(body)) + body)
+        stdout.flush()
+
+
+def main():
+    args = sys.argv[1:]
+    script = args[args.index("-e") + 1] if "-e" in args else sys.stdin.read()
+    player = FakeSpotify()
+    if "-l" in args:
+        serve(player)
+        return
+    ok, text = player.run(script)
+    if not ok:
+        print(f"execution error: {text}", file=sys.stderr)
+        sys.exit(1)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
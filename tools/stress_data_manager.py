@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress run for DataManager.
+
+Several writer threads add/toggle/delete tasks and edit notes while reader
+threads iterate snapshots and a saver thread forces compactions. Afterwards
+the store is reopened and must match the final in-memory state exactly.
+
+Usage: python tools/stress_data_manager.py [writers] [ops_per_writer]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.data_manager import DataManager
+
+
+def writer(db, n, seed, errors):
+    rng = random.Random(seed)
+    mine = []
+    try:
+        for i in range(n):
+            roll = rng.random()
+            if roll < 0.5 or not mine:
+                mine.append(db.add_task(f"w{seed}-{i}").id)
+            elif roll < 0.8:
+                db.toggle_task(rng.choice(mine))
+            elif roll < 0.95:
+                db.delete_task(mine.pop(rng.randrange(len(mine))))
+            else:
+                db.set_notes(f"notes from writer {seed} at {i}")
+    except Exception as e:
+        errors.append(e)
+
+
+def reader(db, stop, errors):
+    try:
+        while not stop.is_set():
+            snap = db.snapshot()
+            ids = [t.id for t in snap.tasks]
+            if len(ids) != len(set(ids)):
+                raise AssertionError("duplicate task id in snapshot")
+            db.get_tasks("active")
+    except Exception as e:
+        errors.append(e)
+
+
+def saver(db, stop, errors):
+    try:
+        while not stop.wait(0.01):
+            db.save()
+    except Exception as e:
+        errors.append(e)
+
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.json")
+        db = DataManager(path, write_behind=True, flush_interval=0.05)
+        errors = []
+        stop = threading.Event()
+
+        background = [threading.Thread(target=reader, args=(db, stop, errors)) for _ in range(2)]
+        background.append(threading.Thread(target=saver, args=(db, stop, errors)))
+        workers = [threading.Thread(target=writer, args=(db, ops, seed, errors)) for seed in range(writers)]
+        for t in background + workers:
+            t.start()
+        for t in workers:
+            t.join()
+        stop.set()
+        for t in background:
+            t.join()
+
+        expected = [t.to_dict() for t in db.get_tasks()]
+        notes = db.get_notes()
+        stats = db.get_write_stats()
+        db.close()
+
+        reopened = DataManager(path)
+        actual = [t.to_dict() for t in reopened.get_tasks()]
+        reopened.close()
+
+        if errors:
+            raise SystemExit(f"FAILED: {len(errors)} thread error(s), first: {errors[0]!r}")
+        if actual != expected or reopened.get_notes() != notes:
+            raise SystemExit("FAILED: reopened store differs from the final in-memory state")
+        print(f"OK: {writers} writers x {ops} ops, {len(actual)} tasks survive, write stats {stats}")
+
+
+if __name__ == "__main__":
+    main()
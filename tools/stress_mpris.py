@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Exercises MprisBackend against tools/fake_mpris_player.py on a private
+D-Bus session bus (needs dbus-daemon and jeepney).
+
+  1. The preferred player's state arrives on start.
+  2. Commands and a seek by another client arrive as signals, with their
+     latency printed. Five quick "next" clicks return at once and end on
+     the right track, without stale signals flipping it back.
+  3. While idle, the backend makes no calls and sends no notifications.
+  4. With two players, the preferred one is followed; when it quits the
+     other one is, when both quit the track shows closed, and a restarted
+     player is picked up again.
+
+Usage: python tools/stress_mpris.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from jeepney import DBusAddress, new_method_call
+from jeepney.io.blocking import open_dbus_connection
+
+from app.services.mpris_backend import MprisBackend
+
+FAKE = os.path.join(ROOT, "tools", "fake_mpris_player.py")
+
+
+def start_player(address, name):
+    proc = subprocess.Popen([sys.executable, FAKE, name], stdout=subprocess.PIPE,
+                            env=dict(os.environ, DBUS_SESSION_BUS_ADDRESS=address))
+    if proc.stdout.readline().strip() != b"ready":
+        raise SystemExit(f"FAILED: fake player {name} did not start")
+    return proc
+
+
+def stop_player(proc):
+    proc.kill()
+    proc.wait()
+
+
+def wait_for(backend, predicate, what, timeout=3.0):
+    start = time.perf_counter()
+    while not predicate(backend.current_track):
+        if time.perf_counter() - start > timeout:
+            raise SystemExit(f"FAILED: {what}; track is {backend.current_track}")
+        time.sleep(0.002)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    address = daemon.stdout.readline().decode().strip()
+    players = {}
+    try:
+        players["spotify"] = start_player(address, "spotify")
+        backend = MprisBackend(bus=address, player="spotify")
+        backend.start_polling()
+        wait_for(backend, lambda t: t["title"] == "Intro" and t["playing"], "initial state")
+        print(f"start: {backend.current_track['title']} by {backend.current_track['artist']}, {backend.stats}")
+
+        backend.next_track()
+        ms = wait_for(backend, lambda t: t["title"] == "Second Song", "next track")
+        print(f"next: {ms:.1f} ms")
+        backend.play_pause()
+        ms = wait_for(backend, lambda t: not t["playing"], "pause")
+        print(f"pause: shown after {ms:.1f} ms")
+
+        other = open_dbus_connection(bus=address)
+        seek = new_method_call(DBusAddress("/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.spotify",
+                                           "org.mpris.MediaPlayer2.Player"), "Seek", "x", (60_000_000,))
+        other.send_and_get_reply(seek)
+        ms = wait_for(backend, lambda t: t["position"] >= 60, "seek by another client")
+        print(f"seek: {ms:.1f} ms")
+        other.close()
+
+        seen = []
+        backend.add_callback(lambda track: seen.append(track["title"]))
+        start = time.perf_counter()
+        for _ in range(5):
+            backend.next_track()
+        clicks_ms = (time.perf_counter() - start) * 1000
+        wait_for(backend, lambda t: t["title"] == "Intro" and not t["playing"], "skip by five")
+        time.sleep(0.2)
+        if backend.current_track["title"] != "Intro" or seen[-1] != "Intro":
+            raise SystemExit(f"FAILED: stale state after the skip: {seen}")
+        backend.callbacks.pop()
+        print(f"skip by five: clicks took {clicks_ms:.2f} ms, updates {seen}, {backend.command_stats}")
+
+        before = dict(backend.stats)
+        time.sleep(2)
+        if backend.stats != before:
+            raise SystemExit(f"FAILED: work while idle: {before} -> {backend.stats}")
+        print("idle: 2 s without calls or notifications")
+
+        players["vlc"] = start_player(address, "vlc")
+        time.sleep(0.2)
+        if backend._name != "org.mpris.MediaPlayer2.spotify":
+            raise SystemExit(f"FAILED: switched away from the preferred player to {backend._name}")
+        stop_player(players.pop("spotify"))
+        wait_for(backend, lambda t: backend._name == "org.mpris.MediaPlayer2.vlc" and t["title"] == "Intro",
+                 "fall back to the other player")
+        stop_player(players.pop("vlc"))
+        wait_for(backend, lambda t: t["title"] == "No Media Player", "closed")
+        players["spotify"] = start_player(address, "spotify")
+        wait_for(backend, lambda t: t["title"] == "Intro", "restarted player")
+        print(f"players: followed spotify -> vlc -> none -> spotify, {backend.stats}")
+
+        backend.stop_polling()
+        print("OK")
+    finally:
+        for proc in players.values():
+            stop_player(proc)
+        daemon.kill()
+        daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Multi-process stress run for DataManager.
+
+Several processes open the same store at once (half write-behind, half
+synchronous) and add/toggle/delete their own tasks while the store is
+compacted underneath them. Each process tracks what its tasks should look
+like; afterwards the store is reopened and must contain exactly those
+tasks, with unique IDs, and each process must have seen the others' writes.
+
+Usage: python tools/stress_multiprocess.py [processes] [ops_per_process]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.data_manager import DataManager
+
+
+def find_task(db, ids, text):
+    """Current ID of one of our tasks; another process may have moved it to a fresh ID."""
+    task = db.get_task(ids[text])
+    if task is None or task.text != text:
+        ids[text] = next(t.id for t in db.get_tasks() if t.text == text)
+    return ids[text]
+
+
+def worker(path, proc, n, results):
+    try:
+        results.put(run_worker(path, proc, n))
+    except Exception as e:
+        results.put((proc, e, 0))
+
+
+def run_worker(path, proc, n):
+    rng = random.Random(proc)
+    db = DataManager(path, write_behind=proc % 2 == 0, flush_interval=0.02)
+    ids, done = {}, {}
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.6 or not ids:
+            text = f"p{proc}-{i}"
+            ids[text] = db.add_task(text).id
+            done[text] = False
+        elif roll < 0.85:
+            text = rng.choice(list(ids))
+            with db.transaction(): # Holds the store lock, so the ID cannot move before the toggle
+                db.toggle_task(find_task(db, ids, text))
+            done[text] = not done[text]
+        else:
+            text = rng.choice(list(ids))
+            with db.transaction():
+                db.delete_task(find_task(db, ids, text))
+            del ids[text], done[text]
+        if i % 50 == 0:
+            db.save() # Compact now and then so others have to reload
+        time.sleep(rng.random() * 0.001)
+
+    time.sleep(0.5)
+    db.poll_changes()
+    foreign = sum(1 for t in db.get_tasks() if not t.text.startswith(f"p{proc}-"))
+    db.close()
+    return proc, done, foreign
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.json")
+        DataManager(path).close()
+
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=worker, args=(path, p, ops, results)) for p in range(processes)]
+        for p in procs:
+            p.start()
+        reports = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        for proc, done, _ in reports:
+            if isinstance(done, Exception):
+                raise SystemExit(f"FAILED: process {proc} raised {done!r}")
+
+        expected = {}
+        for _, done, _ in reports:
+            expected.update(done)
+        db = DataManager(path)
+        tasks = db.get_tasks()
+        db.close()
+
+        actual = {t.text: t.done for t in tasks}
+        if len({t.id for t in tasks}) != len(tasks) or len(actual) != len(tasks):
+            raise SystemExit("FAILED: duplicate task IDs or texts in the merged store")
+        if actual != expected:
+            missing = expected.keys() - actual.keys()
+            raise SystemExit(f"FAILED: store differs from what the writers expect ({len(missing)} missing)")
+        if any(foreign == 0 for _, _, foreign in reports):
+            raise SystemExit("FAILED: a process never saw the other processes' tasks")
+        print(f"OK: {processes} processes x {ops} ops, {len(tasks)} tasks survive")
+
+
+if __name__ == "__main__":
+    main()
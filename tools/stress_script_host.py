@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Exercises ScriptHost (the persistent osascript helper) against
+tools/fake_osascript.py, so the framing, restart and timeout paths run on
+any OS.
+
+  1. Echo round trips with awkward payloads (newlines, unicode, header-like
+     text, 100 KB) must come back byte for byte.
+  2. With the helper crashing every few requests, every request must still
+     succeed (retried in a fresh helper).
+  3. A hanging script must time out, and the next request must work.
+  4. SpotifyService polls through one helper: one launch for many polls.
+  5. Commands return at once with an optimistic state; five queued
+     "next" clicks run as one script, and the poll after them shows the
+     real track.
+
+Usage: python tools/stress_script_host.py [requests]
+"""
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services.script_host import ScriptHost
+from app.services.spotify_service import SpotifyService
+
+FAKE = os.path.join(ROOT, "tools", "fake_osascript.py")
+
+
+def payloads(rng, n):
+    samples = ["plain", "two\nlines", "ünïcødé ♫", "1 ok 99\nnot a header", "", " padded ", "x" * 100000]
+    for i in range(n):
+        yield rng.choice(samples) + str(i)
+
+
+def check_echo(host, rng, n):
+    for text in payloads(rng, n):
+        result = host.run("echo " + text)
+        if result != text:
+            raise SystemExit(f"FAILED: echo returned {result[:40]!r} for {text[:40]!r}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = random.Random(3)
+
+    host = ScriptHost(FAKE, timeout=2.0)
+    start = time.perf_counter()
+    check_echo(host, rng, n)
+    elapsed = time.perf_counter() - start
+    print(f"echo: {n} requests in {elapsed * 1000:.0f} ms, {host.stats['launches']} launch(es)")
+    host.close()
+
+    os.environ["FAKE_OSASCRIPT_CRASH_EVERY"] = "7"
+    host = ScriptHost(FAKE, timeout=2.0)
+    check_echo(host, rng, n)
+    print(f"crashing helper: {n} requests ok, {host.stats['crashes']} crashes, {host.stats['launches']} launches")
+    host.close()
+    del os.environ["FAKE_OSASCRIPT_CRASH_EVERY"]
+
+    host = ScriptHost(FAKE, timeout=0.5)
+    if host.run("hang") is not None or host.stats["timeouts"] != 1:
+        raise SystemExit("FAILED: a hanging script did not time out")
+    if host.run("echo after") != "after":
+        raise SystemExit("FAILED: no recovery after a timeout")
+    print(f"timeout: recovered, {host.stats['launches']} launches")
+    host.close()
+
+    spotify = SpotifyService(osascript=FAKE)
+    for _ in range(50):
+        spotify._update_status()
+    stats = spotify.get_poll_stats()
+    if spotify.current_track["title"] != "Intro" or stats["launches"] != 1:
+        raise SystemExit(f"FAILED: unexpected Spotify state {spotify.current_track} / {stats}")
+    print(f"spotify: {stats['polls']} polls, {stats['launches']} launch, {stats['avg_ms']:.2f} ms per poll")
+
+    # Clicks before the worker runs pile up in the queue, like clicks during a slow script
+    start = time.perf_counter()
+    for _ in range(5):
+        spotify.next_track()
+    spotify.play_pause()
+    spotify.play_pause()
+    clicks_ms = (time.perf_counter() - start) * 1000
+    if spotify.current_track["position"] > 0.1 or not spotify.current_track["playing"]:
+        raise SystemExit(f"FAILED: no optimistic state after the clicks: {spotify.current_track}")
+    spotify.start_polling()
+    deadline = time.monotonic() + 3
+    while spotify.current_track["title"] != "Encore, Live":
+        if time.monotonic() > deadline:
+            raise SystemExit(f"FAILED: the skip by five did not arrive: {spotify.current_track}")
+        time.sleep(0.005)
+    spotify.stop_polling()
+    commands = spotify.command_stats
+    if commands != {"requested": 7, "sent": 1}:
+        raise SystemExit(f"FAILED: commands were not coalesced: {commands}")
+    print(f"commands: 7 clicks in {clicks_ms:.2f} ms, sent as {commands['sent']} script")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
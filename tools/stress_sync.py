@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Two-replica sync run for DataManager.sync_with.
+
+Two data files start as copies of each other (like a hand-copied
+titanium_data.json), then both sides add, toggle, delete and edit notes
+independently, with a sync every few rounds. After each sync the two
+stores must hold exactly the same tasks and notes, and a repeated sync
+must exchange nothing. The final sync must move about as many entries as
+were made since the previous one, whatever the store size.
+
+Usage: python tools/stress_sync.py [rounds] [ops_per_round] [initial_tasks]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.data_manager import DataManager
+
+
+def state(db):
+    return [t.to_dict() for t in db.get_tasks()], db.get_notes()
+
+
+def mutate(db, rng, name, i):
+    tasks = db.get_tasks()
+    roll = rng.random()
+    if roll < 0.3 or not tasks:
+        db.add_task(f"{name}-{i}")
+    elif roll < 0.65:
+        db.toggle_task(rng.choice(tasks).id)
+    elif roll < 0.8:
+        db.delete_task(rng.choice(tasks).id)
+    else:
+        db.set_notes(f"notes from {name} #{i}")
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    initial = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path_a, path_b = os.path.join(tmp, "a", "data.json"), os.path.join(tmp, "b", "data.json")
+        os.makedirs(os.path.dirname(path_a))
+        os.makedirs(os.path.dirname(path_b))
+        a = DataManager(path_a)
+        with a.transaction():
+            for i in range(initial):
+                a.add_task(f"seed-{i}")
+        a.save()
+        shutil.copy(path_a, path_b) # The hand copy: just the data file
+        b = DataManager(path_b)
+        a.sync_with(b)
+
+        for r in range(rounds):
+            for i in range(ops):
+                mutate(a, rng, "a", f"{r}.{i}")
+                mutate(b, rng, "b", f"{r}.{i}")
+            if r % 3 == 2 or r == rounds - 1:
+                start = time.perf_counter()
+                pulled, pushed = a.sync_with(b)
+                elapsed = time.perf_counter() - start
+                if state(a) != state(b):
+                    raise SystemExit(f"FAILED: stores differ after sync in round {r}")
+                if a.sync_with(b) != (0, 0):
+                    raise SystemExit("FAILED: a repeated sync exchanged entries")
+                print(f"round {r}: pulled {pulled}, pushed {pushed} in {elapsed * 1000:.1f} ms")
+
+        # Reopening must give the same merged state
+        tasks, notes = state(a)
+        a.close()
+        b.close()
+        a, b = DataManager(path_a), DataManager(path_b)
+        if state(a) != (tasks, notes) or state(b) != (tasks, notes):
+            raise SystemExit("FAILED: merged state did not survive a restart")
+        if len({t["id"] for t in tasks}) != len(tasks):
+            raise SystemExit("FAILED: duplicate task IDs")
+        a.close()
+        b.close()
+        print(f"OK: {rounds} rounds x {ops} ops per side, {len(tasks)} tasks in both stores")
+
+
+if __name__ == "__main__":
+    main()